@@ -0,0 +1,126 @@
+# backends.py
+"""Lazy registry of drone backends.
+
+A backend is named by a ``"module:Class"`` target and its module is only
+imported when the backend is selected, so picking the offline drone never
+loads easytello or DroneBlocksTelloSimulator (and their network stacks).
+Other packages can add backends by declaring an entry point::
+
+    setup(
+        ...,
+        entry_points={
+            "drone_teaching_package.backends": [
+                "mavic = my_package.adapter:MavicDrone",
+            ],
+        },
+    )
+
+Installed entry points are only scanned when a name is not one of the
+built-ins. import_bench.py measures the cold-start cost of each backend.
+"""
+
+import importlib
+from typing import Dict, List
+
+ENTRY_POINT_GROUP = "drone_teaching_package.backends"
+
+# Built-in backends: name -> "module:Class"
+BUILTIN_BACKENDS = {
+    "sim": "drone_teaching_package.simulated_tello:EasyTelloToSimulatedDrone",
+    "real": "drone_teaching_package.real_tello:EasyTelloRealDrone",
+    "offline": "drone_teaching_package.offline_drone:OfflineDrone",
+    "daemon": "drone_teaching_package.daemon:DroneClient",
+}
+
+_registry: Dict[str, str] = dict(BUILTIN_BACKENDS)
+_plugins_scanned = False
+
+
+def register_backend(name: str, target: str, replace: bool = False):
+    """
+    Register a backend without importing it
+
+    Args:
+        name: Backend name used by --backend and create_drone()
+        target: "module:Class" of the adapter
+        replace: Allow overriding an existing backend
+
+    Raises:
+        ValueError: If the target is malformed or the name is already taken
+    """
+    module_name, _, attribute = target.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Backend target must look like 'module:Class', got {target!r}")
+    if name in _registry and not replace and _registry[name] != target:
+        raise ValueError(f"Backend {name} is already registered as {_registry[name]}")
+    _registry[name] = target
+
+
+def _entry_points():
+    """Installed backend entry points as (name, "module:Class") pairs"""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        try:
+            import pkg_resources
+        except ImportError:
+            return []
+        return [(ep.name, f"{ep.module_name}:{'.'.join(ep.attrs)}")
+                for ep in pkg_resources.iter_entry_points(ENTRY_POINT_GROUP)]
+    found = entry_points()
+    if hasattr(found, "select"):
+        found = found.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10 returns a dict of groups
+        found = found.get(ENTRY_POINT_GROUP, [])
+    return [(ep.name, ep.value) for ep in found]
+
+
+def _scan_plugins():
+    global _plugins_scanned
+    if _plugins_scanned:
+        return
+    _plugins_scanned = True
+    for name, target in _entry_points():
+        if name not in _registry:  # built-ins and explicit registrations win
+            _registry[name] = target
+
+
+def available_backends() -> List[str]:
+    """Names of all backends, including installed plugins"""
+    _scan_plugins()
+    return sorted(_registry)
+
+
+def backend_target(name: str) -> str:
+    """
+    Return the "module:Class" target of a backend
+
+    Raises:
+        ValueError: If no backend has that name
+    """
+    if name not in _registry:
+        _scan_plugins()
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend: {name} (choose from {', '.join(available_backends())})") from None
+
+
+def load_backend(name: str):
+    """Import a backend's module and return its adapter class"""
+    module_name, _, attribute = backend_target(name).partition(":")
+    adapter = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        adapter = getattr(adapter, part)
+    return adapter
+
+
+def create_drone(name: str, **options):
+    """
+    Construct a drone adapter from a backend
+
+    Args:
+        name: Backend name, e.g. "sim", "real" or "offline"
+        **options: Keyword arguments for the adapter constructor
+    """
+    return load_backend(name)(**options)
@@ -0,0 +1,379 @@
+# classroom.py
+"""Classroom multiplexer: many drone sessions served by one event loop.
+
+Each student gets an isolated session with its own drone (and therefore its
+own flight state). Commands run in a shared worker pool:
+
+- Within a session, commands run one at a time and in order. A drone
+  cannot fly two commands at once.
+- Across sessions, each session holds at most one waiter on a FIFO
+  semaphore, so the workers are shared round-robin. A student queuing
+  100 commands cannot starve one who queued 2.
+- Each session has a token-bucket rate limit.
+- Metrics report throughput and tail latency per session.
+
+    python -m drone_teaching_package.classroom --backend sim --workers 16
+
+Students connect with the daemon's client and a session name:
+``DroneClient(path, session="alice")``. A name is held by one connection
+at a time and can be taken up again once that connection closes.
+"""
+
+import argparse
+import asyncio
+import functools
+import itertools
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from drone_teaching_package.backends import available_backends, create_drone
+from drone_teaching_package.daemon import (
+    ENCODING, PING, POSE, SESSION, STATE, _remove_stale_socket, decode_request, pose_request
+)
+from drone_teaching_package.interpreter import CommandInterpreter, _check_args
+from drone_teaching_package.run import DEFAULT_SIMULATOR_KEY
+
+DEFAULT_SOCKET = os.environ.get(
+    "DRONE_CLASSROOM_SOCKET", os.path.join(tempfile.gettempdir(), "drone_classroom.sock")
+)
+
+DEFAULT_RATE = 5.0   # commands per second per session
+DEFAULT_BURST = 5
+LATENCY_SAMPLES = 10000  # most recent latencies kept per session
+
+_client_ids = itertools.count(1)  # names for connections that never send "session"
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `burst` saved"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = None
+
+    async def take(self):
+        """Wait until a token is available and consume it"""
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            if self._updated is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SessionMetrics(NamedTuple):
+    """Throughput and latency summary of one session"""
+    session_id: str
+    commands: int
+    errors: int
+    throughput: float  # commands per second since the session opened
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class Session:
+    """One student's drone plus its queueing, rate-limit and metrics state"""
+
+    def __init__(self, session_id: str, drone, rate: float, burst: int, opened: float):
+        self.session_id = session_id
+        self.drone = drone
+        self.dispatch = CommandInterpreter(drone).dispatch
+        self.bucket = TokenBucket(rate, burst)
+        self.turn = asyncio.Lock()  # FIFO: keeps this session's commands in order
+        self.client = None  # connection currently holding the session, if any
+        self.opened = opened
+        self.commands = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def metrics(self, now: float) -> SessionMetrics:
+        ordered = sorted(self.latencies)
+        elapsed = now - self.opened
+        return SessionMetrics(
+            self.session_id, self.commands, self.errors,
+            self.commands / elapsed if elapsed > 0 else 0.0,
+            percentile(ordered, 50), percentile(ordered, 95), percentile(ordered, 99),
+            ordered[-1] if ordered else 0.0,
+        )
+
+
+class ClassroomMultiplexer:
+    """Host many drone sessions in one asyncio event loop"""
+
+    def __init__(self, drone_factory: Optional[Callable[[str], object]] = None,
+                 backend: str = "sim", backend_options: Optional[dict] = None,
+                 workers: int = 8, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        """
+        Args:
+            drone_factory: Called with a session id to build its drone
+                (defaults to create_drone(backend, **backend_options))
+            backend: Backend used by the default factory
+            backend_options: Constructor options for the default factory
+            workers: Commands that may be in flight at once across all sessions
+            rate: Sustained commands per second allowed per session
+            burst: Commands a session may issue back to back
+        """
+        options = backend_options or {}
+        self.drone_factory = drone_factory or (lambda session_id: create_drone(backend, **options))
+        self.workers = workers
+        self.rate = rate
+        self.burst = burst
+        self.sessions: Dict[str, Session] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="classroom")
+        self._slots = None  # created on first use, inside the running loop
+
+    async def _run_blocking(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def open_session(self, session_id: str) -> Session:
+        """Create (or return the existing) session for a student"""
+        if session_id not in self.sessions:
+            drone = await self._run_blocking(self.drone_factory, session_id)
+            if session_id in self.sessions:  # lost a race with another open
+                await self._run_blocking(_release, drone)
+            else:
+                loop = asyncio.get_event_loop()
+                self.sessions[session_id] = Session(session_id, drone, self.rate, self.burst, loop.time())
+        return self.sessions[session_id]
+
+    async def attach_session(self, session_id: str, client) -> Session:
+        """
+        Open a session and hold it for one connection
+
+        Raises:
+            ValueError: If another open connection holds the session
+        """
+        session = await self.open_session(session_id)
+        if session.client is not None and session.client is not client:
+            raise ValueError(f"Session {session_id} is in use by another connection")
+        session.client = client
+        return session
+
+    def detach_session(self, session_id: str, client):
+        """Let other connections take a session this connection held"""
+        session = self.sessions.get(session_id)
+        if session is not None and session.client is client:
+            session.client = None
+
+    async def close_session(self, session_id: str):
+        """Land the session's drone if needed, release it and forget the session"""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+        async with session.turn:
+            if getattr(session.drone, "is_flying", False):
+                await self._run_blocking(session.drone.land)
+            await self._run_blocking(_release, session.drone)
+
+    async def query(self, session_id: str, name: str, args) -> str:
+        """
+        Answer a STATE or POSE request once it is the session's turn
+
+        Waiting for the turn keeps the answer consistent with the commands
+        queued before it, and a pose update from racing a moving drone.
+
+        Raises:
+            KeyError: If the session is not open
+        """
+        session = self.sessions[session_id]
+        async with session.turn:
+            if name == STATE:
+                return getattr(session.drone, "state", "unknown")
+            return pose_request(session.drone, args)
+
+    async def execute(self, session_id: str, name: str, *args):
+        """
+        Run one command for a session once it is its turn
+
+        Raises:
+            KeyError: If the session is not open
+            ValueError: If the command or its arguments are invalid
+        """
+        session = self.sessions[session_id]
+        _check_args(name, args)
+        try:
+            func = session.dispatch[name]
+        except KeyError:
+            raise ValueError(f"Drone does not support {name}") from None
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        loop = asyncio.get_event_loop()
+        queued = loop.time()
+        async with session.turn:
+            await session.bucket.take()
+            async with self._slots:
+                try:
+                    return await self._run_blocking(func, *args)
+                except Exception:
+                    session.errors += 1
+                    raise
+                finally:
+                    session.commands += 1
+                    session.latencies.append(loop.time() - queued)
+
+    def metrics(self) -> List[SessionMetrics]:
+        """Per-session metrics, in session-id order"""
+        now = asyncio.get_event_loop().time()
+        return [self.sessions[key].metrics(now) for key in sorted(self.sessions)]
+
+    def format_metrics(self) -> str:
+        """Render metrics as a plain-text table (latencies in milliseconds)"""
+        lines = [f"{'session':<16} {'cmds':>6} {'errs':>5} {'cmd/s':>7} "
+                 f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+        for m in self.metrics():
+            lines.append(f"{m.session_id:<16} {m.commands:>6} {m.errors:>5} {m.throughput:>7.2f} "
+                         f"{m.p50 * 1000:>8.1f} {m.p95 * 1000:>8.1f} {m.p99 * 1000:>8.1f} "
+                         f"{m.max * 1000:>8.1f}")
+        return "\n".join(lines)
+
+    async def _serve_client(self, reader, writer):
+        """
+        Serve one connection; its first request may name the session
+
+        Named sessions outlive the connection so a student can reconnect to
+        the same drone; unnamed ones are closed when the connection ends.
+        While the connection is open no other connection may use its name.
+        """
+        session_id = None
+        named = False
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    name, args = decode_request(line)
+                    if name == SESSION:
+                        if session_id is not None:
+                            raise ValueError("Session already chosen for this connection")
+                        chosen = str(args[0]) if args else f"client-{next(_client_ids)}"
+                        await self.attach_session(chosen, writer)
+                        session_id, named = chosen, bool(args)
+                        value = session_id
+                    elif name == PING:
+                        value = "pong"
+                    else:
+                        if session_id is None:
+                            session_id = f"client-{next(_client_ids)}"
+                            await self.attach_session(session_id, writer)
+                        if name in (STATE, POSE):
+                            value = await self.query(session_id, name, args)
+                        else:
+                            value = await self.execute(session_id, name, *args)
+                    reply = "ok" if value is None else f"ok {value}"
+                except Exception as e:
+                    message = " ".join(str(e).split())
+                    reply = f"err {type(e).__name__} {message}"
+                writer.write(reply.encode(ENCODING) + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+            if session_id is not None and not named:
+                await self.close_session(session_id)
+            elif session_id is not None:
+                self.detach_session(session_id, writer)
+
+    async def serve(self, path: str = DEFAULT_SOCKET):
+        """
+        Accept student connections on a Unix socket until cancelled
+
+        Raises:
+            RuntimeError: If a classroom or daemon is already serving on the path
+        """
+        _remove_stale_socket(path)
+        server = await asyncio.start_unix_server(self._serve_client, path)
+        try:
+            if hasattr(server, "serve_forever"):
+                await server.serve_forever()
+            else:  # Python < 3.7
+                await asyncio.Event().wait()
+        finally:
+            server.close()
+            for session_id in list(self.sessions):
+                await self.close_session(session_id)
+            self._executor.shutdown(wait=False)
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def _release(drone):
+    """Close a drone's link to its backend, if the adapter has one"""
+    close = getattr(drone, "close", None)
+    if close is not None:
+        close()
+
+
+async def _report_periodically(multiplexer: ClassroomMultiplexer, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        print(multiplexer.format_metrics(), flush=True)
+
+
+async def _serve_with_reports(multiplexer: ClassroomMultiplexer, path: str, interval: float):
+    reporter = asyncio.ensure_future(_report_periodically(multiplexer, interval)) if interval else None
+    try:
+        await multiplexer.serve(path)
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        print(multiplexer.format_metrics())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve many drone sessions from one process")
+    parser.add_argument("--backend", choices=[b for b in available_backends() if b != "daemon"],
+                        default="sim")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--simulator-key",
+                        default=os.environ.get("DRONE_SIMULATOR_KEY", DEFAULT_SIMULATOR_KEY))
+    parser.add_argument("--workers", type=int, default=8, help="Commands in flight at once")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Commands/second per session")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST)
+    parser.add_argument("--report", type=float, default=30.0,
+                        help="Seconds between metric reports (0 disables)")
+    args = parser.parse_args(argv)
+
+    options = {"simulator_key": args.simulator_key} if args.backend == "sim" else {}
+    multiplexer = ClassroomMultiplexer(backend=args.backend, backend_options=options,
+                                       workers=args.workers, rate=args.rate, burst=args.burst)
+    print(f"Classroom ({args.backend}, {args.workers} workers) listening on {args.socket}")
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    task = loop.create_task(_serve_with_reports(multiplexer, args.socket, args.report))
+    try:
+        loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        print("\nShutting down classroom")
+        task.cancel()
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# clock.py
+"""Injectable clock used by the interpreter, planners and offline drone.
+
+Code that waits or measures time should go through the current clock
+(``clock.sleep(2)``, ``clock.monotonic()``) instead of the time module.
+Production code gets the real clock; tests, CI and the lesson harness
+install a VirtualClock so every sleep returns immediately and simply
+moves virtual time forward.
+"""
+
+import threading
+import time as _time
+from contextlib import contextmanager
+
+# Captured at import so patching the time module cannot make SystemClock recurse
+_sleep = _time.sleep
+_monotonic = _time.monotonic
+_monotonic_ns = _time.monotonic_ns
+_perf_counter = _time.perf_counter
+_wall_time = _time.time
+
+
+class SystemClock:
+    """The real clock"""
+
+    def sleep(self, seconds: float):
+        _sleep(seconds)
+
+    def monotonic(self) -> float:
+        return _monotonic()
+
+    def monotonic_ns(self) -> int:
+        return _monotonic_ns()
+
+    def perf_counter(self) -> float:
+        return _perf_counter()
+
+    def time(self) -> float:
+        return _wall_time()
+
+
+class VirtualClock:
+    """A clock whose sleeps fast-forward instead of blocking"""
+
+    def __init__(self, start: float = 0.0, epoch: float = None):
+        """
+        Args:
+            start: Initial monotonic reading in seconds
+            epoch: Wall-clock time matching start (defaults to the real time now)
+        """
+        self._now = start
+        self._start = start
+        self._epoch = _wall_time() if epoch is None else epoch
+        self._lock = threading.Lock()
+        self.sleep_count = 0
+        self.slept = 0.0
+
+    def advance(self, seconds: float):
+        """Move virtual time forward without counting it as a sleep"""
+        if seconds < 0:
+            raise ValueError("sleep length must be non-negative")
+        with self._lock:
+            self._now += seconds
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+        with self._lock:
+            self.sleep_count += 1
+            self.slept += seconds
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def monotonic_ns(self) -> int:
+        return int(self._now * 1_000_000_000)
+
+    def perf_counter(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._epoch + (self._now - self._start)
+
+    @property
+    def elapsed(self) -> float:
+        return self._now - self._start
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    """Return the clock currently in use"""
+    return _clock
+
+
+def set_clock(clock):
+    """Install a clock globally and return the previous one"""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def use_clock(clock):
+    """Temporarily install a clock"""
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+def sleep(seconds: float):
+    """Sleep on the current clock; drop-in for time.sleep"""
+    _clock.sleep(seconds)
+
+
+def monotonic() -> float:
+    return _clock.monotonic()
+
+
+def monotonic_ns() -> int:
+    return _clock.monotonic_ns()
+
+
+def perf_counter() -> float:
+    return _clock.perf_counter()
+
+
+def time() -> float:
+    return _clock.time()
@@ -0,0 +1,1180 @@
+# code_converter.py
+"""Convert easytello-style student scripts into static flight programs.
+
+The converter never runs a script. It parses it and walks the AST with a
+small evaluator that understands literals, arithmetic, loops over known
+ranges, module-level functions and the drone adapter API (including the
+dead-reckoned ``pose``), and records every drone command and ``sleep`` in
+the order the script would issue them. Anything it cannot decide statically (``input()``, ``while True``,
+random values, ...) is skipped and reported in ``unresolved``.
+
+Sleeps that only pace the previous drone command are rewritten into
+completion waits: the adapters block until a command has finished, so the
+wait is implicit and the sleep is dropped. Time slept beyond the command's
+own duration is a deliberate hover and is kept, as are sleeps before the
+first command.
+
+Results are cached by a hash of the script's content, so converting a
+whole course directory again only reprocesses files that changed:
+
+    python -m drone_teaching_package.code_converter python-lessons --format python
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from drone_teaching_package.clock import VirtualClock, use_clock
+from drone_teaching_package.compiler import compile_program
+from drone_teaching_package.flight_model import DEFAULT_SPEED, command_duration, estimate_duration
+from drone_teaching_package.interpreter import (
+    COMMAND_SIGNATURES, _check_args, format_command
+)
+from drone_teaching_package.pose import PoseTracker
+
+CONVERTER_VERSION = "1"
+
+DRONE_FACTORIES = ("get_drone", "EasyTelloToSimulatedDrone", "EasyTelloRealDrone")
+SIMULATED_BATTERY = "100%"
+MAX_STEPS = 200000
+MAX_DEPTH = 50
+MAX_LOOP = 10000
+MAX_BITS = 4096        # largest integer arithmetic may produce
+MAX_SEQUENCE = 100000  # longest list or string repetition may produce
+
+
+class _Unresolved(Exception):
+    """A value or statement that cannot be evaluated statically"""
+
+
+class _ScriptRaise(Exception):
+    """The script itself raised an exception"""
+
+
+class _BudgetExhausted(Exception):
+    """The script runs longer than MAX_STEPS statements"""
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class _Break(Exception):
+    pass
+
+
+class _Continue(Exception):
+    pass
+
+
+# Evaluator signals that must pass through statement error handling
+_CONTROL = (_ScriptRaise, _BudgetExhausted, _Return, _Break, _Continue)
+
+
+class _Unknown:
+    """Value of a name bound to something the evaluator could not compute"""
+
+
+UNKNOWN = _Unknown()
+
+
+class _Drone:
+    """Stand-in for a drone adapter instance, dead-reckoning its recorded commands
+
+    Package helpers run for real against it, so it offers the same command
+    methods, pose and set_pose() as the adapters.
+    """
+
+    def __init__(self, extractor: "ScriptExtractor"):
+        self.extractor = extractor
+        self.tracker = PoseTracker()
+
+    @property
+    def pose(self):
+        return self.tracker.pose
+
+    def set_pose(self, x: float, y: float, z: float, yaw: float = 0.0):
+        self.tracker.reset(x, y, z, yaw)
+
+    def __getattr__(self, name: str):
+        if name in COMMAND_SIGNATURES:
+            return _DroneMethod(name, self)
+        raise AttributeError(name)
+
+
+class _DroneMethod:
+    def __init__(self, name: str, drone: _Drone):
+        self.name = name
+        self.drone = drone
+
+    def __call__(self, *args):
+        return self.drone.extractor.record_command(self.name, args, self.drone)
+
+
+class _RecordingClock(VirtualClock):
+    """Clock installed while package helpers run, recording their sleeps"""
+
+    def __init__(self, extractor: "ScriptExtractor"):
+        super().__init__()
+        self.extractor = extractor
+
+    def sleep(self, seconds: float):
+        self.extractor.record_sleep(seconds)
+        super().sleep(seconds)
+
+
+class _Sleep:
+    """Stand-in for time.sleep"""
+
+
+class _TimeModule:
+    pass
+
+
+class _Function:
+    def __init__(self, node, scope, defaults):
+        self.node = node
+        self.scope = scope
+        self.defaults = defaults
+        self.owner = None  # _Class the function was defined in, if any
+
+
+class _Class:
+    def __init__(self, name: str, bases, namespace):
+        self.name = name
+        self.bases = bases
+        self.namespace = namespace
+
+    def mro(self):
+        order = [self]
+        for base in self.bases:
+            order.extend(cls for cls in base.mro() if cls not in order)
+        return order
+
+    def lookup(self, name: str, after=None):
+        order = self.mro()
+        if after is not None:
+            order = order[order.index(after) + 1:]
+        for cls in order:
+            if name in cls.namespace:
+                return cls.namespace[name]
+        raise _Unresolved(f"'{self.name}' has no attribute '{name}'")
+
+
+class _Instance:
+    def __init__(self, cls: _Class):
+        self.cls = cls
+        self.attrs = {}
+
+
+class _BoundMethod:
+    def __init__(self, function: _Function, instance):
+        self.function = function
+        self.instance = instance
+
+
+class _Property:
+    def __init__(self, fget, fset=None):
+        self.fget = fget
+        self.fset = fset
+
+
+class _PropertySetter:
+    def __init__(self, prop: _Property):
+        self.prop = prop
+
+
+class _Super:
+    def __init__(self, owner: _Class, instance: _Instance):
+        self.owner = owner
+        self.instance = instance
+
+
+class _Wraps:
+    """Stand-in for functools.wraps; wrapping is the identity here"""
+
+
+class _Identity:
+    pass
+
+
+SLEEP = _Sleep()
+
+_SAFE_BUILTINS = {
+    "range": range, "len": len, "int": int, "float": float, "str": str,
+    "abs": abs, "min": min, "max": max, "round": round, "list": list,
+    "tuple": tuple, "dict": dict, "enumerate": enumerate, "zip": zip,
+    "sum": sum, "sorted": sorted, "reversed": reversed, "bool": bool,
+    "all": all, "any": any, "True": True, "False": False, "None": None,
+    "ValueError": ValueError, "Exception": Exception,
+    "getattr": getattr, "hasattr": hasattr, "super": super, "property": property,
+}
+
+_SAFE_MODULES = {"math": math}
+
+_BINOPS = {
+    ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b, ast.Div: lambda a, b: a / b,
+    ast.FloorDiv: lambda a, b: a // b, ast.Mod: lambda a, b: a % b,
+    ast.Pow: lambda a, b: a ** b,
+}
+
+_COMPARES = {
+    ast.Eq: lambda a, b: a == b, ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: a < b, ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b, ast.GtE: lambda a, b: a >= b,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+    ast.Is: lambda a, b: a is b, ast.IsNot: lambda a, b: a is not b,
+}
+
+_PLAIN_TYPES = (str, int, float, list, tuple, dict, set, bool, type(None))
+
+
+def _too_big(op, a, b) -> bool:
+    """Whether an operation would build a huge integer or sequence"""
+    sequences = (str, list, tuple)
+    if isinstance(op, ast.Pow) and type(a) is int and type(b) is int and abs(a) > 1:
+        return b * abs(a).bit_length() > MAX_BITS
+    if isinstance(op, ast.Mult):
+        if type(a) is int and type(b) is int:
+            return a.bit_length() + b.bit_length() > MAX_BITS
+        for sequence, count in ((a, b), (b, a)):
+            if isinstance(sequence, sequences) and type(count) is int:
+                return len(sequence) * count > MAX_SEQUENCE
+    if isinstance(op, ast.Add) and isinstance(a, sequences) and isinstance(b, sequences):
+        return len(a) + len(b) > MAX_SEQUENCE
+    return False
+
+
+def _arithmetic(op, a, b):
+    """Apply a binary operator the way Python would, within size limits"""
+    operation = _BINOPS.get(type(op))
+    if operation is None:
+        raise _Unresolved("unsupported operator")
+    if _too_big(op, a, b):
+        raise _Unresolved("arithmetic result too large to evaluate statically")
+    try:
+        return operation(a, b)
+    except (TypeError, ValueError, ZeroDivisionError, OverflowError, MemoryError):
+        raise _Unresolved("invalid arithmetic") from None
+
+
+class ScriptExtractor:
+    """Statically evaluate a script and record its drone commands and sleeps"""
+
+    def __init__(self, filename: str = "<script>"):
+        self.filename = filename
+        self.events: List[Tuple[str, Tuple]] = []
+        self.unresolved: List[Tuple[int, str]] = []
+        self.steps = 0
+        self.depth = 0
+        self.global_drone: Optional[_Drone] = None
+        self.helpers: Tuple[type, ...] = ()
+
+    # -- entry point ------------------------------------------------------
+
+    def extract(self, source: str):
+        """Parse and walk a script, returning (events, unresolved)"""
+        tree = ast.parse(source, filename=self.filename)
+        scope = {"__name__": "__main__"}
+        try:
+            self.exec_block(tree.body, scope)
+        except _ScriptRaise:
+            self.unresolved.append((0, "script raises an uncaught exception"))
+        except _BudgetExhausted:
+            self.unresolved.append((0, f"stopped after {MAX_STEPS} statements"))
+        except (_Return, _Break, _Continue):
+            pass
+        return self.events, list(dict.fromkeys(self.unresolved))
+
+    # -- recording --------------------------------------------------------
+
+    def record_command(self, name: str, args: Tuple, drone: Optional[_Drone] = None):
+        try:
+            _check_args(name, tuple(args))
+        except ValueError as e:
+            raise _Unresolved(f"invalid drone command: {e}") from None
+        self.events.append((name, tuple(args)))
+        if drone is not None:
+            drone.tracker.apply(name, tuple(args))
+        if name == "get_battery":
+            return SIMULATED_BATTERY
+        return None
+
+    def record_sleep(self, seconds):
+        if isinstance(seconds, bool) or not isinstance(seconds, (int, float)) or seconds < 0:
+            raise _Unresolved(f"sleep needs a non-negative number of seconds, got {seconds!r}")
+        self.events.append(("sleep", (seconds,)))
+
+    def note(self, node, message: str):
+        self.unresolved.append((getattr(node, "lineno", 0), message))
+
+    # -- statements -------------------------------------------------------
+
+    def exec_block(self, statements, scope):
+        for statement in statements:
+            self.steps += 1
+            if self.steps > MAX_STEPS:
+                raise _BudgetExhausted()
+            try:
+                self.exec_statement(statement, scope)
+            except _Unresolved as e:
+                self.note(statement, str(e) or type(statement).__name__)
+            except _CONTROL:
+                raise
+            except Exception as e:  # a student mistake the evaluator did not foresee
+                self.note(statement, f"cannot evaluate statically ({type(e).__name__}: {e})")
+
+    def exec_statement(self, node, scope):
+        handler = getattr(self, "exec_" + type(node).__name__, None)
+        if handler is None:
+            raise _Unresolved(f"unsupported statement {type(node).__name__}")
+        handler(node, scope)
+
+    def exec_Expr(self, node, scope):
+        self.eval(node.value, scope)
+
+    def exec_Pass(self, node, scope):
+        pass
+
+    def exec_Import(self, node, scope):
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            if alias.name == "time":
+                scope[name] = _TimeModule()
+            else:
+                scope[name] = _SAFE_MODULES.get(alias.name, UNKNOWN)
+
+    def exec_ImportFrom(self, node, scope):
+        for alias in node.names:
+            name = alias.asname or alias.name
+            if node.module in ("time", "drone_teaching_package.clock") and alias.name == "sleep":
+                scope[name] = SLEEP
+            elif node.module == "functools" and alias.name == "wraps":
+                scope[name] = _Wraps()
+            elif node.module in _SAFE_MODULES:
+                scope[name] = getattr(_SAFE_MODULES[node.module], alias.name, UNKNOWN)
+            elif alias.name in DRONE_FACTORIES:
+                scope[name] = _Drone
+            elif (node.module or "").startswith("drone_teaching_package."):
+                scope[name] = self.static_helper(node.module, alias.name)
+            else:
+                scope[name] = UNKNOWN
+
+    def static_helper(self, module: str, name: str):
+        """
+        A package class its module lists in STATIC_HELPERS, or UNKNOWN
+
+        Those classes only compute (or drive the drone they are given), so
+        the evaluator may create and call them for real.
+        """
+        try:
+            owner = importlib.import_module(module)
+        except ImportError:
+            return UNKNOWN
+        if name not in getattr(owner, "STATIC_HELPERS", ()):
+            return UNKNOWN
+        helper = getattr(owner, name)
+        if helper not in self.helpers:
+            self.helpers += (helper,)
+        return helper
+
+    def exec_FunctionDef(self, node, scope):
+        defaults = []
+        for default in node.args.defaults:
+            try:
+                defaults.append(self.eval(default, scope))
+            except _Unresolved:
+                defaults.append(UNKNOWN)
+        function = _Function(node, scope, defaults)
+        if scope.get("__owner__") is not None:
+            # Methods see the enclosing scope, not the class body
+            function.owner = scope["__owner__"]
+            function.scope = scope["__parent__"]
+        value = function
+        for decorator in reversed(node.decorator_list):
+            try:
+                value = self.call(self.eval(decorator, scope), [value], {}, decorator)
+            except _Unresolved:
+                self.note(decorator, "decorator ignored")
+        scope[node.name] = value
+        return function
+
+    def exec_Assign(self, node, scope):
+        try:
+            value = self.eval(node.value, scope)
+        except _CONTROL:
+            raise
+        except Exception:
+            value = UNKNOWN
+            for target in node.targets:
+                self.assign(target, value, scope)
+            raise
+        for target in node.targets:
+            self.assign(target, value, scope)
+
+    def exec_AnnAssign(self, node, scope):
+        if node.value is not None:
+            self.assign(node.target, self.eval(node.value, scope), scope)
+
+    def exec_AugAssign(self, node, scope):
+        try:
+            value = _arithmetic(node.op, self.eval(node.target, scope), self.eval(node.value, scope))
+        except _Unresolved:
+            self.assign(node.target, UNKNOWN, scope)
+            raise
+        self.assign(node.target, value, scope)
+
+    def exec_If(self, node, scope):
+        if self.eval(node.test, scope):
+            self.exec_block(node.body, scope)
+        else:
+            self.exec_block(node.orelse, scope)
+
+    def exec_For(self, node, scope):
+        iterable = self.eval(node.iter, scope)
+        try:
+            items = list(iterable)
+        except TypeError:
+            raise _Unresolved("loop over a non-iterable value") from None
+        for item in items:
+            self.assign(node.target, item, scope)
+            try:
+                self.exec_block(node.body, scope)
+            except _Break:
+                break
+            except _Continue:
+                continue
+        else:
+            self.exec_block(node.orelse, scope)
+
+    def exec_While(self, node, scope):
+        if isinstance(node.test, (ast.Constant, ast.NameConstant)):
+            raise _Unresolved("while loop with a constant condition (interactive or unbounded)")
+        for _ in range(MAX_LOOP):
+            if not self.eval(node.test, scope):
+                self.exec_block(node.orelse, scope)
+                return
+            try:
+                self.exec_block(node.body, scope)
+            except _Break:
+                return
+            except _Continue:
+                continue
+        raise _Unresolved(f"while loop still running after {MAX_LOOP} iterations")
+
+    def exec_Break(self, node, scope):
+        raise _Break()
+
+    def exec_Continue(self, node, scope):
+        raise _Continue()
+
+    def exec_Return(self, node, scope):
+        raise _Return(None if node.value is None else self.eval(node.value, scope))
+
+    def exec_Raise(self, node, scope):
+        raise _ScriptRaise()
+
+    def exec_Try(self, node, scope):
+        try:
+            self.exec_block(node.body, scope)
+        except _ScriptRaise:
+            if not node.handlers:
+                raise
+            self.exec_block(node.handlers[0].body, scope)
+        else:
+            self.exec_block(node.orelse, scope)
+        finally:
+            self.exec_block(node.finalbody, scope)
+
+    def exec_With(self, node, scope):
+        for item in node.items:
+            if item.optional_vars is not None:
+                self.assign(item.optional_vars, UNKNOWN, scope)
+        self.exec_block(node.body, scope)
+
+    def exec_Global(self, node, scope):
+        scope.setdefault("__globals__", set()).update(node.names)
+
+    def exec_ClassDef(self, node, scope):
+        bases = []
+        for base in node.bases:
+            try:
+                value = self.eval(base, scope)
+            except _Unresolved:
+                continue  # e.g. ABC; behaves like object here
+            if isinstance(value, _Class):
+                bases.append(value)
+        namespace = {"__parent__": scope, "__owner__": None}
+        cls = _Class(node.name, bases, namespace)
+        namespace["__owner__"] = cls
+        self.exec_block(node.body, namespace)
+        del namespace["__parent__"], namespace["__owner__"]
+        scope[node.name] = cls
+
+    # -- assignment targets -----------------------------------------------
+
+    def assign(self, target, value, scope):
+        if isinstance(target, ast.Name):
+            if target.id in scope.get("__globals__", ()):
+                while scope.get("__parent__") is not None:
+                    scope = scope["__parent__"]
+            scope[target.id] = value
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            if value is UNKNOWN:
+                for element in target.elts:
+                    self.assign(element, UNKNOWN, scope)
+                return
+            try:
+                values = list(value)
+            except TypeError:
+                raise _Unresolved("cannot unpack a non-iterable value") from None
+            if len(values) != len(target.elts):
+                raise _Unresolved("unpacking mismatch")
+            for element, item in zip(target.elts, values):
+                self.assign(element, item, scope)
+        elif isinstance(target, ast.Subscript):
+            container = self.eval(target.value, scope)
+            if not isinstance(container, (list, dict)):
+                raise _Unresolved("subscript assignment to unknown container")
+            try:
+                container[self.eval(self._slice(target), scope)] = value
+            except (IndexError, TypeError):
+                raise _Unresolved("invalid subscript assignment") from None
+        else:
+            self.assign_other(target, value, scope)
+
+    def assign_other(self, target, value, scope):
+        if not isinstance(target, ast.Attribute):
+            raise _Unresolved(f"unsupported assignment target {type(target).__name__}")
+        owner = self.eval(target.value, scope)
+        if isinstance(owner, _Instance):
+            try:
+                prop = owner.cls.lookup(target.attr)
+            except _Unresolved:
+                prop = None
+            if isinstance(prop, _Property) and prop.fset is not None:
+                self.call_function(prop.fset, [value], {}, bound_self=owner)
+            else:
+                owner.attrs[target.attr] = value
+        elif isinstance(owner, _Class):
+            owner.namespace[target.attr] = value
+        else:
+            raise _Unresolved(f"attribute assignment on unknown value")
+
+    @staticmethod
+    def _slice(node):
+        # Python < 3.9 wraps subscripts in ast.Index
+        index = node.slice
+        return getattr(index, "value", index) if type(index).__name__ == "Index" else index
+
+    # -- expressions ------------------------------------------------------
+
+    def eval(self, node, scope):
+        handler = getattr(self, "eval_" + type(node).__name__, None)
+        if handler is None:
+            raise _Unresolved(f"unsupported expression {type(node).__name__}")
+        return handler(node, scope)
+
+    def eval_Constant(self, node, scope):
+        return node.value
+
+    # Python < 3.8 literal nodes
+    def eval_Num(self, node, scope):
+        return node.n
+
+    def eval_Str(self, node, scope):
+        return node.s
+
+    def eval_NameConstant(self, node, scope):
+        return node.value
+
+    def eval_JoinedStr(self, node, scope):
+        return ""  # f-strings only feed print()/logs
+
+    def eval_Name(self, node, scope):
+        value = self.lookup(node.id, scope)
+        if value is UNKNOWN:
+            raise _Unresolved(f"value of '{node.id}' is not static")
+        return value
+
+    def lookup(self, name: str, scope):
+        while scope is not None:
+            if name in scope:
+                return scope[name]
+            scope = scope.get("__parent__")
+        if name in _SAFE_BUILTINS:
+            return _SAFE_BUILTINS[name]
+        if name in DRONE_FACTORIES:
+            return _Drone
+        if name == "drone":
+            # Scripts that use a global drone without creating it
+            if self.global_drone is None:
+                self.global_drone = _Drone(self)
+            return self.global_drone
+        if name in ("print", "sleep"):
+            return SLEEP if name == "sleep" else print
+        raise _Unresolved(f"unknown name '{name}'")
+
+    def eval_Tuple(self, node, scope):
+        return tuple(self._elements(node.elts, scope))
+
+    def eval_List(self, node, scope):
+        return self._elements(node.elts, scope)
+
+    def eval_Set(self, node, scope):
+        return set(self._elements(node.elts, scope))
+
+    def _elements(self, elements, scope):
+        values = []
+        for element in elements:
+            if isinstance(element, ast.Starred):
+                values.extend(self._iterable(self.eval(element.value, scope)))
+            else:
+                values.append(self.eval(element, scope))
+        return values
+
+    def eval_Dict(self, node, scope):
+        return {self.eval(k, scope): self.eval(v, scope) for k, v in zip(node.keys, node.values)}
+
+    def eval_BinOp(self, node, scope):
+        return _arithmetic(node.op, self.eval(node.left, scope), self.eval(node.right, scope))
+
+    def eval_UnaryOp(self, node, scope):
+        value = self.eval(node.operand, scope)
+        if isinstance(node.op, ast.Not):
+            return not value
+        try:
+            if isinstance(node.op, ast.USub):
+                return -value
+            if isinstance(node.op, ast.UAdd):
+                return +value
+        except TypeError:
+            raise _Unresolved("invalid arithmetic") from None
+        raise _Unresolved("unsupported unary operator")
+
+    @staticmethod
+    def _iterable(value):
+        try:
+            return list(value)
+        except TypeError:
+            raise _Unresolved("cannot unpack a non-iterable value") from None
+
+    def eval_BoolOp(self, node, scope):
+        if isinstance(node.op, ast.And):
+            result = True
+            for value in node.values:
+                result = self.eval(value, scope)
+                if not result:
+                    return result
+            return result
+        result = False
+        for value in node.values:
+            result = self.eval(value, scope)
+            if result:
+                return result
+        return result
+
+    def eval_Compare(self, node, scope):
+        left = self.eval(node.left, scope)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self.eval(comparator, scope)
+            try:
+                if not _COMPARES[type(op)](left, right):
+                    return False
+            except TypeError:
+                raise _Unresolved("invalid comparison") from None
+            left = right
+        return True
+
+    def eval_IfExp(self, node, scope):
+        return self.eval(node.body if self.eval(node.test, scope) else node.orelse, scope)
+
+    def eval_Subscript(self, node, scope):
+        container = self.eval(node.value, scope)
+        index = self._slice(node)
+        if isinstance(index, ast.Slice):
+            key = slice(*(None if part is None else self.eval(part, scope)
+                          for part in (index.lower, index.upper, index.step)))
+        else:
+            key = self.eval(index, scope)
+        try:
+            return container[key]
+        except (KeyError, IndexError, TypeError):
+            raise _Unresolved("subscript of unknown value") from None
+
+    def eval_Attribute(self, node, scope):
+        owner = self.eval(node.value, scope)
+        return self.attribute(owner, node.attr)
+
+    def attribute(self, owner, name: str):
+        if isinstance(owner, _Drone):
+            if name in COMMAND_SIGNATURES or name in ("pose", "set_pose", "tracker"):
+                return getattr(owner, name)
+            raise _Unresolved(f"unknown drone attribute '{name}'")
+        if isinstance(owner, _TimeModule):
+            if name == "sleep":
+                return SLEEP
+            raise _Unresolved(f"time.{name}() is not static")
+        if owner is math:
+            return getattr(math, name)
+        if isinstance(owner, _Instance):
+            if name in owner.attrs:
+                return owner.attrs[name]
+            return self._bind(owner.cls.lookup(name), owner)
+        if isinstance(owner, _Super):
+            return self._bind(owner.instance.cls.lookup(name, after=owner.owner), owner.instance)
+        if isinstance(owner, _Class):
+            return owner.lookup(name)
+        if isinstance(owner, _Function) and name == "__name__":
+            return owner.node.name
+        if isinstance(owner, _Property) and name == "setter":
+            return _PropertySetter(owner)
+        if isinstance(owner, _PLAIN_TYPES + self.helpers) and not name.startswith("_"):
+            try:
+                return getattr(owner, name)
+            except AttributeError:
+                pass
+        raise _Unresolved(f"attribute '{name}' of unknown value")
+
+    def _bind(self, value, instance):
+        if isinstance(value, _Function):
+            return _BoundMethod(value, instance)
+        if isinstance(value, _Property):
+            return self.call_function(value.fget, [], {}, bound_self=instance)
+        return value
+
+    def _comprehension(self, generators, scope, produce):
+        """Evaluate nested comprehension loops in a child scope"""
+        local = {"__parent__": scope}
+
+        def loop(index):
+            if index == len(generators):
+                produce(local)
+                return
+            generator = generators[index]
+            for item in list(self.eval(generator.iter, local)):
+                self.assign(generator.target, item, local)
+                if all(self.eval(test, local) for test in generator.ifs):
+                    loop(index + 1)
+
+        loop(0)
+
+    def eval_ListComp(self, node, scope):
+        values = []
+        self._comprehension(node.generators, scope,
+                            lambda local: values.append(self.eval(node.elt, local)))
+        return values
+
+    eval_GeneratorExp = eval_ListComp
+
+    def eval_SetComp(self, node, scope):
+        return set(self.eval_ListComp(node, scope))
+
+    def eval_DictComp(self, node, scope):
+        values = {}
+
+        def produce(local):
+            values[self.eval(node.key, local)] = self.eval(node.value, local)
+
+        self._comprehension(node.generators, scope, produce)
+        return values
+
+    def eval_Lambda(self, node, scope):
+        body = ast.copy_location(ast.Return(value=node.body), node.body)
+        definition = ast.copy_location(
+            ast.FunctionDef(name="<lambda>", args=node.args, body=[body], decorator_list=[]),
+            node
+        )
+        defaults = [self.eval(default, scope) for default in node.args.defaults]
+        return _Function(definition, scope, defaults)
+
+    def eval_Call(self, node, scope):
+        func = self.eval(node.func, scope)
+        if func is print:
+            return None
+        args = []
+        for arg in node.args:
+            if isinstance(arg, ast.Starred):
+                args.extend(self._iterable(self.eval(arg.value, scope)))
+            else:
+                args.append(self.eval(arg, scope))
+        kwargs = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                mapping = self.eval(keyword.value, scope)
+                if not isinstance(mapping, dict):
+                    raise _Unresolved("** needs a dict")
+                kwargs.update(mapping)
+            else:
+                kwargs[keyword.arg] = self.eval(keyword.value, scope)
+        return self.call(func, args, kwargs, node, scope)
+
+    def call(self, func, args, kwargs, node, scope=None):
+        if isinstance(func, _DroneMethod):
+            return self.record_command(func.name, args, func.drone)
+        if func is SLEEP:
+            self.record_sleep(args[0] if args else kwargs.get("secs", 0))
+            return None
+        if func is _Drone:
+            return _Drone(self)
+        if isinstance(func, _Function):
+            return self.call_function(func, args, kwargs)
+        if isinstance(func, _BoundMethod):
+            return self.call_function(func.function, args, kwargs, bound_self=func.instance)
+        if isinstance(func, _Class):
+            return self.instantiate(func, args, kwargs)
+        if func is super:
+            return _Super(self.lookup("__class__", scope), self.lookup("__self__", scope))
+        if func is property:
+            return _Property(args[0])
+        if isinstance(func, _PropertySetter):
+            return _Property(func.prop.fget, args[0])
+        if isinstance(func, _Wraps):
+            return _Identity()
+        if isinstance(func, _Identity):
+            return args[0]
+        if func is getattr:
+            return self.attribute(args[0], args[1])
+        if func is hasattr:
+            try:
+                self.attribute(args[0], args[1])
+                return True
+            except _Unresolved:
+                return False
+        if self._is_safe_callable(func):
+            args = [self._native(value) for value in args]
+            kwargs = {key: self._native(value) for key, value in kwargs.items()}
+            try:
+                with use_clock(_RecordingClock(self)):
+                    return func(*args, **kwargs)
+            except (_Unresolved,) + _CONTROL:
+                raise
+            except Exception:
+                raise _Unresolved("call raised during static evaluation") from None
+        raise _Unresolved("call to an unknown function")
+
+    def instantiate(self, cls: _Class, args, kwargs):
+        if cls.name in DRONE_FACTORIES:
+            return _Drone(self)
+        instance = _Instance(cls)
+        try:
+            init = cls.lookup("__init__")
+        except _Unresolved:
+            return instance
+        if isinstance(init, _Function):
+            self.call_function(init, args, kwargs, bound_self=instance)
+        return instance
+
+    def _is_safe_callable(self, func) -> bool:
+        """Builtins, math functions, package helpers and methods of plain values, helpers or the drone"""
+        if any(func is builtin for builtin in _SAFE_BUILTINS.values()):
+            return True
+        if any(func is helper for helper in self.helpers):
+            return True
+        if getattr(func, "__module__", None) == "math":
+            return True
+        return isinstance(getattr(func, "__self__", None), _PLAIN_TYPES + self.helpers + (_Drone,))
+
+    def _native(self, value):
+        """Script functions passed to a helper (e.g. an on_step callback) as plain callables"""
+        if isinstance(value, (_Function, _BoundMethod)):
+            return lambda *args, **kwargs: self.call(value, args, kwargs, None)
+        return value
+
+    def call_function(self, function, args, kwargs, bound_self=None):
+        if self.depth >= MAX_DEPTH:
+            raise _Unresolved("recursion too deep")
+        node = function.node
+        if node.name in DRONE_FACTORIES:
+            return _Drone(self)
+        local = {"__parent__": function.scope}
+        params = [a.arg for a in node.args.args]
+        if bound_self is not None:
+            args = [bound_self] + list(args)
+        if function.owner is not None and args:
+            local["__class__"] = function.owner
+            local["__self__"] = args[0]
+        defaults = dict(zip(params[len(params) - len(function.defaults):], function.defaults))
+        for name, value in zip(params, args):
+            local[name] = value
+        for name in params[len(args):]:
+            local[name] = kwargs.pop(name, defaults.get(name, UNKNOWN))
+        if node.args.vararg is not None:
+            local[node.args.vararg.arg] = tuple(args[len(params):])
+        if node.args.kwarg is not None:
+            local[node.args.kwarg.arg] = kwargs
+        self.depth += 1
+        try:
+            self.exec_block(node.body, local)
+        except _Return as result:
+            return result.value
+        finally:
+            self.depth -= 1
+        return None
+
+
+def rewrite_sleeps(events) -> Tuple[List[Tuple[str, Tuple]], int]:
+    """
+    Turn sleeps that pace a drone command into (implicit) completion waits
+
+    The adapters block until a command has finished, so sleeping after a
+    command only waits for it to finish for as long as the command takes
+    (by the flight model). That part of the sleep is dropped. Whatever is
+    left over is a deliberate hover and is kept: ``takeoff(); sleep(10)``
+    keeps sleep(5.0) after the 5 s takeoff. Sleeps before the first
+    command are kept whole.
+
+    Returns:
+        The event list without pacing sleeps, and how many sleeps were
+        removed or shortened
+    """
+    program = []
+    rewritten = 0
+    pacing = 0.0  # seconds of the last command not yet covered by sleeps
+    speed = DEFAULT_SPEED
+    for name, args in events:
+        if name != "sleep":
+            if name == "set_speed" and args:
+                speed = args[0]
+            pacing = command_duration(name, tuple(args), speed)
+            program.append((name, args))
+            continue
+        seconds = args[0]
+        if pacing <= 0:
+            program.append((name, args))
+            continue
+        rewritten += 1
+        hover = seconds - pacing
+        pacing = max(0.0, -hover)
+        if hover > 0:
+            program.append(("sleep", (round(hover, 3),)))
+    return program, rewritten
+
+
+class ConversionResult:
+    """Static flight program extracted from one script"""
+
+    def __init__(self, source: str, sha256: str, commands, original_time: float,
+                 estimated_time: float, waits_rewritten: int, unresolved):
+        self.source = source
+        self.sha256 = sha256
+        self.commands = [tuple(command) for command in commands]
+        self.original_time = original_time
+        self.estimated_time = estimated_time
+        self.waits_rewritten = waits_rewritten
+        self.unresolved = [tuple(item) for item in unresolved]
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": CONVERTER_VERSION,
+            "source": self.source,
+            "sha256": self.sha256,
+            "commands": [list(command) for command in self.commands],
+            "original_time": self.original_time,
+            "estimated_time": self.estimated_time,
+            "waits_rewritten": self.waits_rewritten,
+            "unresolved": [list(item) for item in self.unresolved],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ConversionResult":
+        return cls(data["source"], data["sha256"], data["commands"],
+                   data["original_time"], data["estimated_time"],
+                   data["waits_rewritten"], data["unresolved"])
+
+    def to_json(self) -> str:
+        """Serialized flight program"""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_python(self) -> str:
+        """Straight-line Python equivalent of the flight program"""
+        uses_sleep = any(name == "sleep" for name, *_ in self.commands)
+        lines = [
+            f"# Converted from {os.path.basename(self.source)} by drone_teaching_package.code_converter",
+            f"# Estimated flight time: {self.estimated_time:.1f}s "
+            f"(was {self.original_time:.1f}s with sleep pacing)",
+        ]
+        if uses_sleep:
+            lines.append("from time import sleep")
+        lines += ["", "", "def fly(drone):"]
+        for name, *args in self.commands:
+            if name == "sleep":
+                lines.append(f"    sleep({args[0]!r})")
+            else:
+                lines.append(f"    drone.{format_command(name, tuple(args))}")
+        if not self.commands:
+            lines.append("    pass")
+        return "\n".join(lines) + "\n"
+
+
+def source_hash(source: str, optimize: bool = True) -> str:
+    """Cache key covering the script content and the converter settings"""
+    digest = hashlib.sha256(f"{CONVERTER_VERSION}:{int(optimize)}:".encode())
+    digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def convert_source(source: str, filename: str = "<script>",
+                   optimize: bool = True) -> ConversionResult:
+    """
+    Extract, rewrite and optionally optimize the flight program of a script
+
+    Args:
+        source: Python source of the student script
+        filename: Name used in reports and error messages
+        optimize: Run the peephole compiler on the extracted program
+    """
+    events, unresolved = ScriptExtractor(filename).extract(source)
+    program, removed = rewrite_sleeps(events)
+    if optimize:
+        program = compile_program(program).commands
+    return ConversionResult(
+        filename, source_hash(source, optimize), [(name,) + tuple(args) for name, args in
+                                                  (_split(command) for command in program)],
+        estimate_duration(events), estimate_duration(program), removed, unresolved
+    )
+
+
+def _split(command):
+    name, *args = command
+    if len(args) == 1 and isinstance(args[0], tuple):
+        args = list(args[0])
+    return name, args
+
+
+def convert_file(path: str, optimize: bool = True) -> ConversionResult:
+    with open(path, encoding="utf-8") as file:
+        return convert_source(file.read(), path, optimize)
+
+
+class ConversionCache:
+    """On-disk conversion results keyed by content hash"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[ConversionResult]:
+        try:
+            with open(self._path(key), encoding="utf-8") as file:
+                return ConversionResult.from_dict(json.load(file))
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, key: str, result: ConversionResult):
+        with open(self._path(key), "w", encoding="utf-8") as file:
+            json.dump(result.to_dict(), file)
+
+
+def _convert_job(path: str, optimize: bool) -> Dict:
+    """Process-pool worker; returns a plain dict so it pickles cheaply"""
+    return convert_file(path, optimize).to_dict()
+
+
+def _output_path(path: str, source_dir: str, output_dir: str, fmt: str) -> str:
+    relative = os.path.relpath(path, source_dir)
+    stem = os.path.splitext(relative)[0]
+    suffix = "_flight.py" if fmt == "python" else ".flight.json"
+    return os.path.join(output_dir, stem + suffix)
+
+
+def _write_output(result: ConversionResult, output: str, fmt: str):
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        file.write(result.to_python() if fmt == "python" else result.to_json())
+
+
+def convert_directory(source_dir: str, output_dir: str, fmt: str = "json",
+                      optimize: bool = True, workers: Optional[int] = None,
+                      cache_dir: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Convert every .py script under a directory in parallel
+
+    Args:
+        source_dir: Course directory to scan recursively
+        output_dir: Where converted files are written (mirrors source_dir)
+        fmt: "json" for serialized flight programs, "python" for scripts
+        optimize: Run the peephole compiler on each program
+        workers: Process pool size (defaults to the CPU count)
+        cache_dir: Conversion cache (defaults to output_dir/.cache)
+
+    Returns:
+        (path, status) pairs, status being "cached", "converted" or an error
+        message; a file that fails is reported and the others still convert
+    """
+    cache = ConversionCache(cache_dir or os.path.join(output_dir, ".cache"))
+    statuses = []
+    pending = {}
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, encoding="utf-8") as file:
+                    key = source_hash(file.read(), optimize)
+            except (OSError, UnicodeDecodeError) as e:
+                statuses.append((path, f"unreadable: {e}"))
+                continue
+            output = _output_path(path, source_dir, output_dir, fmt)
+            cached = cache.get(key)
+            if cached is not None:
+                if not os.path.exists(output):
+                    _write_output(cached, output, fmt)
+                statuses.append((path, "cached"))
+            else:
+                pending[path] = (key, output)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {path: pool.submit(_convert_job, path, optimize) for path in pending}
+            for path, future in futures.items():
+                key, output = pending[path]
+                try:
+                    result = ConversionResult.from_dict(future.result())
+                except SyntaxError as e:
+                    statuses.append((path, f"syntax error: {e}"))
+                    continue
+                except Exception as e:  # one bad file must not abort the batch
+                    statuses.append((path, f"failed: {type(e).__name__}: {e}"))
+                    continue
+                cache.put(key, result)
+                _write_output(result, output, fmt)
+                statuses.append((path, "converted"))
+    return statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert drone scripts to static flight programs")
+    parser.add_argument("source", help="Script or directory of scripts")
+    parser.add_argument("-o", "--output", default="converted", help="Output directory")
+    parser.add_argument("--format", choices=("json", "python"), default="json")
+    parser.add_argument("--no-optimize", action="store_true", help="Skip the peephole compiler")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    optimize = not args.no_optimize
+    if os.path.isfile(args.source):
+        result = convert_file(args.source, optimize)
+        print(result.to_python() if args.format == "python" else result.to_json())
+        return
+
+    for path, status in convert_directory(args.source, args.output, args.format,
+                                          optimize, args.workers):
+        print(f"{status:>10}  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# compiler.py
+"""Flight-program compiler with a peephole optimizer.
+
+Command lists are lowered to a flat list of Instructions, rewritten by a
+set of small peephole passes until nothing changes, and emitted again as
+commands the interpreter (or a lesson loop) can run:
+
+- dead_moves:        drop zero-length moves, full turns and superseded set_speed
+- shortest_rotation: fold adjacent cw/ccw into one turn in the shorter direction
+- cancel_opposites:  up(50) + down(50) -> nothing, up(50) + down(20) -> up(30)
+- merge_moves:       forward(30) + forward(40) -> forward(70)
+
+Every rewrite keeps the drone's final pose and keeps each emitted command
+within the Tello SDK limits; a rewrite that would break either is skipped.
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from drone_teaching_package.flight_model import (
+    LINEAR_MOVES, MAX_MOVE, MAX_ROTATION, MIN_MOVE, ROTATIONS, estimate_duration
+)
+from drone_teaching_package.interpreter import format_command, normalize_command
+
+OPPOSITES = {
+    "up": "down", "down": "up",
+    "left": "right", "right": "left",
+    "forward": "back", "back": "forward",
+}
+
+ROTATION_SIGN = {"cw": 1, "ccw": -1}
+
+# Commands whose single argument adds up when they repeat
+MERGEABLE = frozenset(LINEAR_MOVES + ROTATIONS)
+
+
+class Instruction(NamedTuple):
+    """One command of the intermediate representation"""
+    name: str
+    args: Tuple
+
+    def __str__(self):
+        return format_command(self.name, self.args)
+
+
+class Change(NamedTuple):
+    """A single rewrite performed by a pass"""
+    pass_name: str
+    before: Tuple[Instruction, ...]
+    after: Tuple[Instruction, ...]
+
+    @property
+    def seconds_saved(self) -> float:
+        """Time saved by this rewrite alone, at the default speed"""
+        return estimate_duration(self.before) - estimate_duration(self.after)
+
+    def __str__(self):
+        before = ", ".join(str(op) for op in self.before)
+        after = ", ".join(str(op) for op in self.after) or "(removed)"
+        return f"{self.pass_name}: {before} -> {after}  (~{self.seconds_saved:.1f}s)"
+
+
+def lower(commands) -> List[Instruction]:
+    """Convert a command list in any lesson spelling to Instructions"""
+    return [Instruction(*normalize_command(command)) for command in commands]
+
+
+def emit(program: List[Instruction]) -> List[Tuple]:
+    """Convert Instructions back to (name, *args) command tuples"""
+    return [(op.name,) + tuple(op.args) for op in program]
+
+
+def _valid_move(distance) -> bool:
+    return MIN_MOVE <= distance <= MAX_MOVE
+
+
+def _rotation(net: int) -> List[Instruction]:
+    """Shortest single rotation for a net clockwise angle"""
+    net %= 360
+    if net == 0:
+        return []
+    if net <= 180:
+        return [Instruction("cw", (net,))]
+    return [Instruction("ccw", (360 - net,))]
+
+
+def dead_moves(program: List[Instruction]):
+    """Remove instructions that cannot change the drone's pose or behavior"""
+    out, changes = [], []
+    pending_speed = None  # index in out of a set_speed not yet used by a move
+    for op in program:
+        name, args = op
+        dead = (
+            (name in LINEAR_MOVES and args[0] == 0)
+            or (name in ROTATIONS and args[0] % 360 == 0)
+            or (name == "go" and args[:3] == (0, 0, 0))
+        )
+        if dead:
+            changes.append(Change("dead_moves", (op,), ()))
+            continue
+        if name == "set_speed":
+            if pending_speed is not None:
+                superseded = out.pop(pending_speed)
+                changes.append(Change("dead_moves", (superseded,), ()))
+            pending_speed = len(out)
+        elif name in LINEAR_MOVES:
+            pending_speed = None
+        out.append(op)
+    return out, changes
+
+
+def shortest_rotation(program: List[Instruction]):
+    """Fold each run of adjacent rotations into one turn the short way round"""
+    out, changes = [], []
+    i = 0
+    while i < len(program):
+        if program[i].name not in ROTATIONS:
+            out.append(program[i])
+            i += 1
+            continue
+        j = i
+        net = 0
+        while j < len(program) and program[j].name in ROTATIONS:
+            net += ROTATION_SIGN[program[j].name] * program[j].args[0]
+            j += 1
+        run = tuple(program[i:j])
+        folded = _rotation(net)
+        if len(run) == 1 and folded and folded[0].args == run[0].args:
+            folded = list(run)  # a half turn is as short either way
+        if tuple(folded) != run:
+            changes.append(Change("shortest_rotation", run, tuple(folded)))
+        out.extend(folded)
+        i = j
+    return out, changes
+
+
+def cancel_opposites(program: List[Instruction]):
+    """Cancel adjacent moves in opposite directions along the same axis"""
+    out, changes = [], []
+    for op in program:
+        top = out[-1] if out else None
+        if top is not None and OPPOSITES.get(top.name) == op.name:
+            net = top.args[0] - op.args[0]
+            if net == 0:
+                out.pop()
+                changes.append(Change("cancel_opposites", (top, op), ()))
+                continue
+            name = top.name if net > 0 else op.name
+            if _valid_move(abs(net)):
+                out[-1] = Instruction(name, (abs(net),))
+                changes.append(Change("cancel_opposites", (top, op), (out[-1],)))
+                continue
+        out.append(op)
+    return out, changes
+
+
+def merge_moves(program: List[Instruction]):
+    """
+    Merge adjacent moves in the same direction into one command
+
+    Only single-argument moves merge; repeated commands without a distance
+    (takeoff, land) or with several arguments (go, curve) are left alone.
+    """
+    out, changes = [], []
+    for op in program:
+        top = out[-1] if out else None
+        if op.name in MERGEABLE and top is not None and top.name == op.name:
+            total = top.args[0] + op.args[0]
+            limit = MAX_MOVE if op.name in LINEAR_MOVES else MAX_ROTATION
+            if total <= limit:
+                out[-1] = Instruction(op.name, (total,))
+                changes.append(Change("merge_moves", (top, op), (out[-1],)))
+                continue
+        out.append(op)
+    return out, changes
+
+
+DEFAULT_PASSES: Tuple[Callable, ...] = (
+    dead_moves, shortest_rotation, cancel_opposites, merge_moves
+)
+
+
+class CompileResult:
+    """Optimized program together with what changed and the time it saves"""
+
+    def __init__(self, original: List[Instruction], optimized: List[Instruction],
+                 changes: List[Change]):
+        self.original = original
+        self.optimized = optimized
+        self.changes = changes
+        self.original_time = estimate_duration(original)
+        self.optimized_time = estimate_duration(optimized)
+
+    @property
+    def seconds_saved(self) -> float:
+        return self.original_time - self.optimized_time
+
+    @property
+    def commands(self) -> List[Tuple]:
+        """Optimized program as command tuples"""
+        return emit(self.optimized)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "original_commands": len(self.original),
+            "optimized_commands": len(self.optimized),
+            "original_time": self.original_time,
+            "optimized_time": self.optimized_time,
+            "seconds_saved": self.seconds_saved,
+        }
+
+    def report(self) -> str:
+        """Human-readable diff of the rewrites and the time saved"""
+        lines = [str(change) for change in self.changes]
+        lines.append(
+            f"{len(self.original)} -> {len(self.optimized)} commands, "
+            f"{self.original_time:.1f}s -> {self.optimized_time:.1f}s "
+            f"(saved {self.seconds_saved:.1f}s)"
+        )
+        return "\n".join(lines)
+
+
+def compile_program(commands, passes=DEFAULT_PASSES) -> CompileResult:
+    """
+    Lower a command list and run the peephole passes until a fixed point
+
+    Args:
+        commands: Command list in any spelling accepted by the interpreter
+        passes: Pass functions to run, in order, on every iteration
+
+    Returns:
+        CompileResult with the optimized program and the change log
+    """
+    original = lower(commands)
+    program = list(original)
+    changes = []
+    while True:
+        changed = False
+        for optimization in passes:
+            program, pass_changes = optimization(program)
+            if pass_changes:
+                changes.extend(pass_changes)
+                changed = True
+        if not changed:
+            break
+    return CompileResult(original, program, changes)
@@ -0,0 +1,347 @@
+# conflicts.py
+"""Drone-to-drone conflict detection for planned swarm flights.
+
+Each drone's plan becomes a Track: a path that is piecewise linear in
+space and time. Commands move the drone at a constant rate over their
+modelled duration, and the drone hovers between cues. Curves are
+sampled into short chords. Two drones conflict when, at the same moment,
+they are closer than `separation`.
+
+Checking every pair of legs would cost O(N^2). ConflictDetector instead
+cuts the legs into pieces no longer than one grid cell and one time
+bucket, and hashes each piece into the space-time cells its bounding box
+(grown by half the separation) touches. Only pieces that share a cell
+can conflict, so crowded rooms cost about O(N). Each candidate pair then
+gets an exact swept-segment test: the closest approach of two points
+moving linearly over the time both pieces are flown. All candidate tests
+run as NumPy array operations.
+
+    python -m drone_teaching_package.conflicts --drones 300 --separation 60
+"""
+
+import argparse
+import math
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.flight_model import DEFAULT_SPEED, command_duration
+from drone_teaching_package.interpreter import normalize_command
+from drone_teaching_package.pose import Pose, PoseTracker
+
+DEFAULT_SEPARATION = 100.0  # cm between drone centres
+DEFAULT_BUCKET = 1.0        # seconds per time cell
+ARC_CHORDS = 8              # chords a curve is sampled into
+
+
+class Track(NamedTuple):
+    """A drone's planned path: position at each knot time, linear in between"""
+    drone: int
+    times: np.ndarray     # (K,) seconds, non-decreasing
+    points: np.ndarray    # (K, 3) cm, world frame
+    airborne: np.ndarray  # (K - 1,) the drone is flying between knot k and k + 1
+
+    def position(self, t: float) -> Tuple[float, float, float]:
+        """Interpolated position at time t"""
+        return tuple(float(np.interp(t, self.times, self.points[:, axis])) for axis in range(3))
+
+
+class Conflict(NamedTuple):
+    """Two drones closer than the separation"""
+    a: int
+    b: int
+    start: float     # seconds: first moment they are too close
+    end: float       # seconds: last moment they are too close
+    closest: float   # seconds: moment of closest approach
+    distance: float  # cm at closest approach
+
+
+def _arc_points(middle: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Points along the circle from the origin through `middle` to `end`, excluding the origin"""
+    normal = np.cross(middle, end)
+    area2 = float(normal @ normal)
+    if area2 < 1e-9:
+        return np.array([middle, end], dtype=float)
+    centre = np.cross(middle @ middle * end - end @ end * middle, normal) / (2 * area2)
+    radius = float(np.linalg.norm(centre))
+    u = -centre / radius
+    w = np.cross(normal / math.sqrt(area2), u)
+
+    def angle(point):
+        offset = point - centre
+        return math.atan2(offset @ w, offset @ u) % (2 * math.pi)
+
+    through, final = angle(middle), angle(end)
+    sweep = final if through <= final else final - 2 * math.pi
+    angles = np.linspace(0.0, sweep, ARC_CHORDS + 1)[1:]
+    return centre + radius * (np.cos(angles)[:, None] * u + np.sin(angles)[:, None] * w)
+
+
+class _TrackBuilder:
+    """Accumulate knots while dead-reckoning commands from a start pose"""
+
+    def __init__(self, start: Pose, t: float):
+        self.tracker = PoseTracker(*start)
+        self.flying = start.z > 0
+        self.times = [t]
+        self.points = [(start.x, start.y, start.z)]
+        self.airborne: List[bool] = []
+
+    def _knot(self, t: float, point, airborne: bool):
+        self.times.append(t)
+        self.points.append(tuple(point))
+        self.airborne.append(airborne)
+
+    def hold(self, t: float):
+        """Hover (or wait on the ground) until time t"""
+        if t > self.times[-1]:
+            self._knot(t, self.points[-1], self.flying)
+
+    def command(self, t: float, name: str, args: Tuple, speed: float):
+        self.hold(t)
+        duration = command_duration(name, args, speed)
+        airborne = self.flying or name == "takeoff"
+        if name == "curve":
+            x, y, z = self.points[-1]
+            theta = math.radians(self.tracker.yaw)
+            cos, sin = math.cos(theta), math.sin(theta)
+            body = _arc_points(np.array(args[:3], dtype=float), np.array(args[3:6], dtype=float))
+            for index, (dx, dy, dz) in enumerate(body.tolist(), 1):
+                self._knot(t + duration * index / len(body),
+                           (x + cos * dx - sin * dy, y + sin * dx + cos * dy, z + dz), airborne)
+            self.tracker.apply(name, args)
+            return
+        self.tracker.apply(name, args)
+        pose = self.tracker.pose
+        self._knot(t + duration, (pose.x, pose.y, pose.z), airborne)
+        if name == "takeoff":
+            self.flying = True
+        elif name == "land":
+            self.flying = False
+
+    def build(self, drone: int) -> Track:
+        return Track(drone, np.array(self.times, dtype=float),
+                     np.array(self.points, dtype=float).reshape(-1, 3),
+                     np.array(self.airborne, dtype=bool))
+
+
+def commands_track(drone: int, commands: Sequence, start: Pose, t: float = 0.0,
+                   speed: float = DEFAULT_SPEED) -> Track:
+    """Track of a command list flown back to back from time t"""
+    builder = _TrackBuilder(start, t)
+    for command in commands:
+        name, args = normalize_command(command)
+        if name == "set_speed":
+            speed = args[0]
+        builder.command(builder.times[-1], name, args, speed)
+    return builder.build(drone)
+
+
+def timeline_track(drone: int, timeline: Sequence, start: Pose,
+                   speed: float = DEFAULT_SPEED) -> Track:
+    """Track of a swarm cue timeline; a cue that comes early waits for the last command"""
+    builder = _TrackBuilder(start, 0.0)
+    for cue in timeline:
+        if cue.name == "set_speed":
+            speed = cue.args[0]
+        builder.command(max(cue.at, builder.times[-1]), cue.name, tuple(cue.args), speed)
+    return builder.build(drone)
+
+
+class ConflictDetector:
+    """Find pairs of drones that come closer than a separation"""
+
+    def __init__(self, separation: float = DEFAULT_SEPARATION, cell: Optional[float] = None,
+                 bucket: float = DEFAULT_BUCKET):
+        """
+        Args:
+            separation: Smallest allowed distance between two drones, in cm
+            cell: Grid cell size in cm (defaults to twice the separation)
+            bucket: Time cell size in seconds
+        """
+        if separation <= 0 or bucket <= 0:
+            raise ValueError("separation and bucket must be positive")
+        self.separation = separation
+        self.cell = cell or 2 * separation
+        if self.cell < separation:
+            raise ValueError("cell must be at least the separation")
+        self.bucket = bucket
+        self.candidates = 0  # piece pairs given the exact test by the last find()
+
+    def _pieces(self, tracks: Sequence[Track]):
+        """Cut airborne legs into pieces at most one cell long and one bucket in time"""
+        drones, t0, t1, p0, p1 = [], [], [], [], []
+        for track in tracks:
+            flying = track.airborne & (np.diff(track.times) > 0)
+            drones.append(np.full(int(flying.sum()), track.drone))
+            t0.append(track.times[:-1][flying])
+            t1.append(track.times[1:][flying])
+            p0.append(track.points[:-1][flying])
+            p1.append(track.points[1:][flying])
+        drone = np.concatenate(drones) if drones else np.zeros(0, dtype=int)
+        t0, t1 = np.concatenate(t0) if t0 else np.zeros(0), np.concatenate(t1) if t1 else np.zeros(0)
+        p0 = np.concatenate(p0) if p0 else np.zeros((0, 3))
+        p1 = np.concatenate(p1) if p1 else np.zeros((0, 3))
+        parts = np.maximum(1, np.ceil(np.maximum(
+            np.linalg.norm(p1 - p0, axis=1) / self.cell, (t1 - t0) / self.bucket))).astype(int)
+        leg = np.repeat(np.arange(len(parts)), parts)
+        # Index of each piece within its leg
+        first = np.repeat(np.cumsum(parts) - parts, parts)
+        share0 = (np.arange(len(leg)) - first) / parts[leg]
+        share1 = share0 + 1.0 / parts[leg]
+        span = (t1 - t0)[leg]
+        delta = (p1 - p0)[leg]
+        return (drone[leg], t0[leg] + share0 * span, t0[leg] + share1 * span,
+                p0[leg] + share0[:, None] * delta, p0[leg] + share1[:, None] * delta)
+
+    def _candidates(self, drone, t0, t1, p0, p1) -> np.ndarray:
+        """Pairs of pieces (from different drones) that share a space-time cell"""
+        margin = self.separation / 2
+        low = np.floor((np.minimum(p0, p1) - margin) / self.cell).astype(np.int64)
+        high = np.floor((np.maximum(p0, p1) + margin) / self.cell).astype(np.int64)
+        first, last = np.floor(t0 / self.bucket).astype(np.int64), np.floor(t1 / self.bucket).astype(np.int64)
+        cells: Dict[Tuple[int, int, int, int], List[int]] = defaultdict(list)
+        for piece, (lo, hi, begin, end) in enumerate(zip(low.tolist(), high.tolist(),
+                                                         first.tolist(), last.tolist())):
+            for ix in range(lo[0], hi[0] + 1):
+                for iy in range(lo[1], hi[1] + 1):
+                    for iz in range(lo[2], hi[2] + 1):
+                        for it in range(begin, end + 1):
+                            cells[ix, iy, iz, it].append(piece)
+        owners = drone.tolist()
+        pairs = set()
+        for members in cells.values():
+            if len(members) > 1:
+                pairs.update((i, j) for i, j in combinations(members, 2) if owners[i] != owners[j])
+        return np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+
+    def find(self, tracks: Sequence[Track]) -> List[Conflict]:
+        """
+        All pairs of drones that come closer than the separation
+
+        Returns:
+            One Conflict per pair of drones, ordered by start time
+        """
+        drone, t0, t1, p0, p1 = self._pieces(tracks)
+        pairs = self._candidates(drone, t0, t1, p0, p1)
+        self.candidates = len(pairs)
+        if not len(pairs):
+            return []
+        i, j = pairs[:, 0], pairs[:, 1]
+        start, end = np.maximum(t0[i], t0[j]), np.minimum(t1[i], t1[j])
+        overlap = start <= end
+        i, j, start, end = i[overlap], j[overlap], start[overlap], end[overlap]
+
+        def motion(k):
+            velocity = (p1[k] - p0[k]) / (t1[k] - t0[k])[:, None]
+            return p0[k] + velocity * (start - t0[k])[:, None], velocity
+
+        at_i, v_i = motion(i)
+        at_j, v_j = motion(j)
+        # Relative position d(s) = d0 + dv * s for s in [0, end - start]
+        d0, dv = at_i - at_j, v_i - v_j
+        a = np.einsum("ij,ij->i", dv, dv)
+        b = np.einsum("ij,ij->i", d0, dv)
+        c = np.einsum("ij,ij->i", d0, d0) - self.separation ** 2
+        length = end - start
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nearest = np.clip(np.where(a > 0, -b / a, 0.0), 0.0, length)
+        gap = np.linalg.norm(d0 + dv * nearest[:, None], axis=1)
+        hit = gap < self.separation
+        # When the pair is first and last too close: roots of |d(s)|^2 = separation^2
+        root = np.sqrt(np.maximum(b * b - a * c, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            enter = np.where(a > 0, np.clip((-b - root) / a, 0.0, length), 0.0)
+            leave = np.where(a > 0, np.clip((-b + root) / a, 0.0, length), length)
+
+        found: Dict[Tuple[int, int], Conflict] = {}
+        for k in np.flatnonzero(hit).tolist():
+            a_drone, b_drone = sorted((int(drone[i[k]]), int(drone[j[k]])))
+            conflict = Conflict(a_drone, b_drone, float(start[k] + enter[k]), float(start[k] + leave[k]),
+                                float(start[k] + nearest[k]), float(gap[k]))
+            known = found.get((a_drone, b_drone))
+            if known is not None:
+                closest = conflict if conflict.distance < known.distance else known
+                conflict = Conflict(a_drone, b_drone, min(known.start, conflict.start),
+                                    max(known.end, conflict.end), closest.closest, closest.distance)
+            found[a_drone, b_drone] = conflict
+        return sorted(found.values(), key=lambda conflict: (conflict.start, conflict.a, conflict.b))
+
+
+def format_conflict(conflict: Conflict) -> str:
+    return (f"drones {conflict.a} and {conflict.b}: {conflict.distance:.0f} cm apart at "
+            f"{conflict.closest:.1f}s (too close {conflict.start:.1f}-{conflict.end:.1f}s)")
+
+
+def _airborne_at(track: Track, times: np.ndarray) -> np.ndarray:
+    leg = np.searchsorted(track.times, times, side="right") - 1
+    inside = (leg >= 0) & (leg < len(track.airborne))
+    return inside & track.airborne[np.clip(leg, 0, max(len(track.airborne) - 1, 0))]
+
+
+def _brute_force(tracks: Sequence[Track], separation: float, step: float = 0.05) -> set:
+    """Pairs found by sampling every pair of tracks in time, to check the detector"""
+    end = max(float(track.times[-1]) for track in tracks)
+    times = np.arange(0.0, end + step, step)
+    positions = np.stack([np.stack([np.interp(times, track.times, track.points[:, axis])
+                                    for axis in range(3)], axis=1) for track in tracks])
+    flying = np.stack([_airborne_at(track, times) for track in tracks])
+    pairs = set()
+    for a, b in combinations(range(len(tracks)), 2):
+        close = np.linalg.norm(positions[a] - positions[b], axis=1) < separation
+        if (close & flying[a] & flying[b]).any():
+            pairs.add((tracks[a].drone, tracks[b].drone))
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check random swarm plans for drone-to-drone conflicts")
+    parser.add_argument("--drones", type=int, default=300)
+    parser.add_argument("--legs", type=int, default=8, help="go legs per drone")
+    parser.add_argument("--room", type=float, default=3000.0, help="Room width in cm")
+    parser.add_argument("--separation", type=float, default=DEFAULT_SEPARATION)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verify", action="store_true",
+                        help="Compare with a brute-force check of every pair (slow)")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    side = int(math.ceil(math.sqrt(args.drones)))
+    tracks = []
+    for drone in range(args.drones):
+        # Launch pads on a grid, random legs that stay in the room
+        x, y = (drone % side + 0.5) * args.room / side, (drone // side + 0.5) * args.room / side
+        start = Pose(x, y, 0.0, 0.0)
+        commands = [("takeoff",)]
+        here = np.array([x, y])
+        for _ in range(args.legs):
+            target = np.clip(here + rng.uniform(-300, 300, 2), 0, args.room)
+            dx, dy = np.round(target - here).astype(int).tolist()
+            if max(abs(dx), abs(dy)) >= 20:
+                commands.append(("go", dx, dy, int(rng.integers(-20, 21)), DEFAULT_SPEED))
+                here = here + (dx, dy)
+        commands.append(("land",))
+        tracks.append(commands_track(drone, commands, start))
+
+    detector = ConflictDetector(args.separation)
+    clock = get_clock()
+    began = clock.perf_counter()
+    conflicts = detector.find(tracks)
+    wall = clock.perf_counter() - began
+    legs = sum(len(track.airborne) for track in tracks)
+    print(f"{args.drones} drones, {legs} legs: {len(conflicts)} conflicting pair(s) found in "
+          f"{wall * 1000:.0f} ms ({detector.candidates} candidate pieces tested)")
+    for conflict in conflicts[:5]:
+        print("  " + format_conflict(conflict))
+    if args.verify:
+        expected = _brute_force(tracks, args.separation)
+        found = {(conflict.a, conflict.b) for conflict in conflicts}
+        print(f"brute force: {len(expected)} pair(s); missed {len(expected - found)}, "
+              f"extra {len(found - expected)}")
+
+
+if __name__ == "__main__":
+    main()
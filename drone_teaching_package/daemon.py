@@ -0,0 +1,346 @@
+# daemon.py
+"""Local drone daemon: one long-lived connection shared by many scripts.
+
+The daemon builds a backend once (paying the simulator or Tello connection
+setup a single time) and serves the adapter API on a Unix socket. Every
+script then connects in milliseconds through DroneClient, which has the
+same methods as the adapters and is registered as the ``daemon`` backend:
+
+    python -m drone_teaching_package.daemon --backend sim &
+    python -m drone_teaching_package.run lesson9 --backend daemon
+
+Protocol: one request per line, ``<command> <arg> <arg>...``, answered by
+``ok [value]`` or ``err <ExceptionType> <message>``. Commands from all
+clients run one at a time, in arrival order.
+"""
+
+import argparse
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+
+from drone_teaching_package.backends import available_backends, create_drone
+from drone_teaching_package.flight_state import DISCONNECTED, FLYING, FlightStateError
+from drone_teaching_package.interpreter import CommandInterpreter, _check_args
+from drone_teaching_package.pose import Pose, format_pose, parse_pose
+from drone_teaching_package.run import DEFAULT_SIMULATOR_KEY
+
+DEFAULT_SOCKET = os.environ.get(
+    "DRONE_DAEMON_SOCKET", os.path.join(tempfile.gettempdir(), "drone_teaching_package.sock")
+)
+
+# Requests answered by the daemon itself rather than the drone
+PING = "ping"
+STATE = "state"
+POSE = "pose"        # "pose" reads the tracked pose, "pose x y z yaw" corrects it
+SESSION = "session"  # picks a session on a multiplexed server (classroom.py)
+
+ENCODING = "utf-8"
+
+
+class DaemonError(Exception):
+    """A command failed inside the daemon"""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+
+
+def encode_request(name: str, args) -> bytes:
+    """Render one request line"""
+    return " ".join([name, *map(str, args)]).encode(ENCODING) + b"\n"
+
+
+def _parse_arg(token: str):
+    for kind in (int, float):
+        try:
+            return kind(token)
+        except ValueError:
+            pass
+    return token
+
+
+def decode_request(line: bytes):
+    """Parse a request line into (name, args)"""
+    name, *tokens = line.decode(ENCODING).split()
+    return name, tuple(_parse_arg(token) for token in tokens)
+
+
+class _DroneHandler(socketserver.StreamRequestHandler):
+    """Serve one client connection until it closes"""
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.clients += 1
+
+    def finish(self):
+        super().finish()
+        self.server.client_left()
+
+    def handle(self):
+        server = self.server
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                name, args = decode_request(line)
+                with server.lock:
+                    value = server.execute(name, args)
+                reply = "ok" if value is None else f"ok {value}"
+            except Exception as e:
+                message = " ".join(str(e).split())  # keep the reply on one line
+                reply = f"err {type(e).__name__} {message}"
+            self.wfile.write(reply.encode(ENCODING) + b"\n")
+            self.wfile.flush()
+
+
+class DroneDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server that owns a single drone"""
+
+    daemon_threads = True
+
+    def __init__(self, drone, path: str = DEFAULT_SOCKET):
+        """
+        Args:
+            drone: Connected adapter shared by every client
+            path: Filesystem path of the socket
+        """
+        _remove_stale_socket(path)
+        super().__init__(path, _DroneHandler)
+        self.path = path
+        self.drone = drone
+        self.dispatch = CommandInterpreter(drone).dispatch
+        self.lock = threading.Lock()
+        self.clients = 0
+        self.commands_served = 0
+
+    def execute(self, name: str, args):
+        """Run one request against the drone (caller holds self.lock)"""
+        if name == PING:
+            return "pong"
+        if name == STATE:
+            return getattr(self.drone, "state", "unknown")
+        if name == POSE:
+            return pose_request(self.drone, args)
+        _check_args(name, args)
+        if name == "connect" and getattr(self.drone, "state", DISCONNECTED) != DISCONNECTED:
+            return None  # already connected for every client
+        try:
+            func = self.dispatch[name]
+        except KeyError:
+            raise ValueError(f"Drone does not support {name}") from None
+        self.commands_served += 1
+        return func(*args)
+
+    def client_left(self):
+        """Land if the last client went away while the drone was still flying"""
+        with self.lock:
+            self.clients -= 1
+            if self.clients == 0:
+                self.land()
+
+    def land(self):
+        """Land the drone if it is in the air (caller holds self.lock)"""
+        if getattr(self.drone, "is_flying", False):
+            try:
+                self.drone.land()
+            except FlightStateError:
+                pass
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def pose_request(drone, args) -> str:
+    """Answer a POSE request: set the pose if args are given, then report it"""
+    if args:
+        if len(args) != 4:
+            raise ValueError("pose takes x y z yaw")
+        drone.set_pose(*args)
+    return format_pose(drone.pose)
+
+
+def _remove_stale_socket(path: str):
+    """Delete a socket file left by a dead daemon; refuse to replace a live one"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"A drone daemon is already running on {path}")
+    finally:
+        probe.close()
+
+
+class DroneClient:
+    """Adapter-compatible proxy for a drone owned by the daemon"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: float = None, session: str = None):
+        """
+        Args:
+            path: Socket of a running daemon
+            timeout: Seconds to wait for a reply (None waits for the flight to finish).
+                A client that times out is closed, since the late reply would
+                otherwise be read as the answer to the next request.
+            session: Session to join on a classroom multiplexer
+        """
+        self.path = path
+        self._closed = None  # why requests are refused, once closed
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rwb")
+        if session is not None:
+            self.request(SESSION, session)
+
+    def request(self, name: str, *args):
+        """
+        Send one command and wait for its reply
+
+        Raises:
+            socket.timeout: If no reply came in time; the client is closed
+            ConnectionError: If the connection is closed
+        """
+        if self._closed is not None:
+            raise ConnectionError(f"Drone daemon client for {self.path} is closed ({self._closed})")
+        self._file.write(encode_request(name, args))
+        self._file.flush()
+        try:
+            line = self._file.readline()
+        except socket.timeout:
+            self.close(f"no reply to {name} in time")
+            raise
+        if not line:
+            raise ConnectionError(f"Drone daemon on {self.path} closed the connection")
+        status, _, rest = line.decode(ENCODING).rstrip("\n").partition(" ")
+        if status == "ok":
+            return rest or None
+        kind, _, message = rest.partition(" ")
+        if kind == "ValueError":
+            raise ValueError(message)
+        raise DaemonError(kind, message)
+
+    def ping(self) -> bool:
+        return self.request(PING) == "pong"
+
+    @property
+    def state(self) -> str:
+        return self.request(STATE)
+
+    @property
+    def is_flying(self) -> bool:
+        return self.state == FLYING
+
+    @property
+    def pose(self) -> Pose:
+        return parse_pose(self.request(POSE))
+
+    def set_pose(self, x: float, y: float, z: float, yaw: float = 0.0):
+        self.request(POSE, x, y, z, yaw)
+
+    def close(self, reason: str = "closed by the script"):
+        """Close this client's connection; the daemon keeps the drone"""
+        if self._closed is None:
+            self._closed = reason
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def connect(self):
+        self.request("connect")
+
+    def disconnect(self):
+        # The shared drone stays connected for the other clients
+        self.close()
+
+    def takeoff(self):
+        self.request("takeoff")
+
+    def land(self):
+        self.request("land")
+
+    def up(self, dist: int):
+        self.request("up", dist)
+
+    def down(self, dist: int):
+        self.request("down", dist)
+
+    def left(self, dist: int):
+        self.request("left", dist)
+
+    def right(self, dist: int):
+        self.request("right", dist)
+
+    def forward(self, dist: int):
+        self.request("forward", dist)
+
+    def back(self, dist: int):
+        self.request("back", dist)
+
+    def cw(self, degrees: int):
+        self.request("cw", degrees)
+
+    def ccw(self, degrees: int):
+        self.request("ccw", degrees)
+
+    def flip(self, direction: str):
+        self.request("flip", direction)
+
+    def set_speed(self, speed: int):
+        self.request("set_speed", speed)
+
+    def get_battery(self):
+        return self.request("get_battery")
+
+    def go(self, x: int, y: int, z: int, speed: int):
+        self.request("go", x, y, z, speed)
+
+    def curve(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int):
+        self.request("curve", x1, y1, z1, x2, y2, z2, speed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Share one drone connection over a Unix socket")
+    parser.add_argument("--backend", choices=[b for b in available_backends() if b != "daemon"],
+                        default="sim")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--simulator-key",
+                        default=os.environ.get("DRONE_SIMULATOR_KEY", DEFAULT_SIMULATOR_KEY))
+    args = parser.parse_args(argv)
+
+    options = {"simulator_key": args.simulator_key} if args.backend == "sim" else {}
+    drone = create_drone(args.backend, **options)
+    drone.connect()
+    server = DroneDaemon(drone, args.socket)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Drone daemon ({args.backend}) listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down drone daemon")
+    finally:
+        server.server_close()
+        with server.lock:
+            server.land()
+        print(f"Served {server.commands_served} commands")
+
+
+if __name__ == "__main__":
+    main()
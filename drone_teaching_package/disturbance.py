@@ -0,0 +1,266 @@
+# disturbance.py
+"""Wind and execution-error model for offline flights.
+
+In the offline simulator every move ends exactly on target. Real Tellos
+in a drafty gym do not. DisturbanceModel adds four kinds of error:
+
+- a constant wind field, plus a per-drone offset,
+- gusts, modelled as an Ornstein-Uhlenbeck process in time,
+- a heading error on every turn,
+- a distance scale error on every move.
+
+The noise for a whole fleet and a whole flight is drawn at once as
+(drones x steps) NumPy arrays. Flying a recorded trace is then a handful
+of array operations, with no loop over drones. A seed makes runs
+reproducible:
+
+    python -m drone_teaching_package.disturbance python-lessons/lesson3.py \\
+        --drones 10000 --wind 15 0 --gusts 10 --seed 1
+"""
+
+import argparse
+import math
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.flight_model import (
+    DEFAULT_SPEED, MOVE_AXES, TAKEOFF_HEIGHT, command_duration, command_power
+)
+from drone_teaching_package.sandbox import run_submission
+
+DEFAULT_GUST_TIME = 2.0  # seconds for a gust to decorrelate
+
+
+class Steps(NamedTuple):
+    """A recorded flight as arrays with one entry per command"""
+    body: np.ndarray      # (S, 3) commanded displacement in the body frame, cm
+    turn: np.ndarray      # (S,) commanded heading change, radians (ccw positive)
+    height: np.ndarray    # (S,) height set outright by takeoff/land, NaN otherwise
+    moving: np.ndarray    # (S,) the command translates the drone
+    airborne: np.ndarray  # (S,) the drone is in the air while it runs
+    hovering: np.ndarray  # (S,) the drone is in the air during the gap after it
+    duration: np.ndarray  # (S,) modelled seconds of the command itself
+    gap: np.ndarray       # (S,) idle seconds before the next command
+    power: np.ndarray     # (S,) watts drawn by the command
+    idle_power: np.ndarray  # (S,) watts drawn during the gap after it
+
+
+def trace_steps(trace) -> Steps:
+    """
+    Convert a trace [(t, name, args), ...] into Steps
+
+    Gaps are the time between commands not explained by the modelled
+    duration (interpreter pauses, sleeps in the script).
+    """
+    body = []
+    turn = []
+    height = []
+    moving = []
+    airborne = []
+    hovering = []
+    duration = []
+    power = []
+    idle_power = []
+    speed = DEFAULT_SPEED
+    flying = False
+    for _, name, args in trace:
+        if name == "set_speed":
+            speed = args[0]
+        step = (0.0, 0.0, 0.0)
+        if name in MOVE_AXES:
+            dx, dy, dz = MOVE_AXES[name]
+            step = (dx * args[0], dy * args[0], dz * args[0])
+        elif name == "go":
+            step = tuple(args[:3])
+        elif name == "curve":
+            step = tuple(args[3:6])
+        body.append(step)
+        turn.append(math.radians(args[0] if name == "ccw" else -args[0] if name == "cw" else 0.0))
+        height.append(TAKEOFF_HEIGHT if name == "takeoff" else 0.0 if name == "land" else math.nan)
+        moving.append(name in MOVE_AXES or name in ("go", "curve"))
+        airborne.append(flying or name == "land")
+        duration.append(command_duration(name, args, speed))
+        power.append(command_power(name, flying or name == "land"))
+        if name == "takeoff":
+            flying = True
+        elif name == "land":
+            flying = False
+        hovering.append(flying)
+        idle_power.append(command_power("sleep", flying))
+    starts = [t for t, _, _ in trace]
+    gap = [max(0.0, later - start - spent) for start, later, spent in zip(starts, starts[1:], duration)]
+    return Steps(
+        np.asarray(body, dtype=float).reshape(-1, 3), np.asarray(turn), np.asarray(height),
+        np.asarray(moving, dtype=bool), np.asarray(airborne, dtype=bool),
+        np.asarray(hovering, dtype=bool), np.asarray(duration),
+        np.asarray(gap + [0.0] if trace else [], dtype=float), np.asarray(power),
+        np.asarray(idle_power),
+    )
+
+
+class Disturbance(NamedTuple):
+    """Noise drawn for a fleet, one row per drone and one column per step"""
+    scale: np.ndarray     # (D, S) factor applied to each commanded distance
+    yaw_error: np.ndarray  # (D, S) heading error added by each turn, radians
+    wind: np.ndarray      # (D, S, 2) mean wind velocity over each step, cm/s
+
+
+class Flight(NamedTuple):
+    """A fleet's flights under one set of disturbances"""
+    positions: np.ndarray  # (D, S + 1, 3) position after each step, starting at the origin
+    heading: np.ndarray   # (D, S) heading after each step, radians
+    seconds: np.ndarray   # (D, S) time taken by each step, gap included
+    disturbance: Disturbance
+
+
+class DisturbanceModel:
+    """Seedable wind, gust, yaw-error and scale-error model"""
+
+    def __init__(self, wind: Sequence[float] = (0.0, 0.0), wind_sigma: float = 0.0,
+                 gust_sigma: float = 0.0, gust_time: float = DEFAULT_GUST_TIME,
+                 yaw_sigma: float = 0.0, scale_sigma: float = 0.0, seed=None):
+        """
+        Args:
+            wind: Constant wind velocity (x, y) in the world frame, cm/s
+            wind_sigma: Standard deviation of each drone's own wind offset, cm/s
+            gust_sigma: Standard deviation of the gust velocity, cm/s
+            gust_time: Correlation time of gusts in seconds
+            yaw_sigma: Standard deviation of each turn's error, degrees
+            scale_sigma: Relative standard deviation of each flown distance
+            seed: Seed (or SeedSequence) for reproducible noise
+        """
+        if gust_time <= 0:
+            raise ValueError("gust_time must be positive")
+        self.wind = np.asarray(wind, dtype=float)
+        if self.wind.shape != (2,):
+            raise ValueError("wind must be an (x, y) velocity")
+        self.wind_sigma = wind_sigma
+        self.gust_sigma = gust_sigma
+        self.gust_time = gust_time
+        self.yaw_sigma = yaw_sigma
+        self.scale_sigma = scale_sigma
+        self._seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self._seed)
+
+    def spawn(self, count: int) -> List["DisturbanceModel"]:
+        """Copies of this model with independent noise streams, e.g. one per worker"""
+        return [DisturbanceModel(self.wind, self.wind_sigma, self.gust_sigma, self.gust_time,
+                                 self.yaw_sigma, self.scale_sigma, seed)
+                for seed in self._seed.spawn(count)]
+
+    def sample(self, seconds: np.ndarray, drones: int = 1) -> Disturbance:
+        """
+        Draw the noise for `drones` flights whose steps last `seconds`
+
+        Gusts follow an Ornstein-Uhlenbeck process, so they stay correlated
+        across short steps and decorrelate over about gust_time seconds.
+
+        Args:
+            seconds: (S,) nominal length of each step
+            drones: Number of flights to draw
+        """
+        seconds = np.asarray(seconds, dtype=float)
+        steps = len(seconds)
+        rng = self.rng
+        scale = 1.0 + rng.normal(0.0, self.scale_sigma, (drones, steps)) if self.scale_sigma \
+            else np.ones((drones, steps))
+        yaw_error = np.radians(rng.normal(0.0, self.yaw_sigma, (drones, steps))) if self.yaw_sigma \
+            else np.zeros((drones, steps))
+        wind = np.broadcast_to(self.wind, (drones, steps, 2)).copy()
+        if self.wind_sigma:
+            wind += rng.normal(0.0, self.wind_sigma, (drones, 1, 2))
+        if self.gust_sigma:
+            decay = np.exp(-seconds / self.gust_time)
+            spread = self.gust_sigma * np.sqrt(1.0 - decay ** 2)
+            shocks = rng.normal(0.0, 1.0, (drones, steps, 2))
+            gust = rng.normal(0.0, self.gust_sigma, (drones, 2))  # stationary start
+            for step in range(steps):
+                gust = decay[step] * gust + spread[step] * shocks[:, step]
+                wind[:, step] += gust
+        return Disturbance(scale, yaw_error, wind)
+
+    def fly(self, steps: Steps, drones: int = 1) -> Flight:
+        """
+        Fly recorded steps `drones` times under freshly drawn disturbances
+
+        A move's distance and duration are both multiplied by its scale
+        error. Wind pushes the drone only while it is airborne, judged
+        separately for the command and for the gap after it: the wait after
+        a takeoff drifts, the wait after a land does not. Takeoff and land
+        still reach their fixed heights.
+        """
+        seconds = steps.duration + steps.gap
+        noise = self.sample(seconds, drones)
+        scale = np.where(steps.moving, noise.scale, 1.0)
+        elapsed = steps.duration * scale + steps.gap
+        heading = np.cumsum(steps.turn + np.where(steps.turn != 0, noise.yaw_error, 0.0), axis=1)
+        body = steps.body * scale[:, :, None]
+        cos, sin = np.cos(heading), np.sin(heading)
+        moves = np.empty(body.shape)
+        moves[:, :, 0] = cos * body[:, :, 0] - sin * body[:, :, 1]
+        moves[:, :, 1] = sin * body[:, :, 0] + cos * body[:, :, 1]
+        airtime = steps.duration * scale * steps.airborne + steps.gap * steps.hovering
+        moves[:, :, :2] += noise.wind * airtime[:, :, None]
+        moves[:, :, 2] = body[:, :, 2]
+
+        positions = np.zeros((drones, len(seconds) + 1, 3))
+        np.cumsum(moves, axis=1, out=positions[:, 1:])
+        # Heights set outright: z restarts from the latest takeoff/land
+        fixed = ~np.isnan(steps.height)
+        if fixed.any():
+            climb = positions[:, 1:, 2]
+            last = np.maximum.accumulate(np.where(fixed, np.arange(len(fixed)), -1))
+            known = last >= 0
+            base = np.where(fixed, steps.height, 0.0)[last[known]]
+            climb[:, known] += base - climb[:, last[known]]
+        return Flight(positions, heading, elapsed, noise)
+
+
+def _summary(flight: Flight, planned: np.ndarray) -> str:
+    end = flight.positions[:, -1, :2]
+    miss = np.linalg.norm(end - planned[-1, :2], axis=1)
+    excursion = np.linalg.norm(flight.positions - planned, axis=2).max(axis=1)
+    q = [50, 95]
+    return "\n".join([
+        f"landing miss (cm): median {np.percentile(miss, q[0]):.0f}, "
+        f"p95 {np.percentile(miss, q[1]):.0f}, max {miss.max():.0f}",
+        f"excursion (cm):    median {np.percentile(excursion, q[0]):.0f}, "
+        f"p95 {np.percentile(excursion, q[1]):.0f}, max {excursion.max():.0f}",
+        f"flight time (s):   median {np.median(flight.seconds.sum(axis=1)):.1f}",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fly a script offline under wind and execution error")
+    parser.add_argument("script", help="Lesson or student script to record")
+    parser.add_argument("--drones", type=int, default=1000, help="Flights to simulate")
+    parser.add_argument("--wind", type=float, nargs=2, default=(0.0, 0.0), metavar=("X", "Y"),
+                        help="Constant wind in cm/s")
+    parser.add_argument("--wind-sigma", type=float, default=2.0, help="Per-drone wind offset (std)")
+    parser.add_argument("--gusts", type=float, default=5.0, help="Gust speed in cm/s (std)")
+    parser.add_argument("--gust-time", type=float, default=DEFAULT_GUST_TIME)
+    parser.add_argument("--yaw", type=float, default=3.0, help="Turn error in degrees (std)")
+    parser.add_argument("--scale", type=float, default=0.05, help="Relative distance error (std)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    result = run_submission(args.script)
+    if not result.ok:
+        parser.error(f"{args.script} failed: {result.error}")
+    steps = trace_steps(result.trace)
+    model = DisturbanceModel(args.wind, args.wind_sigma, args.gusts, args.gust_time,
+                             args.yaw, args.scale, args.seed)
+    planned = DisturbanceModel().fly(steps).positions[0]
+    clock = get_clock()
+    start = clock.perf_counter()
+    flight = model.fly(steps, args.drones)
+    wall = clock.perf_counter() - start
+    print(f"{args.script}: {len(steps.duration)} commands x {args.drones} drones "
+          f"in {wall * 1000:.1f} ms")
+    print(_summary(flight, planned))
+
+
+if __name__ == "__main__":
+    main()
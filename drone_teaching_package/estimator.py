@@ -0,0 +1,96 @@
+# estimator.py
+"""Static flight-time and battery estimates for lesson scripts.
+
+Uses the code converter's static evaluator to collect every drone command
+and sleep a lesson would issue (including the class-based missions run
+from its ``__main__`` block) and prices them with the flight model, so a
+whole course can be budgeted before class without flying anything:
+
+    python -m drone_teaching_package.estimator python-lessons
+"""
+
+import argparse
+import glob
+import os
+import re
+from typing import List
+
+from drone_teaching_package.code_converter import ScriptExtractor
+from drone_teaching_package.flight_model import (
+    BATTERY_RESERVE, battery_percent, estimate_energy
+)
+
+
+class LessonEstimate:
+    """Estimated cost of running one lesson script"""
+
+    def __init__(self, path: str, events, unresolved):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.commands = sum(1 for name, _ in events if name != "sleep")
+        self.flights = sum(1 for name, _ in events if name == "takeoff")
+        self.sleep_seconds = sum(args[0] for name, args in events if name == "sleep")
+        self.seconds, self.joules = estimate_energy(events)
+        self.unresolved = unresolved
+
+    @property
+    def battery_percent(self) -> float:
+        return battery_percent(self.joules)
+
+    @property
+    def fits_on_one_battery(self) -> bool:
+        return self.battery_percent <= 100 - BATTERY_RESERVE
+
+
+def estimate_script(path: str) -> LessonEstimate:
+    """Estimate a single script"""
+    with open(path, encoding="utf-8") as file:
+        source = file.read()
+    events, unresolved = ScriptExtractor(path).extract(source)
+    return LessonEstimate(path, events, unresolved)
+
+
+def _natural_key(path: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
+def estimate_course(directory: str, pattern: str = "lesson*.py") -> List[LessonEstimate]:
+    """Estimate every lesson in a course directory, in lesson order"""
+    paths = sorted(glob.glob(os.path.join(directory, pattern)), key=_natural_key)
+    return [estimate_script(path) for path in paths]
+
+
+def format_report(estimates: List[LessonEstimate]) -> str:
+    """Render estimates as a plain-text table"""
+    lines = [f"{'lesson':<10} {'flights':>7} {'cmds':>5} {'time':>8} {'sleep':>7} "
+             f"{'battery':>8}  fits  unresolved"]
+    for estimate in estimates:
+        lines.append(
+            f"{estimate.name:<10} {estimate.flights:>7} {estimate.commands:>5} "
+            f"{estimate.seconds / 60:>6.1f}m {estimate.sleep_seconds:>6.0f}s "
+            f"{estimate.battery_percent:>7.0f}%  {'yes' if estimate.fits_on_one_battery else 'NO':<4}  "
+            f"{len(estimate.unresolved)}"
+        )
+    total_seconds = sum(e.seconds for e in estimates)
+    total_percent = sum(e.battery_percent for e in estimates)
+    lines.append(f"total: {total_seconds / 60:.1f} min, {total_percent / (100 - BATTERY_RESERVE):.1f} batteries")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate flight time and battery use of lessons")
+    parser.add_argument("directory", nargs="?", default="python-lessons")
+    parser.add_argument("--pattern", default="lesson*.py")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List unresolved statements")
+    args = parser.parse_args(argv)
+
+    estimates = estimate_course(args.directory, args.pattern)
+    print(format_report(estimates))
+    if args.verbose:
+        for estimate in estimates:
+            for line, message in estimate.unresolved:
+                print(f"{estimate.path}:{line}: {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+# events.py
+"""Structured, low-overhead event logging for the drone adapters.
+
+Adapters log events instead of printing:
+
+    log = get_logger("real_tello")
+    log.info("Moving up {} cm", dist)
+
+An event keeps the template and its arguments. It is only formatted
+(``str.format``) by a sink that needs text, so a binary or queued sink
+never formats on the flight path. The level check comes first, and with
+no sink attached every call returns after one comparison. Timestamps come
+from the current clock's monotonic_ns(), so they follow a VirtualClock in
+tests and the harness.
+
+Nothing is printed unless a sink asks for it. The sinks are:
+
+- ConsoleSink: one line per event on stdout. Opt in with
+  ``add_sink(ConsoleSink())``, ``run --log info`` or ``DRONE_LOG=info``.
+- QueueSink: hands events to a background thread that feeds other sinks.
+  The caller only pays for a queue put, and when the queue is full the
+  event is dropped and counted instead of blocking the drone.
+- BinarySink: compact records in a file. Each (source, template) pair is
+  written once and referred to by id after that. read_events() decodes the file.
+
+    python -m drone_teaching_package.events --bench 100000
+    python -m drone_teaching_package.events flight.events
+"""
+
+import argparse
+import io
+import os
+import queue
+import struct
+import sys
+import threading
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from drone_teaching_package.clock import get_clock
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+
+ENV_VAR = "DRONE_LOG"     # e.g. DRONE_LOG=debug turns on the console sink at that level
+DEFAULT_QUEUE = 10000     # events a QueueSink holds before it starts dropping
+MAGIC = b"DTEVENT1"       # first bytes of a BinarySink file
+
+_SimpleQueue = getattr(queue, "SimpleQueue", queue.Queue)  # SimpleQueue is Python 3.7+
+
+_KEY = struct.Struct("<cHHH")     # b"K", key id, source and template byte lengths, then UTF-8
+_EVENT = struct.Struct("<cHqBB")  # b"E", key id, ns, level, arg count, then the arguments
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<H")
+
+
+class Event(NamedTuple):
+    """One logged event, unformatted"""
+    ns: int        # monotonic clock reading
+    level: int
+    source: str    # logger name, e.g. "real_tello"
+    template: str  # str.format template, e.g. "Moving up {} cm"
+    args: tuple
+
+    @property
+    def message(self) -> str:
+        return self.template.format(*self.args) if self.args else self.template
+
+    def format(self) -> str:
+        """'   12.345678 INFO    real_tello: Moving up 50 cm'"""
+        return (f"{self.ns / 1e9:12.6f} {LEVEL_NAMES.get(self.level, self.level):<7} "
+                f"{self.source}: {self.message}")
+
+
+# Sinks are kept in a tuple that is replaced, never mutated, so emitting
+# needs no lock. _threshold is the lowest level any sink wants.
+_sinks = ()
+_threshold = ERROR + 1
+_sinks_lock = threading.Lock()
+
+
+def _update(sinks):
+    global _sinks, _threshold
+    _sinks = tuple(sinks)
+    _threshold = min((sink.level for sink in _sinks), default=ERROR + 1)
+
+
+def add_sink(sink):
+    """
+    Start sending events to a sink
+
+    A sink is any object with a ``level`` attribute, ``write(event)`` and
+    ``close()``.
+
+    Returns:
+        The sink, so it can be created and attached in one line
+    """
+    with _sinks_lock:
+        _update(_sinks + (sink,))
+    return sink
+
+
+def remove_sink(sink, close: bool = True):
+    """Stop sending events to a sink (and close it)"""
+    with _sinks_lock:
+        _update(s for s in _sinks if s is not sink)
+    if close:
+        sink.close()
+
+
+def sinks() -> tuple:
+    return _sinks
+
+
+class EventLogger:
+    """Logs events from one source; get one with get_logger()"""
+
+    def __init__(self, source: str):
+        self.source = source
+
+    def enabled(self, level: int) -> bool:
+        """Whether any sink wants events at this level, to skip costly arguments"""
+        return level >= _threshold
+
+    def log(self, level: int, template: str, *args):
+        if level >= _threshold:
+            self._emit(level, template, args)
+
+    def _emit(self, level: int, template: str, args: tuple):
+        event = Event(get_clock().monotonic_ns(), level, self.source, template, args)
+        for sink in _sinks:
+            if level >= sink.level:
+                sink.write(event)
+
+    def debug(self, template: str, *args):
+        if DEBUG >= _threshold:
+            self._emit(DEBUG, template, args)
+
+    def info(self, template: str, *args):
+        if INFO >= _threshold:
+            self._emit(INFO, template, args)
+
+    def warning(self, template: str, *args):
+        if WARNING >= _threshold:
+            self._emit(WARNING, template, args)
+
+    def error(self, template: str, *args):
+        if ERROR >= _threshold:
+            self._emit(ERROR, template, args)
+
+
+_loggers: Dict[str, EventLogger] = {}
+
+
+def get_logger(source: str) -> EventLogger:
+    """The logger for a source, created on first use"""
+    logger = _loggers.get(source)
+    if logger is None:
+        logger = _loggers.setdefault(source, EventLogger(source))
+    return logger
+
+
+def parse_level(name: Union[str, int]) -> int:
+    """
+    Level number from a name ("info") or number
+
+    Raises:
+        ValueError: For unknown names
+    """
+    if isinstance(name, int) or str(name).isdigit():
+        return int(name)
+    try:
+        return LEVELS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown log level {name!r}; expected one of {', '.join(LEVELS)}") from None
+
+
+class ConsoleSink:
+    """Writes each event's message as a line, like the adapters' old print()"""
+
+    def __init__(self, level: int = INFO, stream=None, timestamps: bool = False):
+        """
+        Args:
+            level: Lowest level written
+            stream: Text stream (defaults to sys.stdout at the time of each write,
+                so redirected output is respected)
+            timestamps: Prefix lines with the monotonic time, level and source
+        """
+        self.level = level
+        self.stream = stream
+        self.timestamps = timestamps
+
+    def write(self, event: Event):
+        stream = self.stream or sys.stdout
+        stream.write((event.format() if self.timestamps else event.message) + "\n")
+
+    def close(self):
+        stream = self.stream or sys.stdout
+        stream.flush()
+
+
+class QueueSink:
+    """Forwards events to other sinks from a background thread"""
+
+    def __init__(self, *targets, maxsize: int = DEFAULT_QUEUE):
+        """
+        Args:
+            targets: Sinks written by the background thread
+            maxsize: Events held before new ones are dropped
+        """
+        if not targets:
+            raise ValueError("QueueSink needs at least one target sink")
+        self.targets = targets
+        self.level = min(target.level for target in targets)
+        self.maxsize = maxsize
+        self.dropped = 0
+        # SimpleQueue's put is a fraction of a microsecond, Queue's several
+        self._queue = _SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, event: Event):
+        if self._queue.qsize() >= self.maxsize:
+            self.dropped += 1
+        else:
+            self._queue.put(event)
+
+    def _drain(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            if isinstance(event, threading.Event):  # flush() marker
+                event.set()
+                continue
+            for target in self.targets:
+                if event.level >= target.level:
+                    target.write(event)
+
+    def flush(self):
+        """Wait until every event queued so far has been written"""
+        if self._thread.is_alive():
+            marker = threading.Event()
+            self._queue.put(marker)
+            marker.wait()
+
+    def close(self):
+        """Write the queued events, stop the thread and close the targets"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        for target in self.targets:
+            target.close()
+
+
+class BinarySink:
+    """Appends events to a compact binary file"""
+
+    def __init__(self, file: Union[str, BinaryIO], level: int = DEBUG):
+        """
+        Args:
+            file: Path (overwritten) or binary stream
+            level: Lowest level written
+        """
+        self.level = level
+        self._owned = isinstance(file, (str, os.PathLike))
+        self._file = open(file, "wb") if self._owned else file
+        self._keys: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._file.write(MAGIC)
+
+    def _define(self, key: Tuple[str, str]) -> int:
+        index = self._keys[key] = len(self._keys)
+        source, template = (text.encode("utf-8") for text in key)
+        self._file.write(_KEY.pack(b"K", index, len(source), len(template)) + source + template)
+        return index
+
+    def write(self, event: Event):
+        key = (event.source, event.template)
+        with self._lock:
+            index = self._keys.get(key)
+            if index is None:
+                index = self._define(key)
+            record = _EVENT.pack(b"E", index, event.ns, event.level, len(event.args))
+            if event.args:
+                record += b"".join([_pack_arg(arg) for arg in event.args])
+            self._file.write(record)
+
+    def close(self):
+        with self._lock:
+            if self._owned:
+                self._file.close()
+            else:
+                self._file.flush()
+
+
+def _pack_arg(arg) -> bytes:
+    kind = type(arg)
+    if kind is int and -2 ** 63 <= arg < 2 ** 63:
+        return b"i" + _INT.pack(arg)
+    if kind is float:
+        return b"d" + _FLOAT.pack(arg)
+    if arg is None:
+        return b"n"
+    if kind is bool:
+        return b"t" if arg else b"f"
+    data = str(arg).encode("utf-8")[:0xFFFF]
+    return b"s" + _LENGTH.pack(len(data)) + data
+
+
+def _read(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated event file")
+    return data
+
+
+def read_events(file: Union[str, BinaryIO]) -> Iterator[Event]:
+    """
+    Decode a BinarySink file
+
+    Raises:
+        ValueError: If the file is not an event file or is corrupt
+    """
+    stream = open(file, "rb") if isinstance(file, (str, os.PathLike)) else file
+    try:
+        if stream.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a drone event file")
+        keys: List[Tuple[str, str]] = []
+        while True:
+            tag = stream.read(1)
+            if not tag:
+                return
+            if tag == b"K":
+                _, _, source, template = _KEY.unpack(tag + _read(stream, _KEY.size - 1))
+                keys.append((_read(stream, source).decode("utf-8"),
+                             _read(stream, template).decode("utf-8")))
+            elif tag == b"E":
+                _, key, ns, level, count = _EVENT.unpack(tag + _read(stream, _EVENT.size - 1))
+                args = []
+                for _ in range(count):
+                    kind = _read(stream, 1)
+                    if kind == b"i":
+                        args.append(_INT.unpack(_read(stream, _INT.size))[0])
+                    elif kind == b"d":
+                        args.append(_FLOAT.unpack(_read(stream, _FLOAT.size))[0])
+                    elif kind == b"s":
+                        length = _LENGTH.unpack(_read(stream, _LENGTH.size))[0]
+                        args.append(_read(stream, length).decode("utf-8"))
+                    elif kind in (b"t", b"f", b"n"):
+                        args.append({b"t": True, b"f": False, b"n": None}[kind])
+                    else:
+                        raise ValueError(f"Unknown argument type {kind!r}")
+                yield Event(ns, level, *keys[key], tuple(args))
+            else:
+                raise ValueError(f"Unknown record type {tag!r}")
+    finally:
+        if stream is not file:
+            stream.close()
+
+
+def configure_from_env(environ=None) -> Optional[ConsoleSink]:
+    """Attach a console sink if DRONE_LOG names a level"""
+    name = (environ if environ is not None else os.environ).get(ENV_VAR)
+    if not name:
+        return None
+    return add_sink(ConsoleSink(parse_level(name)))
+
+
+configure_from_env()
+
+
+def _bench(calls: int):
+    """Time the adapters' logging call under each kind of sink"""
+    log = get_logger("bench")
+    clock = get_clock()
+
+    def per_call(label):
+        start = clock.perf_counter()
+        for dist in range(calls):
+            log.info("Moving up {} cm", dist)
+        print(f"{label:<34} {(clock.perf_counter() - start) / calls * 1e9:8.0f} ns/call")
+
+    saved = _sinks
+    _update(())
+    try:
+        per_call("no sinks (level gated)")
+        devnull = open(os.devnull, "w")
+        sink = add_sink(ConsoleSink(stream=devnull))
+        per_call("console sink (to /dev/null)")
+        remove_sink(sink)
+        devnull.close()
+        sink = add_sink(BinarySink(io.BytesIO()))
+        per_call("binary sink")
+        remove_sink(sink)
+        sink = add_sink(QueueSink(BinarySink(io.BytesIO()), maxsize=calls))
+        per_call("queued binary sink")
+        remove_sink(sink)
+        start = clock.perf_counter()
+        with open(os.devnull, "w") as devnull:
+            for dist in range(calls):
+                print(f"Moving up {dist} cm", file=devnull)
+        print(f"{'print() f-string (to /dev/null)':<34} "
+              f"{(clock.perf_counter() - start) / calls * 1e9:8.0f} ns/call")
+    finally:
+        _update(saved)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a binary event log or time the logger")
+    parser.add_argument("file", nargs="?", help="File written by a BinarySink")
+    parser.add_argument("--level", default="debug", help="Lowest level shown")
+    parser.add_argument("--bench", type=int, metavar="CALLS", help="Time CALLS logging calls")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        _bench(args.bench)
+    if args.file:
+        level = parse_level(args.level)
+        for event in read_events(args.file):
+            if event.level >= level:
+                print(event.format())
+    elif not args.bench:
+        parser.error("give an event file or --bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# flight_model.py
+"""Approximate Tello timing model shared by the compiler and estimators.
+
+The numbers are rough averages measured on a Tello EDU indoors; they are
+good enough to compare two programs or to budget a class session, not to
+predict an individual flight to the second.
+"""
+
+import math
+from typing import Iterable, Tuple
+
+from drone_teaching_package.interpreter import normalize_command
+
+# Tello SDK limits
+MIN_MOVE = 20       # cm
+MAX_MOVE = 500      # cm
+MIN_SPEED = 10      # cm/s
+MAX_SPEED = 100     # cm/s
+MAX_ROTATION = 360  # degrees
+MIN_CURVE_RADIUS = 50    # cm
+MAX_CURVE_RADIUS = 1000  # cm
+MAX_CURVE_SPEED = 60     # cm/s
+
+DEFAULT_SPEED = 50  # cm/s, used until the program calls set_speed
+TAKEOFF_HEIGHT = 80  # cm, hover height reached by takeoff
+YAW_RATE = 90.0     # degrees/s
+TAKEOFF_TIME = 5.0  # seconds, motors on to hover at ~80 cm
+LAND_TIME = 4.0     # seconds
+FLIP_TIME = 2.5     # seconds
+COMMAND_OVERHEAD = 0.6  # seconds per command: round trip, accelerate, settle
+
+# Battery: 1100 mAh at 3.8 V, roughly 13 minutes of hover
+BATTERY_CAPACITY = 1.1 * 3.8 * 3600  # joules
+BATTERY_RESERVE = 20                 # percent kept back, as in MissionPlanner
+HOVER_POWER = 19.0                   # watts, airborne and holding position
+MOVE_POWER = 22.0                    # watts, translating or rotating
+FLIP_POWER = 35.0                    # watts
+GROUND_POWER = 1.5                   # watts, powered on with motors off
+
+LINEAR_MOVES = ("up", "down", "left", "right", "forward", "back")
+ROTATIONS = ("cw", "ccw")
+
+# Body-frame direction of each linear move: x forward, y left, z up
+MOVE_AXES = {
+    "forward": (1.0, 0.0, 0.0),
+    "back": (-1.0, 0.0, 0.0),
+    "left": (0.0, 1.0, 0.0),
+    "right": (0.0, -1.0, 0.0),
+    "up": (0.0, 0.0, 1.0),
+    "down": (0.0, 0.0, -1.0),
+}
+
+
+def _arc(x1, y1, z1, x2, y2, z2) -> Tuple[float, float, float, float]:
+    """Side lengths (start-1, 1-end, start-end) and circumradius of a curve"""
+    a = math.sqrt(x1 * x1 + y1 * y1 + z1 * z1)
+    b = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2 + (z2 - z1) ** 2)
+    c = math.sqrt(x2 * x2 + y2 * y2 + z2 * z2)
+    s = (a + b + c) / 2
+    area = math.sqrt(max(s * (s - a) * (s - b) * (s - c), 0.0))
+    radius = a * b * c / (4 * area) if area > 1e-9 else math.inf
+    return a, b, c, radius
+
+
+def curve_radius(x1, y1, z1, x2, y2, z2) -> float:
+    """Radius of the circle through the origin, point 1 and point 2 (inf if collinear)"""
+    return _arc(x1, y1, z1, x2, y2, z2)[3]
+
+
+def curve_length(x1, y1, z1, x2, y2, z2) -> float:
+    """Length of the circular arc from the origin through point 1 to point 2"""
+    a, b, c, radius = _arc(x1, y1, z1, x2, y2, z2)
+    if math.isinf(radius):
+        return a + b  # collinear points, fly it as two straight legs
+    # Central angle of the arc from start to end, passing through point 1
+    half = min(c / (2 * radius), 1.0)
+    angle = 2 * math.asin(half)
+    if a * a + b * b < c * c:  # point 1 lies on the minor arc
+        return radius * angle
+    return radius * (2 * math.pi - angle)
+
+
+def command_duration(name: str, args: Tuple, speed: float = DEFAULT_SPEED) -> float:
+    """
+    Estimate how long one command takes to complete
+
+    Args:
+        name: Adapter method name
+        args: Positional arguments of the command
+        speed: Current linear speed in cm/s (ignored by go/curve, which carry their own)
+    """
+    if name in LINEAR_MOVES:
+        return COMMAND_OVERHEAD + abs(args[0]) / speed
+    if name in ROTATIONS:
+        return COMMAND_OVERHEAD + abs(args[0]) / YAW_RATE
+    if name == "go":
+        x, y, z, go_speed = args
+        return COMMAND_OVERHEAD + math.sqrt(x * x + y * y + z * z) / go_speed
+    if name == "curve":
+        return COMMAND_OVERHEAD + curve_length(*args[:6]) / args[6]
+    if name == "takeoff":
+        return TAKEOFF_TIME
+    if name == "land":
+        return LAND_TIME
+    if name == "flip":
+        return FLIP_TIME
+    if name == "sleep":
+        return args[0]
+    return COMMAND_OVERHEAD
+
+
+def estimate_duration(commands: Iterable, speed: float = DEFAULT_SPEED) -> float:
+    """Estimate total execution time of a command list, following set_speed calls"""
+    total = 0.0
+    for command in commands:
+        name, args = normalize_command(command)
+        if name == "set_speed":
+            speed = args[0]
+        total += command_duration(name, args, speed)
+    return total
+
+
+def command_power(name: str, flying: bool) -> float:
+    """Average power draw in watts while a command runs"""
+    if name in ("takeoff", "land"):
+        return MOVE_POWER if flying or name == "takeoff" else GROUND_POWER
+    if not flying:
+        return GROUND_POWER
+    if name == "flip":
+        return FLIP_POWER
+    if name in LINEAR_MOVES + ROTATIONS + ("go", "curve"):
+        return MOVE_POWER
+    return HOVER_POWER
+
+
+def estimate_energy(commands, speed: float = DEFAULT_SPEED) -> Tuple[float, float]:
+    """
+    Estimate duration and battery energy of a command list
+
+    Sleeps and queries cost hover power while airborne and ground power
+    otherwise, so pacing sleeps in lesson scripts are accounted for.
+
+    Returns:
+        (seconds, joules)
+    """
+    seconds = 0.0
+    joules = 0.0
+    flying = False
+    for command in commands:
+        name, args = normalize_command(command)
+        if name == "set_speed":
+            speed = args[0]
+        duration = command_duration(name, args, speed)
+        seconds += duration
+        joules += duration * command_power(name, flying)
+        if name == "takeoff":
+            flying = True
+        elif name == "land":
+            flying = False
+    return seconds, joules
+
+
+def battery_percent(joules: float) -> float:
+    """Share of a full battery used by a given amount of energy"""
+    return 100.0 * joules / BATTERY_CAPACITY
@@ -0,0 +1,114 @@
+# flight_state.py
+"""Local flight-state machine shared by the drone adapters.
+
+The adapters consult this table before talking to the device so that a
+command which can never succeed (e.g. ``forward`` while landed) is rejected
+immediately instead of costing a round trip to the drone or simulator.
+"""
+
+DISCONNECTED = "disconnected"
+CONNECTED = "connected"
+FLYING = "flying"
+LANDING = "landing"
+
+STATES = (DISCONNECTED, CONNECTED, FLYING, LANDING)
+
+MOVE_COMMANDS = ("up", "down", "left", "right", "forward", "back",
+                 "cw", "ccw", "flip", "go", "curve")
+
+# Sentinel transition: the command is accepted but nothing is sent.
+IGNORE = None
+
+# state -> {command: (state while running, state after success)}
+_SPEC = {
+    DISCONNECTED: {
+        "connect": (DISCONNECTED, CONNECTED),
+    },
+    CONNECTED: {
+        "connect": (CONNECTED, CONNECTED),
+        "disconnect": (CONNECTED, DISCONNECTED),
+        "takeoff": (CONNECTED, FLYING),
+        "land": IGNORE,  # already on the ground
+        "set_speed": (CONNECTED, CONNECTED),
+        "get_battery": (CONNECTED, CONNECTED),
+    },
+    FLYING: dict(
+        {command: (FLYING, FLYING) for command in MOVE_COMMANDS},
+        land=(LANDING, CONNECTED),
+        set_speed=(FLYING, FLYING),
+        get_battery=(FLYING, FLYING),
+    ),
+    LANDING: {
+        "land": (LANDING, CONNECTED),  # retry after a failed landing
+        "get_battery": (LANDING, LANDING),
+    },
+}
+
+
+def _compile(spec):
+    """Flatten the spec into a single (state, command) lookup table"""
+    table = {}
+    for state, commands in spec.items():
+        for command, transition in commands.items():
+            table[(state, command)] = transition
+    return table
+
+
+TRANSITIONS = _compile(_SPEC)
+
+
+class FlightStateError(Exception):
+    """Raised when a command is not legal in the current flight state"""
+
+    def __init__(self, command: str, state: str):
+        super().__init__(f"Cannot {command} while {state}")
+        self.command = command
+        self.state = state
+
+
+class FlightStateMachine:
+    """Track the flight state of one adapter and gate its commands"""
+
+    def __init__(self, state: str = CONNECTED):
+        """
+        Args:
+            state: Initial state; the adapters start connected because both
+                backends open their connection in the constructor
+        """
+        self.state = state
+        self._after = state
+
+    @property
+    def is_flying(self) -> bool:
+        return self.state == FLYING
+
+    def allows(self, command: str) -> bool:
+        """Check whether a command is legal without changing state"""
+        return (self.state, command) in TRANSITIONS
+
+    def allowed_commands(self):
+        """List the commands accepted in the current state"""
+        return [command for (state, command) in TRANSITIONS if state == self.state]
+
+    def begin(self, command: str) -> bool:
+        """
+        Validate a command before it is sent to the device
+
+        Returns:
+            True if the command should be sent, False if it is a no-op
+
+        Raises:
+            FlightStateError: If the command is illegal in the current state
+        """
+        try:
+            transition = TRANSITIONS[(self.state, command)]
+        except KeyError:
+            raise FlightStateError(command, self.state) from None
+        if transition is IGNORE:
+            return False
+        self.state, self._after = transition
+        return True
+
+    def end(self):
+        """Commit the transition started by the last successful begin()"""
+        self.state = self._after
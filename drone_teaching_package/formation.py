@@ -0,0 +1,388 @@
+# formation.py
+"""Formations for swarm shows and the transitions between them.
+
+A Formation is an (N, 3) NumPy array of slots in world cm, with shape
+builders (line, circle, grid, text) and transforms (translate, rotate,
+scale) that all work on the whole array at once.
+
+plan_transition() moves a swarm from one formation to another:
+
+1. Drones are assigned to target slots by solving a linear assignment
+   problem on squared distances. This gives the least total travel in
+   the least-squares sense, with no crossing paths. If every drone flies
+   its straight path at a speed that makes all of them arrive together,
+   no two drones come closer than 1/sqrt(2) of the slot spacing.
+2. Each drone gets a program of ``go`` commands in its own body frame, or
+   a single ``curve`` lifted over the straight path, with adapter method
+   names. The programs can go straight to swarm.choreograph().
+
+The assignment uses SciPy's linear_sum_assignment when SciPy is
+installed. Otherwise it uses a NumPy shortest-augmenting-path solver
+(O(N^3), about 0.35 s for 500 drones).
+
+    python -m drone_teaching_package.formation --drones 500 --start grid --goal circle
+"""
+
+import argparse
+import math
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.flight_model import (
+    DEFAULT_SPEED, MAX_CURVE_RADIUS, MAX_CURVE_SPEED, MAX_MOVE, MIN_CURVE_RADIUS, MIN_MOVE,
+    MIN_SPEED, TAKEOFF_HEIGHT, curve_length, curve_radius
+)
+
+DEFAULT_SPACING = 100.0  # cm between neighbouring slots
+DEFAULT_LIFT = 50.0      # cm a curved transition rises above the straight path
+
+# Stroke font on a 4 x 6 grid: each letter is a list of polylines "x,y x,y ..."
+_FONT = {
+    "A": ["0,0 2,6 4,0", "1,3 3,3"],
+    "B": ["0,0 0,6 3,6 4,5 4,4 3,3 0,3", "3,3 4,2 4,1 3,0 0,0"],
+    "C": ["4,6 1,6 0,5 0,1 1,0 4,0"],
+    "D": ["0,0 0,6 3,6 4,5 4,1 3,0 0,0"],
+    "E": ["4,6 0,6 0,0 4,0", "0,3 3,3"],
+    "F": ["4,6 0,6 0,0", "0,3 3,3"],
+    "G": ["4,6 1,6 0,5 0,1 1,0 4,0 4,3 2,3"],
+    "H": ["0,0 0,6", "4,0 4,6", "0,3 4,3"],
+    "I": ["1,6 3,6", "2,6 2,0", "1,0 3,0"],
+    "J": ["1,6 4,6", "3,6 3,1 2,0 1,0 0,1"],
+    "K": ["0,0 0,6", "4,6 0,2", "1,3 4,0"],
+    "L": ["0,6 0,0 4,0"],
+    "M": ["0,0 0,6 2,3 4,6 4,0"],
+    "N": ["0,0 0,6 4,0 4,6"],
+    "O": ["1,0 0,1 0,5 1,6 3,6 4,5 4,1 3,0 1,0"],
+    "P": ["0,0 0,6 3,6 4,5 4,4 3,3 0,3"],
+    "Q": ["1,0 0,1 0,5 1,6 3,6 4,5 4,1 3,0 1,0", "2,2 4,0"],
+    "R": ["0,0 0,6 3,6 4,5 4,4 3,3 0,3", "2,3 4,0"],
+    "S": ["4,6 1,6 0,5 0,4 1,3 3,3 4,2 4,1 3,0 0,0"],
+    "T": ["0,6 4,6", "2,6 2,0"],
+    "U": ["0,6 0,1 1,0 3,0 4,1 4,6"],
+    "V": ["0,6 2,0 4,6"],
+    "W": ["0,6 1,0 2,3 3,0 4,6"],
+    "X": ["0,6 4,0", "0,0 4,6"],
+    "Y": ["0,6 2,3 4,6", "2,3 2,0"],
+    "Z": ["0,6 4,6 0,0 4,0"],
+    " ": [],
+}
+_ADVANCE = 6  # grid units from one letter to the next
+
+
+class Formation:
+    """A set of slots (N, 3) in world cm"""
+
+    def __init__(self, slots):
+        self.slots = np.array(slots, dtype=float).reshape(-1, 3)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __repr__(self) -> str:
+        return f"Formation({len(self)} slots, centroid {np.round(self.centroid, 1).tolist()})"
+
+    @property
+    def centroid(self) -> np.ndarray:
+        return self.slots.mean(axis=0)
+
+    def translated(self, dx: float, dy: float, dz: float = 0.0) -> "Formation":
+        return Formation(self.slots + (dx, dy, dz))
+
+    def moved_to(self, x: float, y: float, z: float) -> "Formation":
+        """The same shape with its centroid at (x, y, z)"""
+        return Formation(self.slots - self.centroid + (x, y, z))
+
+    def rotated(self, degrees: float, about: Optional[Sequence[float]] = None) -> "Formation":
+        """Turn counterclockwise about a vertical axis (through the centroid by default)"""
+        centre = self.centroid if about is None else np.asarray(about, dtype=float)
+        theta = math.radians(degrees)
+        rotation = np.array([[math.cos(theta), -math.sin(theta), 0.0],
+                             [math.sin(theta), math.cos(theta), 0.0],
+                             [0.0, 0.0, 1.0]])
+        return Formation((self.slots - centre) @ rotation.T + centre)
+
+    def scaled(self, factor: float, about: Optional[Sequence[float]] = None) -> "Formation":
+        centre = self.centroid if about is None else np.asarray(about, dtype=float)
+        return Formation((self.slots - centre) * factor + centre)
+
+    def min_spacing(self) -> float:
+        """Distance between the two closest slots"""
+        if len(self) < 2:
+            return math.inf
+        gaps = np.linalg.norm(self.slots[:, None] - self.slots[None], axis=2)
+        np.fill_diagonal(gaps, np.inf)
+        return float(gaps.min())
+
+
+def line(count: int, spacing: float = DEFAULT_SPACING, z: float = TAKEOFF_HEIGHT) -> Formation:
+    """Drones side by side along y, centred on the origin"""
+    y = (np.arange(count) - (count - 1) / 2) * spacing
+    return Formation(np.column_stack([np.zeros(count), y, np.full(count, z)]))
+
+
+def circle(count: int, spacing: float = DEFAULT_SPACING, z: float = TAKEOFF_HEIGHT) -> Formation:
+    """Drones evenly round a horizontal circle, `spacing` apart along it"""
+    radius = max(spacing * count / (2 * math.pi), spacing / 2)
+    angles = 2 * math.pi * np.arange(count) / count
+    return Formation(np.column_stack([radius * np.cos(angles), radius * np.sin(angles),
+                                      np.full(count, z)]))
+
+
+def grid(count: int, spacing: float = DEFAULT_SPACING, z: float = TAKEOFF_HEIGHT) -> Formation:
+    """Drones on a square horizontal grid, filled row by row, centred on the origin"""
+    side = int(math.ceil(math.sqrt(count)))
+    index = np.arange(count)
+    x, y = index // side, index % side
+    slots = np.column_stack([x * spacing, y * spacing, np.full(count, z)])
+    return Formation(slots).moved_to(0.0, 0.0, z)
+
+
+def text(word: str, count: int, height: float = 600.0, z: float = TAKEOFF_HEIGHT) -> Formation:
+    """
+    Drones spread evenly along the strokes of a word, standing upright
+
+    Letters read left to right for someone behind the drones looking
+    forward (+x): the word runs along -y and up z, centred on (0, 0, z).
+
+    Raises:
+        ValueError: For characters outside A-Z and space
+    """
+    strokes = []
+    for index, char in enumerate(word.upper()):
+        if char not in _FONT:
+            raise ValueError(f"No formation font glyph for {char!r}")
+        for polyline in _FONT[char]:
+            points = np.array([[float(v) for v in pair.split(",")] for pair in polyline.split()])
+            strokes.append(points + (index * _ADVANCE, 0.0))
+    if not strokes:
+        raise ValueError("Text formation needs at least one letter")
+    segments = np.concatenate([np.stack([s[:-1], s[1:]], axis=1) for s in strokes])  # (S, 2, 2)
+    lengths = np.linalg.norm(segments[:, 1] - segments[:, 0], axis=1)
+    ends = np.cumsum(lengths)
+    # Evenly spaced positions along the strokes, half a step in from each end
+    along = (np.arange(count) + 0.5) * ends[-1] / count
+    which = np.minimum(np.searchsorted(ends, along), len(ends) - 1)
+    share = 1.0 - (ends[which] - along) / lengths[which]
+    points = segments[which, 0] + share[:, None] * (segments[which, 1] - segments[which, 0])
+    scale = height / 6.0
+    slots = np.column_stack([np.zeros(count), -points[:, 0] * scale, points[:, 1] * scale])
+    return Formation(slots).moved_to(0.0, 0.0, z)
+
+
+def _shortest_augmenting_path(cost: np.ndarray) -> np.ndarray:
+    """Column assigned to each row of a (N, M) cost matrix, N <= M, minimizing the total"""
+    rows, cols = cost.shape
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    owner = np.zeros(cols + 1, dtype=int)  # 1-based row holding each column, 0 if free
+    way = np.zeros(cols + 1, dtype=int)
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        shortest = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current = owner[column]
+            reduced = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < shortest[1:])
+            shortest[1:][better] = reduced[better]
+            way[1:][better] = column
+            masked = np.where(free, shortest[1:], np.inf)
+            step = int(np.argmin(masked))
+            delta = masked[step]
+            done = np.flatnonzero(used)
+            u[owner[done]] += delta
+            v[done] -= delta
+            shortest[1:][free] -= delta
+            column = step + 1
+            if owner[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+    assignment = np.empty(rows, dtype=int)
+    taken = np.flatnonzero(owner[1:])
+    assignment[owner[1:][taken] - 1] = taken
+    return assignment
+
+
+def assign(start: np.ndarray, goal: np.ndarray) -> np.ndarray:
+    """
+    Goal slot for each drone, minimizing the sum of squared distances
+
+    Minimizing squared (not plain) distances is what keeps straight,
+    synchronized paths from crossing.
+
+    Args:
+        start: (N, 3) drone positions
+        goal: (M, 3) target slots, M >= N
+    Returns:
+        (N,) index into goal for each drone
+    """
+    start, goal = np.asarray(start, dtype=float), np.asarray(goal, dtype=float)
+    if len(goal) < len(start):
+        raise ValueError(f"{len(start)} drones cannot fill {len(goal)} slots")
+    offsets = start[:, None, :] - goal[None, :, :]
+    cost = np.einsum("ijk,ijk->ij", offsets, offsets)
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(cost)
+        assignment = np.empty(len(start), dtype=int)
+        assignment[rows] = cols
+        return assignment
+    return _shortest_augmenting_path(cost)
+
+
+def closest_approach(start: np.ndarray, goal: np.ndarray) -> float:
+    """
+    Smallest distance between any two drones flying straight from start to
+    goal, all leaving and arriving together
+    """
+    start, goal = np.asarray(start, dtype=float), np.asarray(goal, dtype=float)
+    if len(start) < 2:
+        return math.inf
+    d0 = start[:, None] - start[None]          # relative positions at the start
+    change = (goal[:, None] - goal[None]) - d0  # how they change by the end
+    a = np.einsum("ijk,ijk->ij", change, change)
+    b = np.einsum("ijk,ijk->ij", d0, change)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.clip(np.where(a > 0, -b / a, 0.0), 0.0, 1.0)
+    gaps = np.linalg.norm(d0 + s[:, :, None] * change, axis=2)
+    np.fill_diagonal(gaps, np.inf)
+    return float(gaps.min())
+
+
+class Transition(NamedTuple):
+    """Programs moving a swarm from one formation to another"""
+    assignment: np.ndarray   # (N,) goal slot of each drone
+    targets: np.ndarray      # (N, 3) where each drone ends up
+    programs: List[List[Tuple]]  # per drone, commands such as ("go", x, y, z, speed)
+    distance: float          # total straight-line travel in cm
+    seconds: float           # flying time of the slowest drone, overhead excluded
+
+
+def plan_transition(start, goal, yaws: Optional[Sequence[float]] = None,
+                    speed: int = DEFAULT_SPEED, curved: bool = False,
+                    lift: float = DEFAULT_LIFT) -> Transition:
+    """
+    Assign drones to goal slots and plan synchronized moves
+
+    Every drone flies for the same time: the slowest drone flies at
+    `speed` and the others slow down to arrive with it (but not below the
+    Tello's 10 cm/s, so very short moves arrive a little early). Legs longer
+    than the Tello allows are split into the same number of parts for every
+    drone, so the parts stay in step. A move too short to split that many
+    times flies in fewer parts, each timed like everyone else's, and the
+    drone then waits in its slot. Moves too short for the Tello at all are
+    skipped, leaving that drone within 20 cm of its slot.
+
+    Args:
+        start: Formation or (N, 3) drone positions
+        goal: Formation or (M, 3) target slots, M >= N
+        yaws: Heading of each drone in degrees (default 0), for body-frame moves
+        speed: Speed of the slowest drone in cm/s
+        curved: Fly a single curve rising `lift` cm over the straight path
+            where the Tello allows it, instead of go legs
+        lift: Height of the curve above the middle of the straight path
+    """
+    start = start.slots if isinstance(start, Formation) else np.asarray(start, dtype=float)
+    goal = goal.slots if isinstance(goal, Formation) else np.asarray(goal, dtype=float)
+    yaws = np.zeros(len(start)) if yaws is None else np.asarray(yaws, dtype=float)
+    assignment = assign(start, goal)
+    targets = goal[assignment]
+
+    # Offsets in each drone's body frame
+    world = targets - start
+    theta = np.radians(yaws)
+    cos, sin = np.cos(theta), np.sin(theta)
+    body = np.column_stack([cos * world[:, 0] + sin * world[:, 1],
+                            -sin * world[:, 0] + cos * world[:, 1], world[:, 2]])
+    distances = np.linalg.norm(world, axis=1)
+
+    curves = [None] * len(start)
+    lengths = distances.copy()
+    limits = np.full(len(start), float(speed))
+    if curved:
+        for drone, offset in enumerate(body.tolist()):
+            middle = [offset[0] / 2, offset[1] / 2, offset[2] / 2 + lift]
+            middle_cm, end_cm = [round(v) for v in middle], [round(v) for v in offset]
+            if (MIN_MOVE <= max(map(abs, middle_cm)) <= MAX_MOVE
+                    and MIN_MOVE <= max(map(abs, end_cm)) <= MAX_MOVE
+                    and MIN_CURVE_RADIUS <= curve_radius(*middle_cm, *end_cm) <= MAX_CURVE_RADIUS):
+                curves[drone] = (middle_cm, end_cm)
+                lengths[drone] = curve_length(*middle_cm, *end_cm)
+                limits[drone] = min(speed, MAX_CURVE_SPEED)
+    seconds = float((lengths / limits).max()) if len(start) else 0.0
+    parts = max(1, int(math.ceil(np.abs(body).max(initial=0.0) / MAX_MOVE)))
+
+    programs = []
+    for drone in range(len(start)):
+        program = []
+        largest = np.abs(body[drone]).max()
+        if curves[drone] is not None:
+            own_parts = parts  # a single curve timed over the whole transition
+        else:
+            # As many of the shared parts as keep every part flyable
+            own_parts = min(parts, max(1, int(largest // MIN_MOVE)))
+        move_speed = int(np.clip(round(lengths[drone] * parts / (own_parts * seconds)),
+                                 MIN_SPEED, limits[drone])) if seconds > 0 else speed
+        if curves[drone] is not None:
+            middle_cm, end_cm = curves[drone]
+            program.append(("curve", *middle_cm, *end_cm, move_speed))
+        elif largest >= MIN_MOVE:
+            offset = body[drone]
+            for part in range(own_parts):
+                step = np.rint(offset * (part + 1) / own_parts) - np.rint(offset * part / own_parts)
+                if np.abs(step).max() >= MIN_MOVE:
+                    program.append(("go", *(int(v) for v in step), move_speed))
+        programs.append(program)
+    return Transition(assignment, targets, programs, float(distances.sum()), seconds)
+
+
+def _shape(name: str, count: int, spacing: float) -> Formation:
+    if name == "line":
+        return line(count, spacing)
+    if name == "circle":
+        return circle(count, spacing)
+    if name == "grid":
+        return grid(count, spacing)
+    return text(name, count, height=spacing * 12)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan a transition between two formations")
+    parser.add_argument("--drones", type=int, default=100)
+    parser.add_argument("--start", default="grid", help="line, circle, grid or a word")
+    parser.add_argument("--goal", default="circle", help="line, circle, grid or a word")
+    parser.add_argument("--spacing", type=float, default=DEFAULT_SPACING)
+    parser.add_argument("--curved", action="store_true", help="Fly curves over the straight paths")
+    args = parser.parse_args(argv)
+
+    start = _shape(args.start, args.drones, args.spacing)
+    goal = _shape(args.goal, args.drones, args.spacing).moved_to(*start.centroid)
+    clock = get_clock()
+    began = clock.perf_counter()
+    plan = plan_transition(start, goal, curved=args.curved)
+    wall = clock.perf_counter() - began
+    solver = "scipy" if linear_sum_assignment is not None else "numpy"
+    print(f"{args.drones} drones, {args.start} -> {args.goal}: planned in {wall * 1000:.0f} ms ({solver})")
+    print(f"travel {plan.distance / 100:.0f} m in total, {plan.seconds:.1f}s of flying")
+    naive = start.slots[:len(goal)], goal.slots[:len(start)]
+    print(f"closest approach: {closest_approach(start.slots, plan.targets):.0f} cm "
+          f"(slots in index order: {closest_approach(*naive):.0f} cm; "
+          f"slot spacing {min(start.min_spacing(), goal.min_spacing()):.0f} cm)")
+    if plan.programs:
+        print(f"drone 0: {plan.programs[0]}")
+
+
+if __name__ == "__main__":
+    main()
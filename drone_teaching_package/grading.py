@@ -0,0 +1,267 @@
+# grading.py
+"""Bulk grading of flown traces against a reference program.
+
+Each trace (for example from ``sandbox.py``) is turned into the 3-D path
+it flies. The path is resampled to a fixed number of points and compared
+with the reference path using discrete Fréchet distance (worst deviation)
+and dynamic time warping (mean deviation). Both are computed for a whole
+batch of traces at once, one anti-diagonal of the DP table at a time.
+Time and battery use are priced with the flight model and scored in
+proportion to how much of the reference path was flown, so stopping early
+earns nothing. A run that failed gets no total. Batches are graded on a
+process pool and written as a single CSV table:
+
+    python -m drone_teaching_package.grading traces.jsonl \\
+        --reference python-lessons/lesson1.py -o results.csv
+"""
+
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from drone_teaching_package.flight_model import MOVE_AXES, battery_percent, estimate_energy
+from drone_teaching_package.interpreter import normalize_command
+from drone_teaching_package.pose import PoseTracker
+from drone_teaching_package.sandbox import read_traces, run_submission
+
+DEFAULT_POINTS = 64         # samples per resampled path
+DEFAULT_TOLERANCE = 100.0   # cm of Fréchet distance that scores zero
+DEFAULT_BATCH = 64          # traces per worker task
+
+# Commands that move the drone; turns only change its heading
+MOVES = frozenset(MOVE_AXES) | {"go", "takeoff", "land"}
+
+# Weights of the per-criterion scores in the total
+WEIGHTS = {"shape": 0.6, "time": 0.2, "battery": 0.2}
+
+COLUMNS = ("path", "ok", "commands", "frechet_cm", "dtw_cm", "shape_score", "completion",
+           "seconds", "time_score", "battery_percent", "battery_score", "total", "error")
+
+
+def trace_commands(trace) -> List[tuple]:
+    """Strip timestamps from a trace: [(t, name, args), ...] -> [(name, args), ...]"""
+    return [(name, tuple(args)) for _, name, args in trace]
+
+
+def command_waypoints(commands) -> np.ndarray:
+    """
+    Positions visited by a command list, starting on the ground at the origin
+
+    The commands are dead-reckoned with the adapters' PoseTracker. A curve
+    also visits its control point, so the arc's shape is kept.
+
+    Returns:
+        (N, 3) array of x, y, z in cm, including the start point
+    """
+    tracker = PoseTracker()
+    points = [(0.0, 0.0, 0.0)]
+    for command in commands:
+        name, args = normalize_command(command)
+        if name == "curve":
+            tracker.move(*args[:3])
+            points.append(tracker.pose[:3])
+            tracker.move(args[3] - args[0], args[4] - args[1], args[5] - args[2])
+        else:
+            tracker.apply(name, args)
+            if name not in MOVES:
+                continue  # turns only change the heading
+        points.append(tracker.pose[:3])
+    return np.asarray(points, dtype=float)
+
+
+def resample(points: np.ndarray, count: int = DEFAULT_POINTS) -> np.ndarray:
+    """Resample a polyline to `count` points evenly spaced along its length"""
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    distance = np.concatenate([[0.0], np.cumsum(lengths)])
+    if distance[-1] == 0:
+        return np.repeat(points[:1], count, axis=0)
+    targets = np.linspace(0.0, distance[-1], count)
+    return np.column_stack([np.interp(targets, distance, points[:, axis]) for axis in range(3)])
+
+
+def _alignment(paths: np.ndarray, reference: np.ndarray, frechet: bool) -> np.ndarray:
+    """
+    DTW or discrete Fréchet distance between each path and the reference
+
+    The DP is filled one anti-diagonal at a time; every cell of a diagonal
+    (for every path in the batch) is computed in a single NumPy operation.
+
+    Args:
+        paths: (B, n, 3) batch of resampled paths
+        reference: (m, 3) reference path
+    """
+    batch, n, _ = paths.shape
+    m = len(reference)
+    cost = np.linalg.norm(paths[:, :, None, :] - reference[None, None, :, :], axis=-1)
+    acc = np.full((batch, n + 1, m + 1), np.inf)
+    acc[:, 0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        best = np.minimum(np.minimum(acc[:, i - 1, j], acc[:, i, j - 1]), acc[:, i - 1, j - 1])
+        step = cost[:, i - 1, j - 1]
+        acc[:, i, j] = np.maximum(step, best) if frechet else step + best
+    return acc[:, n, m]
+
+
+def frechet_distance(paths: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Discrete Fréchet distance (cm) of each path in a batch to the reference"""
+    return _alignment(paths, reference, frechet=True)
+
+
+def dtw_distance(paths: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """DTW distance of each path to the reference, as mean cm per aligned step"""
+    return _alignment(paths, reference, frechet=False) / (paths.shape[1] + len(reference))
+
+
+def completion(paths: np.ndarray, reference: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Fraction of the reference's samples each path reaches, in order
+
+    A sample counts when the path comes within `tolerance` cm of it after
+    reaching the previous counted one, so flying the route backwards or
+    hovering at the start does not complete it.
+    """
+    near = np.linalg.norm(paths[:, :, None, :] - reference[None, None, :, :], axis=-1) <= tolerance
+    batch, n, m = near.shape
+    index = np.arange(n)
+    position = np.zeros(batch, dtype=int)  # path sample where the last match happened
+    reached = np.zeros(batch)
+    for j in range(m):
+        candidates = near[:, :, j] & (index[None, :] >= position[:, None])
+        hit = candidates.any(axis=1)
+        position = np.where(hit, candidates.argmax(axis=1), position)
+        reached += hit
+    return reached / m
+
+
+def _ratio_score(reference: float, actual: float, completed: float) -> float:
+    """
+    100 when at or under the reference cost, falling as the cost grows
+
+    Scaled by how much of the reference path was flown, so a program does
+    not score by doing less than asked.
+    """
+    if actual <= 0:
+        return 100.0 * completed if reference <= 0 else 0.0
+    return 100.0 * completed * min(1.0, reference / actual)
+
+
+class Reference:
+    """The reference program a batch of traces is graded against"""
+
+    def __init__(self, commands, points: int = DEFAULT_POINTS):
+        self.commands = list(commands)
+        self.path = resample(command_waypoints(self.commands), points)
+        self.seconds, joules = estimate_energy(self.commands)
+        self.battery_percent = battery_percent(joules)
+
+
+def grade_batch(records: Sequence[dict], reference: Reference,
+                tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """
+    Grade a batch of trace records (as written by sandbox.write_traces)
+
+    Time and battery are scored in proportion to the share of the reference
+    path flown. A record whose run failed gets its scores but no total.
+
+    Returns:
+        One result row per record, keyed by COLUMNS
+    """
+    points = len(reference.path)
+    commands = [trace_commands(record["trace"]) for record in records]
+    paths = np.stack([resample(command_waypoints(c), points) for c in commands])
+    frechet = frechet_distance(paths, reference.path)
+    dtw = dtw_distance(paths, reference.path)
+    completed = completion(paths, reference.path, tolerance)
+    rows = []
+    for record, program, worst, mean, done in zip(records, commands, frechet, dtw, completed):
+        seconds, joules = estimate_energy(program)
+        used = battery_percent(joules)
+        scores = {
+            "shape": 100.0 * max(0.0, 1.0 - worst / tolerance),
+            "time": _ratio_score(reference.seconds, seconds, done),
+            "battery": _ratio_score(reference.battery_percent, used, done),
+        }
+        ok = record.get("error") is None
+        rows.append({
+            "path": record["path"],
+            "ok": ok,
+            "commands": len(program),
+            "frechet_cm": round(float(worst), 1),
+            "dtw_cm": round(float(mean), 1),
+            "shape_score": round(scores["shape"], 1),
+            "completion": round(float(done), 3),
+            "seconds": round(seconds, 1),
+            "time_score": round(scores["time"], 1),
+            "battery_percent": round(used, 1),
+            "battery_score": round(scores["battery"], 1),
+            "total": round(sum(WEIGHTS[key] * scores[key] for key in WEIGHTS), 1) if ok else None,
+            "error": record.get("error") or "",
+        })
+    return rows
+
+
+def grade(records: Sequence[dict], reference: Reference, tolerance: float = DEFAULT_TOLERANCE,
+          workers: Optional[int] = None, batch_size: int = DEFAULT_BATCH) -> List[Dict]:
+    """Grade many trace records on a process pool, keeping their order"""
+    batches = [records[start:start + batch_size] for start in range(0, len(records), batch_size)]
+    if workers == 1 or len(batches) <= 1:
+        return [row for batch in batches for row in grade_batch(batch, reference, tolerance)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        graded = pool.map(grade_batch, batches, [reference] * len(batches), [tolerance] * len(batches))
+        return [row for rows in graded for row in rows]
+
+
+def write_results(rows: Iterable[Dict], path: str):
+    """Write graded rows as a CSV table"""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def load_reference(path: str, points: int = DEFAULT_POINTS) -> Reference:
+    """Build a reference from a script (flown offline) or a trace file (first record)"""
+    if path.endswith(".py"):
+        result = run_submission(path)
+        if not result.ok:
+            raise ValueError(f"Reference script failed: {result.error}")
+        trace = result.trace
+    else:
+        trace = read_traces(path)[0].trace
+    return Reference(trace_commands(trace), points)
+
+
+def _read_records(paths: Iterable[str]) -> List[dict]:
+    return [result.to_dict() for path in paths for result in read_traces(path)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade flown traces against a reference program")
+    parser.add_argument("traces", nargs="+", help="Trace files written by the sandbox (JSON lines)")
+    parser.add_argument("--reference", required=True, help="Reference script (.py) or trace file")
+    parser.add_argument("-o", "--output", default="results.csv")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS, help="Samples per path")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Fréchet distance in cm that scores zero for shape")
+    args = parser.parse_args(argv)
+
+    reference = load_reference(args.reference, args.points)
+    rows = grade(_read_records(args.traces), reference, args.tolerance, args.workers)
+    write_results(rows, args.output)
+    for row in rows:
+        total = "failed" if row["total"] is None else f"{row['total']:>5.1f}"
+        print(f"{os.path.relpath(row['path']):<40} shape {row['shape_score']:>5.1f}  "
+              f"time {row['time_score']:>5.1f}  battery {row['battery_score']:>5.1f}  "
+              f"total {total}")
+    print(f"{len(rows)} traces graded -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
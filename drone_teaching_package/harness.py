@@ -0,0 +1,162 @@
+# harness.py
+"""Run lesson modules headless against an offline drone and a virtual clock.
+
+The harness installs a VirtualClock (both as the package clock and in
+place of the time module's sleep/time/monotonic functions, so lessons that
+still do ``from time import sleep`` fast-forward too), answers input()
+prompts from a script, and hands every get_drone()/adapter constructor an
+OfflineDrone. The full python-lessons course finishes in seconds:
+
+    python -m drone_teaching_package.harness python-lessons
+"""
+
+import argparse
+import builtins
+import contextlib
+import glob
+import importlib
+import io
+import os
+import re
+import runpy
+import time
+from typing import Iterable, List, Optional
+
+from drone_teaching_package.backends import BUILTIN_BACKENDS
+from drone_teaching_package.clock import VirtualClock, get_clock, use_clock
+from drone_teaching_package.offline_drone import OfflineDrone
+
+# Adapter module -> class for the backends lessons construct themselves
+ADAPTER_MODULES = dict(BUILTIN_BACKENDS[name].split(":") for name in ("sim", "real"))
+
+# Answer the "1 or 2" backend prompt; later prompts get FALLBACK_INPUT
+DEFAULT_INPUTS = ("1",)
+FALLBACK_INPUT = "quit"  # ends the interactive loops in the lessons
+
+_TIME_FUNCTIONS = ("sleep", "time", "monotonic", "monotonic_ns", "perf_counter")
+
+
+class LessonRun:
+    """Outcome of one harnessed lesson run"""
+
+    def __init__(self, path: str, drone: OfflineDrone, clock: VirtualClock,
+                 wall_seconds: float, error: Optional[BaseException], output: str):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.drone = drone
+        self.trace = drone.trace
+        self.virtual_seconds = clock.elapsed
+        self.slept = clock.slept
+        self.wall_seconds = wall_seconds
+        self.error = error
+        self.output = output
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@contextlib.contextmanager
+def patched_time(clock):
+    """Point the time module's clock functions at another clock"""
+    saved = {name: getattr(time, name) for name in _TIME_FUNCTIONS}
+    for name in _TIME_FUNCTIONS:
+        setattr(time, name, getattr(clock, name))
+    try:
+        yield
+    finally:
+        for name, function in saved.items():
+            setattr(time, name, function)
+
+
+@contextlib.contextmanager
+def scripted_input(answers: Iterable[str], fallback: str = FALLBACK_INPUT):
+    """Answer input() prompts from a list, then with a fallback answer"""
+    remaining = iter(answers)
+
+    def fake_input(prompt=""):
+        return next(remaining, fallback)
+
+    original = builtins.input
+    builtins.input = fake_input
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+
+@contextlib.contextmanager
+def injected_adapters(drone):
+    """Make both adapter classes construct the given drone"""
+    saved = []
+    for module_name, class_name in ADAPTER_MODULES.items():
+        module = importlib.import_module(module_name)
+        saved.append((module, class_name, getattr(module, class_name)))
+        setattr(module, class_name, lambda *args, **kwargs: drone)
+    try:
+        yield
+    finally:
+        for module, class_name, adapter in saved:
+            setattr(module, class_name, adapter)
+
+
+def run_lesson(path: str, inputs: Iterable[str] = DEFAULT_INPUTS,
+               drone: Optional[OfflineDrone] = None, quiet: bool = True) -> LessonRun:
+    """
+    Run a lesson script as __main__ on a virtual clock
+
+    Args:
+        path: Lesson script to run
+        inputs: Answers for input() prompts, in order
+        drone: Drone to inject (defaults to a fresh OfflineDrone)
+        quiet: Capture the lesson's output instead of printing it
+    """
+    clock = VirtualClock()
+    drone = drone or OfflineDrone(clock=clock)
+    output = io.StringIO()
+    error = None
+    wall_start = get_clock().perf_counter()
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(output))
+            stack.enter_context(contextlib.redirect_stderr(output))
+        stack.enter_context(use_clock(clock))
+        stack.enter_context(patched_time(clock))
+        stack.enter_context(scripted_input(inputs))
+        stack.enter_context(injected_adapters(drone))
+        try:
+            runpy.run_path(path, run_name="__main__")
+        except (Exception, SystemExit) as e:
+            error = e
+    wall_seconds = get_clock().perf_counter() - wall_start
+    return LessonRun(path, drone, clock, wall_seconds, error, output.getvalue())
+
+
+def _natural_key(path: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
+def run_course(directory: str, pattern: str = "lesson*.py", **kwargs) -> List[LessonRun]:
+    """Run every lesson of a course directory in lesson order"""
+    paths = sorted(glob.glob(os.path.join(directory, pattern)), key=_natural_key)
+    return [run_lesson(path, **kwargs) for path in paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run lessons on an offline drone and virtual clock")
+    parser.add_argument("directory", nargs="?", default="python-lessons")
+    parser.add_argument("--pattern", default="lesson*.py")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show lesson output")
+    args = parser.parse_args(argv)
+
+    runs = run_course(args.directory, args.pattern, quiet=not args.verbose)
+    for run in runs:
+        status = "ok" if run.ok else f"error: {run.error!r}"
+        print(f"{run.name:<10} {len(run.trace):>4} cmds  {run.virtual_seconds:>7.1f}s virtual  "
+              f"{run.wall_seconds * 1000:>6.1f}ms wall  {status}")
+    print(f"total: {sum(r.virtual_seconds for r in runs):.1f}s virtual in "
+          f"{sum(r.wall_seconds for r in runs):.2f}s wall")
+
+
+if __name__ == "__main__":
+    main()
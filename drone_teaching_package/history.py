@@ -0,0 +1,232 @@
+# history.py
+"""Compact, bounded flight history for long interactive sessions.
+
+PathStore keeps a flown path in a growable NumPy buffer instead of a list
+of tuples. Points are simplified as they arrive, with an error bound:
+
+- radial distance: a point within `tolerance` of the last kept vertex is
+  not stored;
+- opening window (online Douglas-Peucker): the last vertex keeps sliding
+  forward while every raw point since the previous vertex stays within
+  `tolerance` of the straight segment.
+
+Every raw point therefore lies within `tolerance` of the stored polyline.
+A straight leg is stored as one vertex per WINDOW raw points at most, so
+one sampled a thousand times takes a handful of vertices, not a thousand.
+Distance from home, the farthest excursion and path length (raw or
+simplified) are kept up to date as points arrive, so each query is O(1).
+
+ActionLog replaces a list of timestamped strings. It is a ring buffer of
+(time, action id) pairs and only formats the strings when it is read.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from drone_teaching_package.clock import get_clock
+
+DEFAULT_TOLERANCE = 5.0   # cm
+DEFAULT_CAPACITY = 64     # vertices allocated up front
+WINDOW = 256              # raw points checked per segment before a vertex is forced
+DEFAULT_ACTIONS = 10000   # entries kept by an ActionLog
+
+# Safe for the static script converter to create and call
+STATIC_HELPERS = ("PathStore", "ActionLog")
+
+
+def segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Distance of each point to the segment start-end"""
+    direction = end - start
+    length2 = float(direction @ direction)
+    offsets = points - start
+    if length2 == 0.0:
+        return np.linalg.norm(offsets, axis=1)
+    along = np.clip(offsets @ direction / length2, 0.0, 1.0)
+    return np.linalg.norm(offsets - along[:, None] * direction, axis=1)
+
+
+class PathStore:
+    """Growable 3-D path buffer with online simplification"""
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE, capacity: int = DEFAULT_CAPACITY,
+                 dtype=np.float64):
+        """
+        Args:
+            tolerance: Largest distance (cm) between a raw point and the stored
+                path; 0 keeps every point
+            capacity: Vertices allocated up front (the buffer doubles when full)
+            dtype: Storage type, e.g. np.float32 to halve memory
+        """
+        if tolerance < 0:
+            raise ValueError("tolerance must not be negative")
+        self.tolerance = tolerance
+        self._vertices = np.empty((max(capacity, 2), 3), dtype=dtype)
+        self._size = 0
+        self._window = np.empty((WINDOW, 3))
+        self._window_size = 0
+        self.raw_count = 0
+        self.raw_length = 0.0
+        self._committed_length = 0.0  # simplified length up to the anchor
+        self._last = np.zeros(3)
+        self._home = np.zeros(3)
+        self.max_distance_from_home = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Tuple[float, float, float]]:
+        return (tuple(point) for point in self.vertices.tolist())
+
+    def __getitem__(self, index):
+        return tuple(self.vertices[index].tolist())
+
+    def __repr__(self) -> str:
+        return (f"PathStore({self._size} vertices from {self.raw_count} points, "
+                f"tolerance={self.tolerance})")
+
+    @property
+    def vertices(self) -> np.ndarray:
+        """Read-only (N, 3) view of the stored path"""
+        view = self._vertices[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def home(self) -> Tuple[float, float, float]:
+        return tuple(self._home.tolist())
+
+    @property
+    def last(self) -> Tuple[float, float, float]:
+        """Most recent raw point"""
+        return tuple(self._last.tolist())
+
+    @property
+    def length(self) -> float:
+        """Length of the simplified path in cm"""
+        if self._size < 2:
+            return 0.0
+        return self._committed_length + float(np.linalg.norm(
+            self._vertices[self._size - 1] - self._vertices[self._size - 2]))
+
+    @property
+    def distance_from_home(self) -> float:
+        """Straight-line distance from the first point to the latest one"""
+        return float(np.linalg.norm(self._last - self._home))
+
+    def append(self, point: Sequence[float]):
+        """Add one raw point (x, y, z) in cm"""
+        p = np.asarray(point, dtype=float)
+        if self.raw_count == 0:
+            self._home[:] = p
+        else:
+            self.raw_length += float(np.linalg.norm(p - self._last))
+            self.max_distance_from_home = max(self.max_distance_from_home,
+                                              float(np.linalg.norm(p - self._home)))
+        self._last[:] = p
+        self.raw_count += 1
+
+        if self._size == 0:
+            self._push(p)
+            return
+        tip = self._vertices[self._size - 1]
+        if np.linalg.norm(p - tip) <= self.tolerance and self._window_size < WINDOW:
+            # Radial: close to the last vertex, which already represents it
+            self._remember(p)
+            return
+        if self._size >= 2 and self._window_size < WINDOW:
+            anchor = self._vertices[self._size - 2]
+            window = self._window[:self._window_size]
+            if segment_distances(window, anchor, p).max(initial=0.0) <= self.tolerance:
+                tip[:] = p  # the current leg still explains every point: slide it
+                self._remember(p)
+                return
+        # The tip becomes a fixed vertex and p starts a new leg
+        if self._size >= 2:
+            self._committed_length += float(np.linalg.norm(tip - self._vertices[self._size - 2]))
+        self._window_size = 0
+        self._push(p)
+        self._remember(p)
+
+    def extend(self, points: Sequence[Sequence[float]]):
+        for point in points:
+            self.append(point)
+
+    def _push(self, p: np.ndarray):
+        if self._size == len(self._vertices):
+            grown = np.empty((2 * len(self._vertices), 3), dtype=self._vertices.dtype)
+            grown[:self._size] = self._vertices
+            self._vertices = grown
+        self._vertices[self._size] = p
+        self._size += 1
+
+    def _remember(self, p: np.ndarray):
+        self._window[self._window_size] = p
+        self._window_size += 1
+
+    def clear(self):
+        """Forget the path, keeping the allocated buffer"""
+        self._size = 0
+        self._last[:] = 0.0
+        self._home[:] = 0.0
+        self._window_size = 0
+        self.raw_count = 0
+        self.raw_length = 0.0
+        self._committed_length = 0.0
+        self.max_distance_from_home = 0.0
+
+
+class ActionLog:
+    """Bounded log of timestamped actions, formatted lazily"""
+
+    def __init__(self, maxlen: int = DEFAULT_ACTIONS, clock=None):
+        """
+        Args:
+            maxlen: Entries kept; older ones are overwritten
+            clock: Clock for timestamps (defaults to the current clock)
+        """
+        self.maxlen = maxlen
+        self._clock = clock
+        self._times = np.zeros(maxlen)
+        self._codes = np.zeros(maxlen, dtype=np.int32)
+        self._actions: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._count = 0  # total ever appended
+
+    def append(self, action: str):
+        """Record an action at the current time"""
+        code = self._ids.get(action)
+        if code is None:
+            code = self._ids[action] = len(self._actions)
+            self._actions.append(action)
+        index = self._count % self.maxlen
+        self._times[index] = (self._clock or get_clock()).time()
+        self._codes[index] = code
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, self.maxlen)
+
+    def _order(self) -> np.ndarray:
+        size = len(self)
+        return (np.arange(size) + self._count - size) % self.maxlen
+
+    def entries(self) -> Iterator[Tuple[float, str]]:
+        """(unix time, action) pairs, oldest first"""
+        order = self._order()
+        for t, code in zip(self._times[order].tolist(), self._codes[order].tolist()):
+            yield t, self._actions[code]
+
+    def __iter__(self) -> Iterator[str]:
+        """Entries formatted as 'YYYY-mm-dd HH:MM:SS: action'"""
+        for t, action in self.entries():
+            yield f"{datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S')}: {action}"
+
+    def __getitem__(self, index: int) -> str:
+        return list(self)[index]
+
+    def counts(self) -> Dict[str, int]:
+        """How often each action appears in the kept entries"""
+        codes = np.bincount(self._codes[self._order()], minlength=len(self._actions))
+        return {action: int(n) for action, n in zip(self._actions, codes) if n}
@@ -0,0 +1,79 @@
+# import_bench.py
+"""Cold-start import benchmarks for the package and its backends.
+
+Each case runs in a fresh interpreter, so module caches never hide the
+cost of importing a backend's dependencies:
+
+    python -m drone_teaching_package.import_bench -n 10
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from drone_teaching_package.backends import available_backends
+
+# Baseline cases; main() adds one "lazy <backend>" case per registered backend
+BENCHMARKS = {
+    "package": "import drone_teaching_package",
+    "registry": "import drone_teaching_package.backends",
+    "eager (both adapters)": "import drone_teaching_package.simulated_tello, drone_teaching_package.real_tello",
+}
+
+_LOAD = "from drone_teaching_package.backends import load_backend; load_backend({name!r})"
+
+_TIMER = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(statement: str, repeat: int = 5) -> Optional[List[float]]:
+    """
+    Time a statement in fresh interpreters, so every run is a cold start
+
+    Returns:
+        Seconds per run, or None if the statement fails (e.g. a backend's
+        dependency is not installed)
+    """
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", _TIMER.format(statement=statement)],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True)
+        if result.returncode != 0:
+            return None
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def benchmark_imports(benchmarks: Dict[str, str] = BENCHMARKS, repeat: int = 5) -> str:
+    """Render cold import times of each benchmark as a plain-text table"""
+    lines = [f"{'case':<24} {'median':>9} {'min':>9}"]
+    for label, statement in benchmarks.items():
+        samples = time_import(statement, repeat)
+        if samples is None:
+            lines.append(f"{label:<24} {'n/a':>9} {'n/a':>9}  (import failed)")
+        else:
+            lines.append(f"{label:<24} {statistics.median(samples) * 1000:>7.1f}ms "
+                         f"{min(samples) * 1000:>7.1f}ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time cold imports of the package and its backends")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Fresh interpreters per case")
+    args = parser.parse_args(argv)
+
+    benchmarks = dict(BENCHMARKS)
+    for name in available_backends():
+        benchmarks.setdefault(f"lazy {name}", _LOAD.format(name=name))
+    print(benchmark_imports(benchmarks, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# interpreter.py
+"""Dispatch-table interpreter for lists of drone commands.
+
+Command names are resolved to the adapter's bound methods once, and each
+program is validated when it is loaded, so running it is a tight loop of
+pre-bound calls instead of an ``if/elif`` chain or a ``getattr`` per step.
+"""
+
+import math
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from drone_teaching_package.clock import get_clock
+
+NUMBER = "number"
+DIRECTION = "direction"
+
+FLIP_DIRECTIONS = ("l", "r", "f", "b")
+
+# Classes the static script converter may create and call for real
+STATIC_HELPERS = ("CommandInterpreter",)
+
+# Argument shape for every adapter command
+COMMAND_SIGNATURES = {
+    "connect": (),
+    "takeoff": (),
+    "land": (),
+    "get_battery": (),
+    "up": (NUMBER,),
+    "down": (NUMBER,),
+    "left": (NUMBER,),
+    "right": (NUMBER,),
+    "forward": (NUMBER,),
+    "back": (NUMBER,),
+    "cw": (NUMBER,),
+    "ccw": (NUMBER,),
+    "set_speed": (NUMBER,),
+    "flip": (DIRECTION,),
+    "go": (NUMBER,) * 4,
+    "curve": (NUMBER,) * 7,
+}
+
+
+class Step(NamedTuple):
+    """A validated command bound to an adapter method"""
+    name: str
+    args: Tuple
+    func: Callable
+
+
+class StepTiming(NamedTuple):
+    """Wall-clock time spent in one executed step"""
+    name: str
+    args: Tuple
+    seconds: float
+
+
+def normalize_command(command) -> Tuple[str, Tuple]:
+    """
+    Convert any of the command spellings used in the lessons to (name, args)
+
+    Accepts ("up", 50), ("takeoff", None), ("go", x, y, z, speed),
+    ("go", (x, y, z, speed)) and route dicts such as {"up": 50}.
+    """
+    if isinstance(command, dict):
+        if len(command) != 1:
+            raise ValueError(f"Route step must hold exactly one command: {command}")
+        (name, value), = command.items()
+        command = (name, value)
+    if isinstance(command, str):
+        return command, ()
+    name, *args = command
+    if len(args) == 1:
+        value = args[0]
+        if value is None:
+            args = []
+        elif isinstance(value, (tuple, list)):
+            args = list(value)
+    return name, tuple(args)
+
+
+def format_command(name: str, args: Tuple) -> str:
+    """Render a command the way it would be written in a lesson, e.g. up(50)"""
+    return f"{name}({', '.join(repr(arg) for arg in args)})"
+
+
+def _check_args(name: str, args: Tuple):
+    """Validate the argument shape of a single command"""
+    try:
+        shape = COMMAND_SIGNATURES[name]
+    except KeyError:
+        raise ValueError(f"Unknown command: {name}") from None
+    if len(args) != len(shape):
+        raise ValueError(f"{name} expects {len(shape)} argument(s), got {len(args)}")
+    for kind, value in zip(shape, args):
+        if kind == NUMBER:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{name} expects numeric arguments, got {value!r}")
+            if isinstance(value, float) and not math.isfinite(value):
+                raise ValueError(f"{name} expects finite numbers, got {value!r}")
+        elif value not in FLIP_DIRECTIONS:
+            raise ValueError(f"{name} direction must be one of {FLIP_DIRECTIONS}, got {value!r}")
+
+
+class CommandInterpreter:
+    """Execute command lists against one adapter through a dispatch table"""
+
+    def __init__(self, drone_interface):
+        """
+        Args:
+            drone_interface: Instance of EasyTelloToSimulatedDrone or EasyTelloRealDrone
+        """
+        self.drone = drone_interface
+        self.dispatch = {
+            name: getattr(drone_interface, name)
+            for name in COMMAND_SIGNATURES
+            if callable(getattr(drone_interface, name, None))
+        }
+        self.timings: List[StepTiming] = []
+
+    def load(self, commands) -> List[Step]:
+        """
+        Validate a command list and bind it to the adapter
+
+        Raises:
+            ValueError: If any step is unknown or has the wrong argument shape
+        """
+        program = []
+        for index, command in enumerate(commands):
+            name, args = normalize_command(command)
+            try:
+                _check_args(name, args)
+                func = self.dispatch[name]
+            except KeyError:
+                raise ValueError(f"Step {index}: adapter does not support {name}") from None
+            except ValueError as e:
+                raise ValueError(f"Step {index}: {e}") from None
+            program.append(Step(name, args, func))
+        return program
+
+    def run(self, program, pause: float = 0,
+            on_step: Optional[Callable[[StepTiming], None]] = None) -> List[StepTiming]:
+        """
+        Execute a loaded program (or a raw command list, loaded first)
+
+        Args:
+            program: Steps from load(), or any command list accepted by load()
+            pause: Seconds to wait after each step, on the current clock
+            on_step: Optional callback receiving each StepTiming
+
+        Returns:
+            Per-step timings, also kept in self.timings
+        """
+        if not all(isinstance(step, Step) for step in program):
+            program = self.load(program)
+        timings = []
+        record = timings.append
+        clock = get_clock()
+        now = clock.perf_counter
+        sleep = clock.sleep
+        for name, args, func in program:
+            start = now()
+            func(*args)
+            timing = StepTiming(name, args, now() - start)
+            record(timing)
+            if on_step is not None:
+                on_step(timing)
+            if pause:
+                sleep(pause)
+        self.timings.extend(timings)
+        return timings
+
+
+def summarize_timings(timings: List[StepTiming]) -> Dict[str, Dict[str, float]]:
+    """Aggregate step timings per command name (count, total, mean, max)"""
+    summary = {}
+    for name, _, seconds in timings:
+        stats = summary.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+    for stats in summary.values():
+        stats["mean"] = stats["total"] / stats["count"]
+    return summary
@@ -0,0 +1,365 @@
+# kalman.py
+"""Kalman-filter pose estimate from commanded motion and the state stream.
+
+The adapters' PoseTracker only knows what the drone was told to do. A
+Tello also broadcasts its measured state about ten times a second on UDP
+port 8890: velocity, height, attitude and more. PoseEstimator fuses the two:
+
+- every state sample advances a constant-velocity Kalman filter and
+  corrects it with the measured velocity, height and heading;
+- every completed command is a relative measurement. The drone should
+  now be where it was at the previous command plus the commanded offset,
+  with an uncertainty that grows with the distance flown.
+
+The filter has seven states (x, y, z, vx, vy, vz, yaw). All its matrices
+are allocated once. Measurements are applied one scalar at a time, so an
+update needs no matrix inverse and allocates no arrays.
+
+The simulator publishes no state stream, so offline flights are checked
+against a synthetic one. The true path comes from a DisturbanceModel:
+
+    python -m drone_teaching_package.kalman python-lessons/lesson3.py --wind 15 0 --seed 1
+"""
+
+import argparse
+import math
+import socket
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.pose import Pose, PoseTracker
+
+STATE_PORT = 8890
+STATE_RATE = 10.0   # Hz, state packets sent by a Tello
+MIN_TOF = 10        # cm; the time-of-flight sensor reads this when out of range
+
+# Tello state fields are in the frame the drone faced at power-on with
+# x forward, y right and z down; velocities are in dm/s, heights in cm
+# and yaw in degrees clockwise. Our frame has y left, z up and yaw ccw.
+VELOCITY_UNIT = 10.0  # cm/s per reported unit
+VELOCITY_SIGNS = (1.0, -1.0, -1.0)
+
+X, Y, Z, VX, VY, VZ, YAW = range(7)
+STATE_SIZE = 7
+
+
+class PoseFilter:
+    """Constant-velocity Kalman filter over position, velocity and yaw"""
+
+    def __init__(self, acceleration_sigma: float = 30.0, yaw_rate_sigma: float = 20.0,
+                 velocity_sigma: float = 8.0, height_sigma: float = 4.0, yaw_sigma: float = 2.0):
+        """
+        Args:
+            acceleration_sigma: Process noise of the velocity, cm/s per sqrt(s)
+            yaw_rate_sigma: Process noise of the heading, degrees per sqrt(s)
+            velocity_sigma: Measured velocity noise, cm/s
+            height_sigma: Measured height noise, cm
+            yaw_sigma: Measured heading noise, degrees
+        """
+        self.velocity_variance = velocity_sigma ** 2
+        self.height_variance = height_sigma ** 2
+        self.yaw_variance = yaw_sigma ** 2
+        self.x = np.zeros(STATE_SIZE)
+        self.P = np.zeros((STATE_SIZE, STATE_SIZE))
+        # Process noise per second, scaled by dt at each prediction
+        self._q = np.zeros((STATE_SIZE, STATE_SIZE))
+        self._q[[VX, VY, VZ], [VX, VY, VZ]] = acceleration_sigma ** 2
+        self._q[YAW, YAW] = yaw_rate_sigma ** 2
+        # Scratch space, so that predict() and update() allocate nothing
+        self._F = np.eye(STATE_SIZE)
+        self._Ft = self._F.T
+        self._Q = np.empty((STATE_SIZE, STATE_SIZE))
+        self._FP = np.empty((STATE_SIZE, STATE_SIZE))
+        self._x_next = np.empty(STATE_SIZE)
+        self._gain = np.empty(STATE_SIZE)
+        self._step = np.empty(STATE_SIZE)
+        self._row = np.empty(STATE_SIZE)
+        self._correction = np.empty((STATE_SIZE, STATE_SIZE))
+        self._gain_column = self._gain.reshape(-1, 1)
+        self._row_vector = self._row.reshape(1, -1)
+        self._P_columns = [self.P[:, i] for i in range(STATE_SIZE)]
+        self._P_rows = [self.P[i] for i in range(STATE_SIZE)]
+        self.reset()
+
+    def reset(self, pose: Pose = Pose(0.0, 0.0, 0.0, 0.0), sigma: float = 1.0):
+        """Start from a known pose, at rest"""
+        self.x.fill(0.0)
+        self.x[[X, Y, Z, YAW]] = pose
+        self.P.fill(0.0)
+        np.fill_diagonal(self.P, sigma ** 2)
+
+    @property
+    def pose(self) -> Pose:
+        x = self.x
+        return Pose(float(x[X]), float(x[Y]), float(x[Z]), float(x[YAW]))
+
+    def predict(self, dt: float):
+        """Advance the state by dt seconds at constant velocity"""
+        if dt <= 0:
+            return
+        F = self._F
+        F[X, VX] = F[Y, VY] = F[Z, VZ] = dt
+        np.matmul(F, self.x, out=self._x_next)
+        np.copyto(self.x, self._x_next)
+        np.matmul(F, self.P, out=self._FP)
+        np.matmul(self._FP, self._Ft, out=self.P)
+        np.multiply(self._q, dt, out=self._Q)
+        self.P += self._Q
+
+    def update(self, index: int, value: float, variance: float):
+        """Correct one state component with a scalar measurement"""
+        innovation = value - self.x[index]
+        if index == YAW:
+            innovation = (innovation + 180.0) % 360.0 - 180.0
+        gain = self._gain
+        np.divide(self._P_columns[index], self.P[index, index] + variance, out=gain)
+        np.copyto(self._row, self._P_rows[index])
+        np.multiply(gain, innovation, out=self._step)
+        self.x += self._step
+        np.multiply(self._gain_column, self._row_vector, out=self._correction)
+        self.P -= self._correction
+
+    def update_velocity(self, vx: float, vy: float, vz: float):
+        self.update(VX, vx, self.velocity_variance)
+        self.update(VY, vy, self.velocity_variance)
+        self.update(VZ, vz, self.velocity_variance)
+
+    def update_height(self, z: float):
+        self.update(Z, z, self.height_variance)
+
+    def update_yaw(self, yaw: float):
+        self.update(YAW, yaw, self.yaw_variance)
+
+    def update_pose(self, pose: Pose, sigma: float, yaw_sigma: float):
+        """Correct position and heading with a pseudo-measurement"""
+        variance = sigma ** 2
+        self.update(X, pose.x, variance)
+        self.update(Y, pose.y, variance)
+        self.update(Z, pose.z, variance)
+        self.update(YAW, pose.yaw, yaw_sigma ** 2)
+
+
+def parse_state(packet: bytes) -> Dict[str, float]:
+    """Parse a Tello state packet: b'pitch:0;roll:0;yaw:45;vgx:0;...;\\r\\n'"""
+    fields = {}
+    for item in packet.decode("ascii", "replace").strip().split(";"):
+        key, sep, value = item.partition(":")
+        if sep:
+            try:
+                fields[key] = float(value)
+            except ValueError:
+                pass
+    return fields
+
+
+class PoseEstimator:
+    """Fuse an adapter's commanded motion with measured state"""
+
+    def __init__(self, tracker: PoseTracker, pose_filter: Optional[PoseFilter] = None,
+                 command_sigma: float = 5.0, command_scale: float = 0.05,
+                 command_yaw_sigma: float = 3.0):
+        """
+        Args:
+            tracker: The adapter's dead-reckoning tracker (commanded motion)
+            pose_filter: Filter to drive (defaults to PoseFilter())
+            command_sigma: Error of a commanded move's end point, cm
+            command_scale: Further error per cm flown
+            command_yaw_sigma: Error of a commanded turn, degrees
+        """
+        self.tracker = tracker
+        self.filter = pose_filter or PoseFilter()
+        self.command_sigma = command_sigma
+        self.command_scale = command_scale
+        self.command_yaw_sigma = command_yaw_sigma
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Restart from the tracker's current pose (e.g. after set_pose)"""
+        with self.lock:
+            self.samples = 0
+            self._commanded = self.tracker.pose  # tracker pose at the last completed command
+            self._anchor = self._commanded       # estimate at that moment
+            self._last_time = None
+            self._yaw_zero = None
+            self.filter.reset(self._commanded)
+
+    @property
+    def pose(self) -> Pose:
+        with self.lock:
+            return self.filter.pose
+
+    def _observe_command(self):
+        """Fuse the command completed since the last sample, if any"""
+        commanded = self.tracker.pose
+        if commanded == self._commanded:
+            return
+        last, anchor = self._commanded, self._anchor
+        dx, dy, dz = commanded.x - last.x, commanded.y - last.y, commanded.z - last.z
+        distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+        expected = Pose(anchor.x + dx, anchor.y + dy, anchor.z + dz,
+                        anchor.yaw + commanded.yaw - last.yaw)
+        self.filter.update_pose(expected, self.command_sigma + self.command_scale * distance,
+                                self.command_yaw_sigma)
+        self._commanded = commanded
+        self._anchor = self.filter.pose
+
+    def observe(self, t: float, velocity: Tuple[float, float, float], height: float, yaw: float):
+        """
+        Fuse one state sample given in our frame
+
+        Args:
+            t: Sample time in seconds (any monotonic clock)
+            velocity: (vx, vy, vz) in cm/s, world frame
+            height: Height above the floor in cm
+            yaw: Heading in degrees, counterclockwise
+        """
+        with self.lock:
+            if self._last_time is not None:
+                self.filter.predict(t - self._last_time)
+            self._last_time = t
+            self._observe_command()
+            self.filter.update_velocity(*velocity)
+            self.filter.update_height(height)
+            self.filter.update_yaw(yaw)
+            self.samples += 1
+
+    def observe_tello(self, fields: Dict[str, float], t: float):
+        """Fuse one parsed Tello state packet (see parse_state)"""
+        if self._yaw_zero is None:
+            # IMU yaw is relative to power-on; line it up with the tracker
+            self._yaw_zero = fields.get("yaw", 0.0) + self.tracker.pose.yaw
+        velocity = tuple(sign * VELOCITY_UNIT * fields.get(key, 0.0)
+                         for sign, key in zip(VELOCITY_SIGNS, ("vgx", "vgy", "vgz")))
+        tof = fields.get("tof", 0.0)
+        height = tof if tof > MIN_TOF else fields.get("h", 0.0)
+        self.observe(t, velocity, height, self._yaw_zero - fields.get("yaw", 0.0))
+
+
+class StateStream:
+    """Background listener for the Tello state stream"""
+
+    def __init__(self, estimator: PoseEstimator, port: int = STATE_PORT):
+        self.estimator = estimator
+        self.port = port
+        self.packets = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(("", port))
+        self._socket.settimeout(0.5)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._listen, name="tello-state", daemon=True)
+
+    def start(self) -> "StateStream":
+        self._thread.start()
+        return self
+
+    def _listen(self):
+        buffer = bytearray(1024)
+        clock = get_clock()
+        while not self._stopped.is_set():
+            try:
+                size = self._socket.recv_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.packets += 1
+            self.estimator.observe_tello(parse_state(bytes(buffer[:size])), clock.monotonic())
+
+    def close(self):
+        self._stopped.set()
+        self._socket.close()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+def synthetic_states(truth: np.ndarray, heading: np.ndarray, seconds: np.ndarray,
+                     rate: float = STATE_RATE, velocity_sigma: float = 8.0, height_sigma: float = 4.0,
+                     yaw_sigma: float = 2.0, rng=None) -> Iterator[tuple]:
+    """
+    State samples along a flown path, as a Tello would report them
+
+    Args:
+        truth: (S + 1, 3) positions after each step (Flight.positions[i])
+        heading: (S,) heading after each step in radians (Flight.heading[i])
+        seconds: (S,) duration of each step (Flight.seconds[i])
+
+    Yields:
+        (t, steps completed, velocity, height, yaw in degrees, true position)
+        at `rate` Hz
+    """
+    rng = rng or np.random.default_rng()
+    ends = np.cumsum(seconds)
+    times = np.arange(0.0, ends[-1] if len(ends) else 0.0, 1.0 / rate)
+    done = np.searchsorted(ends, times, side="right")
+    starts = ends - seconds
+    step = np.minimum(done, len(seconds) - 1)
+    fraction = np.clip((times - starts[step]) / np.maximum(seconds[step], 1e-9), 0.0, 1.0)
+    positions = truth[step] + fraction[:, None] * (truth[step + 1] - truth[step])
+    velocity = (truth[step + 1] - truth[step]) / np.maximum(seconds[step], 1e-9)[:, None]
+    velocity += rng.normal(0.0, velocity_sigma, velocity.shape)
+    height = positions[:, 2] + rng.normal(0.0, height_sigma, len(times))
+    yaw = np.degrees(np.concatenate([[0.0], heading])[done]) + rng.normal(0.0, yaw_sigma, len(times))
+    for i, t in enumerate(times):
+        yield float(t), int(done[i]), tuple(velocity[i]), float(height[i]), float(yaw[i]), positions[i]
+
+
+def main(argv=None):
+    from drone_teaching_package.disturbance import DisturbanceModel, trace_steps
+    from drone_teaching_package.sandbox import run_submission
+
+    parser = argparse.ArgumentParser(
+        description="Compare dead reckoning and the Kalman estimate on a synthetic state stream")
+    parser.add_argument("script", help="Lesson or student script to record")
+    parser.add_argument("--wind", type=float, nargs=2, default=(10.0, 0.0), metavar=("X", "Y"))
+    parser.add_argument("--gusts", type=float, default=5.0)
+    parser.add_argument("--yaw", type=float, default=3.0, help="Turn error in degrees (std)")
+    parser.add_argument("--scale", type=float, default=0.05, help="Relative distance error (std)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    result = run_submission(args.script)
+    if not result.ok:
+        parser.error(f"{args.script} failed: {result.error}")
+    steps = trace_steps(result.trace)
+    model = DisturbanceModel(args.wind, gust_sigma=args.gusts, yaw_sigma=args.yaw,
+                             scale_sigma=args.scale, seed=args.seed)
+    flight = model.fly(steps)
+    planned = DisturbanceModel().fly(steps)
+
+    tracker = PoseTracker()
+    estimator = PoseEstimator(tracker)
+    commanded = planned.positions[0]
+    headings = np.degrees(planned.heading[0])
+    dead_reckoning = []
+    fused = []
+    completed = 0
+    clock = get_clock()
+    spent = 0.0
+    for t, done, velocity, height, yaw, true in synthetic_states(
+            flight.positions[0], flight.heading[0], flight.seconds[0], rng=model.rng):
+        if done != completed:
+            completed = done
+            tracker.reset(*commanded[done], headings[done - 1])
+        start = clock.perf_counter()
+        estimator.observe(t, velocity, height, yaw)
+        spent += clock.perf_counter() - start
+        estimate = estimator.filter.x
+        dead_reckoning.append(np.linalg.norm(commanded[completed] - true))
+        fused.append(np.linalg.norm(estimate[:3] - true))
+
+    def summary(errors):
+        errors = np.asarray(errors)
+        return f"rms {np.sqrt(np.mean(errors ** 2)):6.1f}, max {errors.max():6.1f}, final {errors[-1]:6.1f}"
+
+    print(f"{args.script}: {estimator.samples} state samples, "
+          f"{spent / max(estimator.samples, 1) * 1e6:.1f} us per update")
+    print(f"dead reckoning error (cm): {summary(dead_reckoning)}")
+    print(f"Kalman estimate error (cm): {summary(fused)}")
+
+
+if __name__ == "__main__":
+    main()
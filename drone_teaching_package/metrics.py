@@ -0,0 +1,247 @@
+# metrics.py
+"""Per-command latency histograms and outcome counters for drone adapters.
+
+InstrumentedDrone wraps any adapter (real, simulated, offline, daemon).
+It times each command from call to return, which is the full round trip
+to the Tello or the simulator. The time goes into that command's
+LatencyHistogram, and the command is counted as ok, error or timeout. A
+command span is also added to the current tracer (see tracing.py), so
+commands nest under the mission and leg spans of the code that flies
+them. TimedClock does the same for sleeps, since a lesson spends most of
+its time sleeping.
+
+LatencyHistogram is HDR-style. Values below 2^(bits+1) ns get an exact
+bucket. Above that, each power of two is split into 2^bits equal
+buckets, so every recorded value is kept within 2^-bits of its true value
+(0.8% by default). Recording is O(1) and memory grows with the logarithm
+of the largest value, about 5000 buckets for an hour.
+
+    python -m drone_teaching_package.run 9 --backend offline --virtual-clock --metrics
+"""
+
+import math
+import socket
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.interpreter import COMMAND_SIGNATURES
+from drone_teaching_package.tracing import get_tracer
+
+DEFAULT_PRECISION = 7  # 2^7 buckets per power of two: under 0.8% error
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+OUTCOMES = (OK, ERROR, TIMEOUT)
+SLEEP = "sleep"        # name under which TimedClock records sleeps
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Histogram of non-negative integer latencies (ns) with bounded relative error"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        """
+        Args:
+            precision: log2 of the buckets per power of two
+        """
+        if not 1 <= precision <= 20:
+            raise ValueError("precision must be between 1 and 20 bits")
+        self._half = 1 << precision
+        self._bits = precision + 1
+        self._exact = 1 << self._bits  # values below this get a bucket each
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._exact:
+            return value
+        shift = value.bit_length() - self._bits
+        return self._exact + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def bounds(self, index: int) -> Tuple[int, int]:
+        """Lowest and highest value that land in a bucket"""
+        if index < self._exact:
+            return index, index
+        shift, sub = divmod(index - self._exact, self._half)
+        shift += 1
+        low = (sub + self._half) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, value: int):
+        value = int(value) if value > 0 else 0
+        index = self._index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's samples (same precision) to this one"""
+        if other._half != self._half:
+            raise ValueError("Cannot merge histograms of different precision")
+        if not other.count:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, n in enumerate(other.counts):
+            self.counts[index] += n
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> int:
+        """
+        Value at or below which p percent of the samples fall
+
+        Returns the highest value of the bucket holding that sample (within
+        the histogram's precision), or 0 for an empty histogram.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.bounds(index)[1], self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        stats = {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max}
+        for p in PERCENTILES:
+            stats[f"p{p:g}"] = self.percentile(p)
+        return stats
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Whether an exception means a command got no reply in time"""
+    return isinstance(error, (TimeoutError, socket.timeout)) or "timed out" in str(error).lower()
+
+
+class CommandMetrics:
+    """Latency histogram and ok/error/timeout counters per command name"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        self.precision = precision
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ns: int, outcome: str = OK):
+        """
+        Add one command's latency and outcome
+
+        Raises:
+            ValueError: For an outcome other than ok, error or timeout
+        """
+        if outcome not in OUTCOMES:
+            raise ValueError(f"Outcome must be one of {OUTCOMES}, got {outcome!r}")
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram(self.precision)
+                self.counters[name] = dict.fromkeys(OUTCOMES, 0)
+            histogram.record(ns)
+            self.counters[name][outcome] += 1
+
+    def totals(self) -> Dict[str, int]:
+        """ok/error/timeout counts over all commands"""
+        with self._lock:
+            return {outcome: sum(counts[outcome] for counts in self.counters.values())
+                    for outcome in OUTCOMES}
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """Counters and histogram summaries (ns) per command, JSON-ready"""
+        with self._lock:
+            return {name: dict(self.counters[name], **self.histograms[name].summary())
+                    for name in sorted(self.histograms)}
+
+    def report(self) -> str:
+        """Render the metrics as a plain-text table (latencies in milliseconds)"""
+        lines = [f"{'command':<12}{'count':>7}{'error':>7}{'timeout':>8}"
+                 f"{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+        for name, stats in self.as_dict().items():
+            lines.append(f"{name:<12}{stats['count']:>7}{stats[ERROR]:>7}{stats[TIMEOUT]:>8}"
+                         + "".join(f"{stats[key] / 1e6:>10.2f}" for key in ("p50", "p90", "p99", "max")))
+        return "\n".join(lines)
+
+
+class InstrumentedDrone:
+    """Adapter wrapper that times every command into CommandMetrics and the tracer"""
+
+    def __init__(self, drone, metrics: Optional[CommandMetrics] = None, clock=None):
+        """
+        Args:
+            drone: Adapter to wrap; everything but its commands passes through
+            metrics: Where to record (defaults to a new CommandMetrics)
+            clock: Clock for timing (defaults to the current clock)
+        """
+        self.drone = drone
+        self.metrics = metrics if metrics is not None else CommandMetrics()
+        self._clock = clock
+
+    def __getattr__(self, name):
+        attribute = getattr(self.drone, name)
+        if name not in COMMAND_SIGNATURES or not callable(attribute):
+            return attribute
+        # easytello reports a lost reply by printing, not raising; the real
+        # adapter exposes it through timed_out()
+        timed_out = getattr(self.drone, "timed_out", None)
+
+        def call(*args):
+            now = (self._clock or get_clock()).monotonic_ns
+            outcome = OK
+            start = now()
+            try:
+                result = attribute(*args)
+                if timed_out is not None and timed_out():
+                    outcome = TIMEOUT
+                return result
+            except Exception as e:
+                outcome = TIMEOUT if is_timeout(e) else ERROR
+                raise
+            finally:
+                end = now()
+                self.metrics.record(name, end - start, outcome)
+                tracer = get_tracer()
+                if tracer.enabled:
+                    tracer.complete(name, "command", start, end, {"args": args, "outcome": outcome})
+
+        self.__dict__[name] = call  # later lookups skip __getattr__
+        return call
+
+
+class TimedClock:
+    """Clock wrapper that records each sleep in CommandMetrics and the tracer"""
+
+    def __init__(self, clock, metrics: CommandMetrics):
+        self.clock = clock
+        self.metrics = metrics
+
+    def sleep(self, seconds: float):
+        now = self.clock.monotonic_ns
+        start = now()
+        self.clock.sleep(seconds)
+        end = now()
+        self.metrics.record(SLEEP, end - start)
+        tracer = get_tracer()
+        if tracer.enabled:
+            tracer.complete(SLEEP, SLEEP, start, end, {"seconds": seconds})
+
+    def __getattr__(self, name):
+        return getattr(self.clock, name)
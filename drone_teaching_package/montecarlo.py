@@ -0,0 +1,227 @@
+# montecarlo.py
+"""Monte Carlo robustness of mission plans under execution noise.
+
+A mission (for example lesson 9's SurveyMission) is flown once on an
+OfflineDrone to record its plan. The plan is then replayed thousands of
+times under a DisturbanceModel (wind, gusts, heading and distance
+error), which flies a whole chunk of runs as (runs x steps) NumPy arrays.
+Chunks are simulated on a process pool, each with its own noise stream.
+
+The report gives the probability that a run stays inside the geofence and
+lands with the battery reserve intact. It also gives the worst and 95th
+percentile excursion from the planned path, and the distributions of
+flight time and battery use:
+
+    python -m drone_teaching_package.montecarlo survey --runs 10000 -j 4
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from drone_teaching_package.clock import VirtualClock, use_clock
+from drone_teaching_package.disturbance import DisturbanceModel, trace_steps
+from drone_teaching_package.flight_model import BATTERY_RESERVE, battery_percent
+from drone_teaching_package.offline_drone import OfflineDrone
+from drone_teaching_package.return_home import Geofence
+from drone_teaching_package.run import DEFAULT_LESSONS_DIR, load_lesson
+
+DEFAULT_RUNS = 10000
+DEFAULT_MARGIN = 100.0  # cm of geofence around the planned path
+CHUNK_RUNS = 2000       # runs per worker task
+DEFAULT_ENERGY_SIGMA = 0.05  # relative spread of a run's energy use
+
+
+class Plan:
+    """A recorded mission: its commands, their nominal timing and path"""
+
+    def __init__(self, trace):
+        self.commands = [(name, tuple(args)) for _, name, args in trace]
+        self.steps = trace_steps(trace)
+        self.path = DisturbanceModel().fly(self.steps).positions[0]
+
+    @property
+    def seconds(self) -> float:
+        """Planned flight time, idle gaps included"""
+        return float(self.steps.duration.sum() + self.steps.gap.sum())
+
+    def fence(self, margin: float = DEFAULT_MARGIN) -> Geofence:
+        """Geofence around the planned path"""
+        low = self.path.min(axis=0)
+        high = self.path.max(axis=0)
+        return Geofence(low[0] - margin, high[0] + margin, low[1] - margin, high[1] + margin,
+                        high[2] + margin)
+
+
+def default_disturbance(seed=None) -> DisturbanceModel:
+    """Still air, with per-run drift and the usual scale and heading errors"""
+    return DisturbanceModel(wind_sigma=2.0, yaw_sigma=3.0, scale_sigma=0.05, seed=seed)
+
+
+def _simulate_chunk(plan: Plan, model: DisturbanceModel, fence: Geofence, runs: int,
+                    energy_sigma: float) -> Dict[str, np.ndarray]:
+    """
+    Fly a plan `runs` times under one model
+
+    Returns:
+        Arrays with one entry per run: "excursion" (max distance from the
+        planned path), "outside" (left the fence), "seconds", "battery"
+        (percent used)
+    """
+    steps = plan.steps
+    flight = model.fly(steps, runs)
+    position = flight.positions[:, 1:]
+    excursion = np.linalg.norm(position - plan.path[1:], axis=2).max(axis=1)
+    x, y, z = position[..., 0], position[..., 1], position[..., 2]
+    outside = ((x < fence.x_min) | (x > fence.x_max) | (y < fence.y_min) | (y > fence.y_max) |
+               (z > fence.z_max)).any(axis=1)
+    busy = flight.seconds - steps.gap
+    joules = (busy * steps.power + steps.gap * steps.idle_power).sum(axis=1)
+    joules *= 1.0 + model.rng.normal(0.0, energy_sigma, runs)
+    return {
+        "excursion": excursion,
+        "outside": outside,
+        "seconds": flight.seconds.sum(axis=1),
+        "battery": battery_percent(joules),
+    }
+
+
+class RobustnessReport:
+    """Aggregate outcome of a Monte Carlo study"""
+
+    def __init__(self, outcomes: Dict[str, np.ndarray], fence: Geofence):
+        self.fence = fence
+        self.runs = len(outcomes["seconds"])
+        self.excursion = outcomes["excursion"]
+        self.seconds = outcomes["seconds"]
+        self.battery = outcomes["battery"]
+        self.outside = outcomes["outside"]
+        self.battery_short = self.battery > 100 - BATTERY_RESERVE
+        self.success = ~(self.outside | self.battery_short)
+
+    @property
+    def success_probability(self) -> float:
+        return float(self.success.mean())
+
+    def format(self) -> str:
+        """Render the report as plain text"""
+        q = [5, 50, 95]
+        time = np.percentile(self.seconds, q)
+        battery = np.percentile(self.battery, q)
+        return "\n".join([
+            f"runs:                {self.runs}",
+            f"success probability: {self.success_probability:.2%}",
+            f"left geofence:       {self.outside.mean():.2%}",
+            f"battery below {BATTERY_RESERVE}%:   {self.battery_short.mean():.2%}",
+            f"excursion (cm):      worst {self.excursion.max():.0f}, "
+            f"p95 {np.percentile(self.excursion, 95):.0f}, median {np.median(self.excursion):.0f}",
+            f"flight time (s):     p5 {time[0]:.0f}, median {time[1]:.0f}, p95 {time[2]:.0f}, "
+            f"max {self.seconds.max():.0f}",
+            f"battery used (%):    p5 {battery[0]:.1f}, median {battery[1]:.1f}, "
+            f"p95 {battery[2]:.1f}, max {self.battery.max():.1f}",
+        ])
+
+
+def evaluate(plan: Plan, disturbance: Optional[DisturbanceModel] = None, runs: int = DEFAULT_RUNS,
+             fence: Optional[Geofence] = None, workers: Optional[int] = None,
+             energy_sigma: float = DEFAULT_ENERGY_SIGMA) -> RobustnessReport:
+    """
+    Run a Monte Carlo study of a plan
+
+    Args:
+        plan: Recorded mission plan
+        disturbance: Wind and execution error (defaults to default_disturbance());
+            seed it for reproducible results
+        runs: Number of simulated flights
+        fence: Geofence (defaults to the planned path plus DEFAULT_MARGIN)
+        workers: Worker processes (1 runs in this process)
+        energy_sigma: Relative standard deviation of each run's energy use
+    """
+    disturbance = disturbance or default_disturbance()
+    fence = fence or plan.fence()
+    sizes = [CHUNK_RUNS] * (runs // CHUNK_RUNS) + ([runs % CHUNK_RUNS] if runs % CHUNK_RUNS else [])
+    models = disturbance.spawn(len(sizes))
+    if workers == 1 or len(sizes) <= 1:
+        chunks = [_simulate_chunk(plan, model, fence, size, energy_sigma)
+                  for model, size in zip(models, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, [plan] * len(sizes), models,
+                                   [fence] * len(sizes), sizes, [energy_sigma] * len(sizes)))
+    outcomes = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    return RobustnessReport(outcomes, fence)
+
+
+def record_plan(fly: Callable) -> Plan:
+    """Record the plan that `fly(drone)` issues, on an offline drone and virtual clock"""
+    clock = VirtualClock()
+    drone = OfflineDrone(clock=clock)
+    with use_clock(clock):
+        fly(drone)
+    return Plan(drone.trace)
+
+
+def _delivery(lesson, drone):
+    mission = lesson.DeliveryMission(drone)
+    mission.add_delivery((100, 0, 50), "PKG001")
+    mission.add_delivery((0, 100, 50), "PKG002")
+    mission.execute_delivery_mission()
+
+
+def _survey(lesson, drone):
+    mission = lesson.SurveyMission(drone)
+    mission.set_survey_area([(0, 0, 50), (100, 0, 50), (100, 100, 50), (0, 100, 50)])
+    mission.execute_survey_mission()
+
+
+def _search(pattern):
+    def fly(lesson, drone):
+        lesson.SearchMission(drone).execute_search_mission(pattern, 200, 50)
+    return fly
+
+
+# Lesson 9 missions with the parameters used in its demonstration
+MISSIONS = {
+    "delivery": _delivery,
+    "survey": _survey,
+    "search-spiral": _search("spiral"),
+    "search-grid": _search("grid"),
+    "search-expanding": _search("expanding"),
+}
+
+
+def mission_plan(name: str, lessons_dir: str = DEFAULT_LESSONS_DIR) -> Plan:
+    """Record one of the lesson 9 MISSIONS"""
+    lesson = load_lesson("lesson9", lessons_dir)
+    return record_plan(lambda drone: MISSIONS[name](lesson, drone))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo robustness of a lesson 9 mission")
+    parser.add_argument("mission", choices=sorted(MISSIONS))
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--scale", type=float, default=0.05, help="Relative distance error (std)")
+    parser.add_argument("--yaw", type=float, default=3.0, help="Turn error in degrees (std)")
+    parser.add_argument("--drift", type=float, default=2.0, help="Per-run drift velocity in cm/s (std)")
+    parser.add_argument("--wind", type=float, nargs=2, default=(0.0, 0.0), metavar=("X", "Y"),
+                        help="Constant wind in cm/s")
+    parser.add_argument("--gusts", type=float, default=0.0, help="Gust speed in cm/s (std)")
+    parser.add_argument("--margin", type=float, default=DEFAULT_MARGIN,
+                        help="Geofence margin around the planned path in cm")
+    parser.add_argument("--lessons-dir", default=DEFAULT_LESSONS_DIR)
+    args = parser.parse_args(argv)
+
+    plan = mission_plan(args.mission, args.lessons_dir)
+    disturbance = DisturbanceModel(args.wind, args.drift, args.gusts, yaw_sigma=args.yaw,
+                                   scale_sigma=args.scale, seed=args.seed)
+    report = evaluate(plan, disturbance, args.runs, plan.fence(args.margin), args.workers)
+    print(f"{args.mission}: {len(plan.commands)} commands, {plan.seconds:.0f}s planned")
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# offline_drone.py
+"""In-process drone with the adapter API and no network.
+
+OfflineDrone behaves like EasyTelloToSimulatedDrone from a lesson's point
+of view, but every command completes locally: it is checked against the
+flight-state machine, recorded in a trace, drains a modeled battery and
+advances the current clock by the command's modeled duration. With a
+VirtualClock installed a whole lesson runs in milliseconds.
+
+Moves land exactly on target. Give the drone a DisturbanceModel and
+flight() replays its trace under wind and execution error.
+"""
+
+from typing import List, Tuple
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.events import ConsoleSink, add_sink, get_logger, sinks
+from drone_teaching_package.flight_model import (
+    BATTERY_CAPACITY, DEFAULT_SPEED, command_duration, command_power
+)
+from drone_teaching_package.flight_state import FlightStateMachine
+from drone_teaching_package.pose import Pose, PoseTracker
+
+log = get_logger("offline_drone")
+
+
+class OfflineDrone:
+    """Drone adapter that flies a model instead of a device"""
+
+    def __init__(self, clock=None, battery: float = 100.0, verbose: bool = False,
+                 disturbance=None):
+        """
+        Args:
+            clock: Clock to advance (defaults to the current clock at each command)
+            battery: Initial battery level in percent
+            verbose: Print adapter-style messages for every command, by
+                attaching a ConsoleSink unless one is already attached
+            disturbance: DisturbanceModel used by flight()
+        """
+        self._clock = clock
+        self.flight_state = FlightStateMachine()
+        self.tracker = PoseTracker()
+        self.speed = DEFAULT_SPEED
+        self.energy = BATTERY_CAPACITY * battery / 100.0
+        self.verbose = verbose
+        if verbose and not any(isinstance(sink, ConsoleSink) for sink in sinks()):
+            add_sink(ConsoleSink())
+        self.trace: List[Tuple[float, str, Tuple]] = []
+        self.disturbance = disturbance
+
+    @property
+    def clock(self):
+        return self._clock or get_clock()
+
+    @property
+    def state(self) -> str:
+        return self.flight_state.state
+
+    @property
+    def is_flying(self) -> bool:
+        return self.flight_state.is_flying
+
+    @property
+    def pose(self) -> Pose:
+        """Dead-reckoned position (cm) and heading (degrees) since takeoff"""
+        return self.tracker.pose
+
+    def set_pose(self, x: float, y: float, z: float, yaw: float = 0.0):
+        """Correct the tracked pose, e.g. from a known landmark"""
+        self.tracker.reset(x, y, z, yaw)
+
+    @property
+    def battery(self) -> float:
+        return max(0.0, 100.0 * self.energy / BATTERY_CAPACITY)
+
+    def flight(self, drones: int = 1):
+        """
+        Replay the trace so far `drones` times under the disturbance model
+
+        Returns:
+            disturbance.Flight (exact flights when there is no model)
+        """
+        # Imported here so the offline backend does not pull in NumPy
+        from drone_teaching_package.disturbance import DisturbanceModel, trace_steps
+        model = self.disturbance or DisturbanceModel()
+        return model.fly(trace_steps(self.trace), drones)
+
+    def _execute(self, name: str, *args):
+        """Validate, record and 'fly' one command"""
+        if not self.flight_state.begin(name):
+            return
+        log.info("{}{}", name, args if args else "()")
+        clock = self.clock
+        self.trace.append((clock.monotonic(), name, args))
+        duration = command_duration(name, args, self.speed)
+        airborne = self.flight_state.is_flying or name == "land"
+        self.energy -= duration * command_power(name, airborne)
+        if hasattr(clock, "advance"):
+            clock.advance(duration)  # virtual time: no real waiting
+        else:
+            clock.sleep(duration)
+        self.tracker.apply(name, args)
+        self.flight_state.end()
+
+    def connect(self):
+        self._execute("connect")
+
+    def disconnect(self):
+        self._execute("disconnect")
+
+    def takeoff(self):
+        self._execute("takeoff")
+
+    def land(self):
+        self._execute("land")
+
+    def up(self, dist: int):
+        self._execute("up", dist)
+
+    def down(self, dist: int):
+        self._execute("down", dist)
+
+    def left(self, dist: int):
+        self._execute("left", dist)
+
+    def right(self, dist: int):
+        self._execute("right", dist)
+
+    def forward(self, dist: int):
+        self._execute("forward", dist)
+
+    def back(self, dist: int):
+        self._execute("back", dist)
+
+    def cw(self, degrees: int):
+        self._execute("cw", degrees)
+
+    def ccw(self, degrees: int):
+        self._execute("ccw", degrees)
+
+    def flip(self, direction: str):
+        if direction not in ("l", "r", "f", "b"):
+            raise ValueError(f"Invalid flip direction: {direction}")
+        self._execute("flip", direction)
+
+    def set_speed(self, speed: int):
+        self._execute("set_speed", speed)
+        self.speed = speed
+
+    def get_battery(self):
+        self.flight_state.begin("get_battery")
+        return f"{int(self.battery)}%"
+
+    def go(self, x: int, y: int, z: int, speed: int):
+        self._execute("go", x, y, z, speed)
+
+    def curve(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int):
+        self._execute("curve", x1, y1, z1, x2, y2, z2, speed)
@@ -0,0 +1,152 @@
+# pose.py
+"""Dead-reckoning pose tracking for the drone adapters.
+
+Every adapter owns a PoseTracker and updates it after each command that
+succeeds. The tracker integrates the commanded motion into a position
+(x, y, z) and a heading (yaw). Moves are given in the drone's body frame,
+so they are rotated into the world frame by the current heading. The
+sine and cosine of the heading are recomputed only when the drone turns,
+so each update costs a few multiplications.
+
+Frame: x forward, y left, z up, as seen from the takeoff spot at yaw 0.
+Yaw is in degrees, counterclockwise positive; ``cw`` turns it negative.
+"""
+
+import math
+from typing import Callable, List, NamedTuple, Tuple
+
+from drone_teaching_package.events import get_logger
+from drone_teaching_package.flight_model import MOVE_AXES, TAKEOFF_HEIGHT
+
+log = get_logger("pose")
+
+# Pure computation, so the static script converter may run these
+STATIC_HELPERS = ("Pose", "PoseTracker")
+
+
+class Pose(NamedTuple):
+    """Position in cm and heading in degrees"""
+    x: float
+    y: float
+    z: float
+    yaw: float
+
+    def offset_to(self, x: float, y: float, z: float) -> Tuple[float, float, float]:
+        """
+        Offset to a world point in the drone's body frame
+
+        This is what ``go()`` expects: go(*pose.offset_to(x, y, z), speed)
+        flies to (x, y, z) whatever the drone's heading.
+        """
+        theta = math.radians(self.yaw)
+        cos, sin = math.cos(theta), math.sin(theta)
+        dx, dy = x - self.x, y - self.y
+        return cos * dx + sin * dy, -sin * dx + cos * dy, z - self.z
+
+    def distance_to(self, x: float, y: float, z: float) -> float:
+        """Straight-line distance to a world point in cm"""
+        return math.sqrt((x - self.x) ** 2 + (y - self.y) ** 2 + (z - self.z) ** 2)
+
+
+def _normalize_yaw(yaw: float) -> float:
+    """Wrap an angle into (-180, 180]"""
+    yaw = math.fmod(yaw, 360.0)
+    if yaw > 180.0:
+        yaw -= 360.0
+    elif yaw <= -180.0:
+        yaw += 360.0
+    return yaw
+
+
+class PoseTracker:
+    """Integrate commanded motion into a pose, O(1) per command"""
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, yaw: float = 0.0):
+        self._listeners: List[Callable[[Pose], None]] = []
+        self.reset(x, y, z, yaw)
+
+    def subscribe(self, listener: Callable[[Pose], None]):
+        """
+        Call `listener(pose)` after every change, e.g. to keep a plan current
+
+        An exception from a listener is logged and does not reach the
+        command that changed the pose.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Pose], None]):
+        self._listeners.remove(listener)
+
+    def _changed(self):
+        if self._listeners:
+            pose = self.pose
+            for listener in tuple(self._listeners):
+                try:
+                    listener(pose)
+                except Exception as e:  # a listener must not fail the command that moved the drone
+                    log.error("Pose listener {} failed: {}: {}",
+                              getattr(listener, "__qualname__", listener), type(e).__name__, e)
+
+    def reset(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, yaw: float = 0.0):
+        """Set the pose outright, e.g. from a known landmark"""
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self._set_yaw(yaw)
+        self._changed()
+
+    def _set_yaw(self, yaw: float):
+        self.yaw = _normalize_yaw(yaw)
+        theta = math.radians(self.yaw)
+        # Body-to-world rotation [[cos, -sin], [sin, cos]], cached until the next turn
+        self._cos = math.cos(theta)
+        self._sin = math.sin(theta)
+
+    @property
+    def pose(self) -> Pose:
+        return Pose(self.x, self.y, self.z, self.yaw)
+
+    def move(self, dx: float, dy: float, dz: float):
+        """Translate by a body-frame offset"""
+        self.x += self._cos * dx - self._sin * dy
+        self.y += self._sin * dx + self._cos * dy
+        self.z += dz
+        self._changed()
+
+    def rotate(self, degrees: float):
+        """Turn counterclockwise (negative degrees turn clockwise)"""
+        self._set_yaw(self.yaw + degrees)
+        self._changed()
+
+    def set_height(self, z: float):
+        self.z = float(z)
+        self._changed()
+
+    def apply(self, name: str, args: Tuple = ()):
+        """Update the pose for one adapter command that succeeded"""
+        if name in MOVE_AXES:
+            ax, ay, az = MOVE_AXES[name]
+            distance = args[0]
+            self.move(ax * distance, ay * distance, az * distance)
+        elif name == "cw":
+            self.rotate(-args[0])
+        elif name == "ccw":
+            self.rotate(args[0])
+        elif name == "go":
+            self.move(*args[:3])
+        elif name == "curve":
+            self.move(*args[3:6])  # a curve ends at its second point, heading unchanged
+        elif name == "takeoff":
+            self.set_height(TAKEOFF_HEIGHT)
+        elif name == "land":
+            self.set_height(0.0)
+
+
+def format_pose(pose: Pose) -> str:
+    """Render a pose as 'x y z yaw' (the daemon's wire format)"""
+    return " ".join(f"{value:.1f}" for value in pose)
+
+
+def parse_pose(text: str) -> Pose:
+    """Inverse of format_pose()"""
+    return Pose(*(float(value) for value in text.split()))
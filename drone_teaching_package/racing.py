@@ -0,0 +1,343 @@
+# racing.py
+"""Racing-line optimizer for checkpoint laps.
+
+A lap through checkpoints is scored with the flight model: each command
+costs COMMAND_OVERHEAD plus its path length over its speed. That gives
+two ways to save time:
+
+- pass each checkpoint anywhere inside its gate (a ball of radius
+  `gate`) instead of through its centre, to shorten and straighten legs;
+- fly a checkpoint as the middle point of a ``curve`` that ends at the
+  next checkpoint. One curve replaces two go commands, saving an
+  overhead, but curves fly at most 60 cm/s and must have a radius of
+  50 cm to 10 m.
+
+RacingLineOptimizer searches both at once. Gate offsets are sampled for
+thousands of candidate lines at a time (a cross-entropy search), and
+every candidate is scored in one pass of NumPy array operations. The
+best curve/straight choice for a given set of offsets is found exactly
+by a dynamic program over the checkpoints, vectorized across candidates.
+
+fly_lap() flies a line and records split times per checkpoint on the
+monotonic nanosecond clock:
+
+    python -m drone_teaching_package.racing 150,0,30 250,150,30 100,250,60 --gate 30
+"""
+
+import argparse
+import math
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.flight_model import (
+    COMMAND_OVERHEAD, MAX_CURVE_RADIUS, MAX_CURVE_SPEED, MAX_MOVE, MAX_SPEED, MIN_CURVE_RADIUS,
+    MIN_MOVE, estimate_duration
+)
+from drone_teaching_package.interpreter import CommandInterpreter
+from drone_teaching_package.pose import Pose
+
+DEFAULT_GATE = 20.0       # cm a checkpoint may be missed by
+DEFAULT_CANDIDATES = 2048
+DEFAULT_ITERATIONS = 15
+ELITE = 0.05              # share of candidates the search refits to
+
+
+class RacingLine(NamedTuple):
+    """An optimized lap"""
+    start: Pose
+    points: np.ndarray                 # (K, 3) where each checkpoint is passed, world frame
+    curves: List[bool]                 # checkpoint k is flown as the middle of a curve
+    commands: List[Tuple[str, Tuple]]  # adapter commands for the start pose's heading
+    passes: List[List[Tuple[int, float]]]  # per command: (checkpoint, share of the command done)
+    seconds: float                     # modelled lap time
+    nominal_seconds: float             # straight go legs through the gate centres
+
+
+class Split(NamedTuple):
+    """Time a checkpoint was passed, in ns since the lap started"""
+    checkpoint: int
+    ns: int
+
+
+def _leg_seconds(legs: np.ndarray, speed: float) -> np.ndarray:
+    """Modelled time of straight go legs (..., 3); inf where too short to fly"""
+    largest = np.abs(legs).max(axis=-1)
+    parts = np.maximum(np.ceil(largest / MAX_MOVE), 1.0)
+    seconds = parts * COMMAND_OVERHEAD + np.linalg.norm(legs, axis=-1) / speed
+    return np.where(largest >= MIN_MOVE, seconds, np.inf)
+
+
+def _curve_arcs(middle: np.ndarray, end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Radius and length of curves from the origin through `middle` to `end`
+
+    Vectorized version of flight_model.curve_length() over (..., 3) arrays.
+    """
+    a = np.linalg.norm(middle, axis=-1)
+    b = np.linalg.norm(end - middle, axis=-1)
+    c = np.linalg.norm(end, axis=-1)
+    area = np.linalg.norm(np.cross(middle, end), axis=-1) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radius = np.where(area > 1e-9, a * b * c / (4 * area), np.inf)
+        angle = 2 * np.arcsin(np.minimum(c / (2 * radius), 1.0))
+        minor = a * a + b * b < c * c  # the middle point lies on the minor arc
+        length = np.where(minor, radius * angle, radius * (2 * math.pi - angle))
+    return radius, np.where(np.isfinite(radius), length, a + b)
+
+
+def _curve_seconds(middle: np.ndarray, end: np.ndarray, speed: float) -> np.ndarray:
+    """Modelled time of curves (..., 3); inf where the Tello would reject them"""
+    radius, length = _curve_arcs(middle, end)
+    valid = (radius >= MIN_CURVE_RADIUS) & (radius <= MAX_CURVE_RADIUS)
+    for point in (middle, end):
+        largest = np.abs(point).max(axis=-1)
+        valid &= (largest >= MIN_MOVE) & (largest <= MAX_MOVE)
+    return np.where(valid, COMMAND_OVERHEAD + length / speed, np.inf)
+
+
+def lap_seconds(points: np.ndarray, speed: float = MAX_SPEED) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best modelled lap time of many candidate lines at once
+
+    Args:
+        points: (N, K + 1, 3) candidate lines in the start's body frame,
+            each starting at the origin; rounded to whole cm first
+        speed: go speed in cm/s; curves fly at min(speed, MAX_CURVE_SPEED)
+    Returns:
+        (seconds (N,), curves (N, K + 1) bool) where curves[:, k] marks
+        point k (point 0 is the start) flown as the middle of a curve
+    """
+    points = np.rint(points)
+    n, count = points.shape[0], points.shape[1] - 1
+    straight = _leg_seconds(np.diff(points, axis=1), speed)               # (N, K), leg k -> k+1
+    curve = _curve_seconds(points[:, 1:-1] - points[:, :-2],              # (N, K - 1), through k + 1
+                           points[:, 2:] - points[:, :-2], min(speed, MAX_CURVE_SPEED))
+    # best[k]: fastest way to reach point k; either a go from k - 1 or a
+    # curve from k - 2 through k - 1
+    best = np.zeros((n, count + 1))
+    through = np.zeros((n, count + 1), dtype=bool)
+    best[:, 1] = straight[:, 0]
+    for k in range(2, count + 1):
+        by_go = best[:, k - 1] + straight[:, k - 1]
+        by_curve = best[:, k - 2] + curve[:, k - 2]
+        through[:, k - 1] = by_curve < by_go
+        best[:, k] = np.minimum(by_go, by_curve)
+    # Trace the choices back from the finish so overlapping curves are dropped
+    curves = np.zeros_like(through)
+    k = np.full(n, count)
+    rows = np.arange(n)
+    while (k > 0).any():
+        flown = through[rows, np.maximum(k - 1, 0)] & (k > 1)
+        curves[rows[flown], k[flown] - 1] = True
+        k = np.where(flown, k - 2, k - 1)
+        k = np.maximum(k, 0)
+    return best[:, count], curves
+
+
+def _ball(rng: np.random.Generator, shape: Tuple[int, ...], radius: float) -> np.ndarray:
+    """Points drawn uniformly inside a ball, shape (..., 3)"""
+    direction = rng.normal(size=shape + (3,))
+    direction /= np.linalg.norm(direction, axis=-1, keepdims=True)
+    return direction * radius * rng.random(shape + (1,)) ** (1 / 3)
+
+
+def _clip_to_ball(offsets: np.ndarray, radius: float) -> np.ndarray:
+    length = np.linalg.norm(offsets, axis=-1, keepdims=True)
+    return offsets * np.minimum(1.0, radius / np.maximum(length, 1e-12))
+
+
+class RacingLineOptimizer:
+    """Search gate offsets and curve/straight choices for the fastest lap"""
+
+    def __init__(self, gate: float = DEFAULT_GATE, speed: int = MAX_SPEED,
+                 candidates: int = DEFAULT_CANDIDATES, iterations: int = DEFAULT_ITERATIONS,
+                 seed=None):
+        """
+        Args:
+            gate: Radius in cm around each checkpoint the line may pass through
+            speed: go speed in cm/s
+            candidates: Lines scored per iteration
+            iterations: Rounds of the cross-entropy search
+            seed: Seed for a reproducible search
+        """
+        if gate < 0:
+            raise ValueError("gate must not be negative")
+        self.gate = gate
+        self.speed = speed
+        self.candidates = candidates
+        self.iterations = iterations
+        self.rng = np.random.default_rng(seed)
+
+    def optimize(self, checkpoints: Sequence[Sequence[float]], start: Pose) -> RacingLine:
+        """
+        Find the fastest line from a pose through world checkpoints
+
+        Raises:
+            ValueError: If even the best line has a leg too short for the Tello
+        """
+        body = np.array([start.offset_to(*point[:3]) for point in checkpoints], dtype=float)
+        count = len(body)
+        if count == 0:
+            raise ValueError("A lap needs at least one checkpoint")
+        origin = np.zeros((1, 3))
+
+        def lines(offsets):
+            moved = body + offsets
+            return np.concatenate([np.broadcast_to(origin, (len(moved), 1, 3)), moved], axis=1)
+
+        centres = np.rint(lines(np.zeros((1, count, 3))))
+        nominal = float(_leg_seconds(np.diff(centres, axis=1), self.speed).sum())
+        best_offsets = np.zeros((count, 3))
+        best_seconds = lap_seconds(centres, self.speed)[0][0]
+        mean = np.zeros((count, 3))
+        sigma = np.full((count, 3), self.gate / 2)
+        elite = max(2, int(self.candidates * ELITE))
+        for iteration in range(self.iterations if self.gate else 0):
+            if iteration == 0:
+                offsets = _ball(self.rng, (self.candidates, count), self.gate)
+            else:
+                noise = self.rng.normal(size=(self.candidates, count, 3))
+                offsets = _clip_to_ball(mean + sigma * noise, self.gate)
+            offsets[0] = best_offsets  # never lose the best line so far
+            seconds, _ = lap_seconds(lines(offsets), self.speed)
+            order = np.argsort(seconds)[:elite]
+            if seconds[order[0]] < best_seconds:
+                best_seconds = seconds[order[0]]
+                best_offsets = offsets[order[0]].copy()
+            finite = order[np.isfinite(seconds[order])]
+            if len(finite) >= 2:
+                mean = offsets[finite].mean(axis=0)
+                sigma = offsets[finite].std(axis=0) + 0.5  # keep exploring a little
+        if not np.isfinite(best_seconds):
+            raise ValueError("Checkpoints are too close together for the Tello to fly between")
+
+        line = np.rint(lines(best_offsets[None])[0])
+        _, curves = lap_seconds(line[None], self.speed)
+        curves = curves[0, 1:].tolist()
+        commands, passes = self._commands(line, curves)
+        # Back into the world frame for callers
+        cos, sin = math.cos(math.radians(start.yaw)), math.sin(math.radians(start.yaw))
+        rotation = np.array([[cos, -sin, 0.0], [sin, cos, 0.0], [0.0, 0.0, 1.0]])
+        world = line[1:] @ rotation.T + np.array([start.x, start.y, start.z])
+        return RacingLine(start, world, curves, commands, passes, estimate_duration(commands),
+                          nominal)
+
+    def _commands(self, line: np.ndarray, curves: List[bool]):
+        commands = []
+        passes = []
+        speed, curve_speed = self.speed, min(self.speed, MAX_CURVE_SPEED)
+        k = 0
+        count = len(curves)
+        while k < count:
+            here = line[k]
+            if curves[k] and k + 1 < count:
+                middle, end = line[k + 1] - here, line[k + 2] - here
+                args = tuple(int(v) for v in middle) + tuple(int(v) for v in end) + (curve_speed,)
+                commands.append(("curve", args))
+                # The middle point is passed after the share of the arc leading to it
+                share = _share_of_arc(middle, end)
+                passes.append([(k, share), (k + 1, 1.0)])
+                k += 2
+                continue
+            leg = line[k + 1] - here
+            parts = max(1, math.ceil(np.abs(leg).max() / MAX_MOVE))
+            for part in range(parts):
+                step = (np.rint(leg * (part + 1) / parts) - np.rint(leg * part / parts)).astype(int)
+                commands.append(("go", tuple(step.tolist()) + (speed,)))
+                passes.append([(k, 1.0)] if part == parts - 1 else [])
+            k += 1
+        return commands, passes
+
+
+def _share_of_arc(middle: np.ndarray, end: np.ndarray) -> float:
+    """Share of a curve's length flown before it passes its middle point"""
+    radius, length = _curve_arcs(middle, end)
+    chord = float(np.linalg.norm(middle))
+    return min(1.0, 2 * float(radius) * math.asin(min(chord / (2 * float(radius)), 1.0)) / float(length))
+
+
+def fly_lap(drone, line: RacingLine, clock=None) -> Tuple[List[Split], int]:
+    """
+    Fly a racing line and time each checkpoint
+
+    Splits come from the monotonic nanosecond clock. A checkpoint passed in
+    the middle of a command is timed by the share of the command flown.
+
+    Returns:
+        (splits, lap_ns), both measured from the first command
+    """
+    clock = clock or get_clock()
+    splits: List[Split] = []
+    passes = iter(line.passes)
+    start_ns = clock.monotonic_ns()
+
+    def record(timing):
+        end = clock.monotonic_ns()
+        began = end - int(timing.seconds * 1e9)
+        for checkpoint, share in next(passes):
+            splits.append(Split(checkpoint, began + int((end - began) * share) - start_ns))
+
+    CommandInterpreter(drone).run(line.commands, on_step=record)
+    return splits, clock.monotonic_ns() - start_ns
+
+
+def format_splits(splits: Sequence[Split]) -> str:
+    """Render splits as 'CP1 1.234567s (+1.234567s)' lines"""
+    lines = []
+    previous = 0
+    for checkpoint, ns in splits:
+        lines.append(f"CP{checkpoint + 1} {ns / 1e9:.6f}s (+{(ns - previous) / 1e9:.6f}s)")
+        previous = ns
+    return "\n".join(lines)
+
+
+def _point(text: str) -> Tuple[float, float, float]:
+    try:
+        x, y, z = (float(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected x,y,z, got {text!r}")
+    return x, y, z
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimize a racing line through checkpoints")
+    parser.add_argument("checkpoints", type=_point, nargs="+",
+                        help="Checkpoints as x,y,z in cm from the start")
+    parser.add_argument("--gate", type=float, default=DEFAULT_GATE, help="Gate radius in cm")
+    parser.add_argument("--speed", type=int, default=MAX_SPEED)
+    parser.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from drone_teaching_package.clock import VirtualClock, use_clock
+    from drone_teaching_package.offline_drone import OfflineDrone
+
+    optimizer = RacingLineOptimizer(args.gate, args.speed, args.candidates, args.iterations,
+                                    args.seed)
+    clock = get_clock()
+    began = clock.perf_counter()
+    line = optimizer.optimize(args.checkpoints, Pose(0.0, 0.0, 0.0, 0.0))
+    wall = clock.perf_counter() - began
+    print(f"searched {args.candidates * args.iterations} lines in {wall * 1000:.0f} ms")
+    for name, values in line.commands:
+        print(f"  {name}{values}")
+    if math.isfinite(line.nominal_seconds):
+        nominal = f"{line.nominal_seconds:.2f}s"
+    else:
+        nominal = "not flyable (a leg is outside the Tello's go range)"
+    print(f"lap {line.seconds:.2f}s, straight through the centres {nominal}")
+
+    # Time the line on the offline drone, whose commands take their modelled time
+    with use_clock(VirtualClock()):
+        drone = OfflineDrone()
+        drone.takeoff()
+        splits, lap_ns = fly_lap(drone, line)
+    print(format_splits(splits))
+    print(f"lap {lap_ns / 1e9:.6f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# real_tello.py
+from easytello import Tello
+from drone_teaching_package.events import get_logger
+from drone_teaching_package.flight_model import TAKEOFF_HEIGHT
+from drone_teaching_package.flight_state import FlightStateMachine
+from drone_teaching_package.pose import Pose, PoseTracker
+
+log = get_logger("real_tello")
+
+class EasyTelloRealDrone:
+    def __init__(self, state_stream: bool = True):
+        """
+        Args:
+            state_stream: Listen to the Tello state stream and fuse it with
+                the commanded motion (see drone_teaching_package.kalman)
+        """
+        self.drone = Tello()  # Tello() enters SDK command mode immediately
+        self.flight_state = FlightStateMachine()
+        self.tracker = PoseTracker()
+        self.estimator = None
+        self._state_stream = None
+        if state_stream:
+            from drone_teaching_package.kalman import PoseEstimator, StateStream
+            self.estimator = PoseEstimator(self.tracker)
+            try:
+                self._state_stream = StateStream(self.estimator).start()
+            except OSError as e:  # port taken, e.g. by another script
+                log.warning("State stream unavailable ({}); using commanded motion only", e)
+
+    @property
+    def state(self) -> str:
+        return self.flight_state.state
+
+    @property
+    def is_flying(self) -> bool:
+        return self.flight_state.is_flying
+
+    @property
+    def pose(self) -> Pose:
+        """Position (cm) and heading (degrees) since takeoff
+
+        Fused with the state stream once packets arrive, dead-reckoned
+        from the commands before that.
+        """
+        if self.estimator is not None and self.estimator.samples:
+            return self.estimator.pose
+        return self.tracker.pose
+
+    def set_pose(self, x: float, y: float, z: float, yaw: float = 0.0):
+        """Correct the tracked pose, e.g. from a known landmark"""
+        self.tracker.reset(x, y, z, yaw)
+        if self.estimator is not None:
+            self.estimator.reset()
+
+    def timed_out(self) -> bool:
+        """Whether the last command got no reply before easytello gave up on it"""
+        sent = self.drone.log
+        return bool(sent) and not sent[-1].got_response()
+
+    def connect(self):
+        self.flight_state.begin("connect")
+        log.info("Connecting to the real Tello drone...")
+        self.flight_state.end()
+
+    def disconnect(self):
+        self.flight_state.begin("disconnect")
+        log.info("Disconnecting from the real Tello drone...")
+        if self._state_stream is not None:
+            self._state_stream.close()
+            self._state_stream = None
+        self.flight_state.end()
+
+    def close(self):
+        """Release the state stream and the command socket whatever the flight state"""
+        if self._state_stream is not None:
+            self._state_stream.close()
+            self._state_stream = None
+        self.drone.socket.close()
+
+    def takeoff(self):
+        self.flight_state.begin("takeoff")
+        log.info("Taking off!")
+        self.drone.takeoff()
+        self.tracker.set_height(TAKEOFF_HEIGHT)
+        self.flight_state.end()
+
+    def land(self):
+        if not self.flight_state.begin("land"):
+            return
+        log.info("Landing!")
+        self.drone.land()
+        self.tracker.set_height(0)
+        self.flight_state.end()
+
+    def up(self, dist: int):
+        self.flight_state.begin("up")
+        log.info("Moving up {} cm", dist)
+        self.drone.up(dist)
+        self.tracker.move(0, 0, dist)
+
+    def down(self, dist: int):
+        self.flight_state.begin("down")
+        log.info("Moving down {} cm", dist)
+        self.drone.down(dist)
+        self.tracker.move(0, 0, -dist)
+
+    def left(self, dist: int):
+        self.flight_state.begin("left")
+        log.info("Moving left {} cm", dist)
+        self.drone.left(dist)
+        self.tracker.move(0, dist, 0)
+
+    def right(self, dist: int):
+        self.flight_state.begin("right")
+        log.info("Moving right {} cm", dist)
+        self.drone.right(dist)
+        self.tracker.move(0, -dist, 0)
+
+    def forward(self, dist: int):
+        self.flight_state.begin("forward")
+        log.info("Moving forward {} cm", dist)
+        self.drone.forward(dist)
+        self.tracker.move(dist, 0, 0)
+
+    def back(self, dist: int):
+        self.flight_state.begin("back")
+        log.info("Moving backward {} cm", dist)
+        self.drone.back(dist)
+        self.tracker.move(-dist, 0, 0)
+
+    def cw(self, degrees: int):
+        self.flight_state.begin("cw")
+        log.info("Rotating clockwise {} degrees", degrees)
+        self.drone.cw(degrees)
+        self.tracker.rotate(-degrees)
+
+    def ccw(self, degrees: int):
+        self.flight_state.begin("ccw")
+        log.info("Rotating counterclockwise {} degrees", degrees)
+        self.drone.ccw(degrees)
+        self.tracker.rotate(degrees)
+
+    def flip(self, direction: str):
+        self.flight_state.begin("flip")
+        log.info("Flipping {}", direction)
+        self.drone.flip(direction)
+
+    def set_speed(self, speed: int):
+        self.flight_state.begin("set_speed")
+        log.info("Setting speed to {} cm/s", speed)
+        self.drone.set_speed(speed)
+
+    def get_battery(self):
+        self.flight_state.begin("get_battery")
+        log.info("Getting battery level...")
+        return self.drone.get_battery()
+
+    def go(self, x: int, y: int, z: int, speed: int):
+        self.flight_state.begin("go")
+        log.info("Flying to coordinates ({}, {}, {}) with speed {}", x, y, z, speed)
+        self.drone.go(x, y, z, speed)
+        self.tracker.move(x, y, z)
+
+    def curve(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int):
+        self.flight_state.begin("curve")
+        log.info("Flying in a curve from ({}, {}, {}) to ({}, {}, {}) at speed {}",
+                 x1, y1, z1, x2, y2, z2, speed)
+        self.drone.curve(x1, y1, z1, x2, y2, z2, speed)
+        self.tracker.move(x2, y2, z2)
\ No newline at end of file
@@ -0,0 +1,297 @@
+# return_home.py
+"""Return-to-home planning with the fewest legs and the least climbing.
+
+ReturnHomePlanner works out a safe way home from any pose. Obstacles are
+boxes standing on the floor:
+
+1. Obstacles taller than the geofence ceiling are walls. The horizontal
+   route goes around them on the shortest path through their corners
+   (a visibility graph). In an open room this is one straight line.
+2. Each leg climbs only as high as the obstacles it crosses need, plus a
+   clearance. It never climbs above the ceiling.
+3. The last leg descends to the home height during the same ``go`` when
+   that is clear. Otherwise it flies level and drops at the end.
+
+Legs become body-frame ``go`` commands (split at the Tello's 500 cm
+limit) for the drone's current heading. A planner that watches the
+adapter's PoseTracker replans after every command, so an emergency
+return can start at once:
+
+    python -m drone_teaching_package.return_home 300 200 60 --obstacle 100 200 50 150 120
+"""
+
+import argparse
+import heapq
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from drone_teaching_package.flight_model import (
+    DEFAULT_SPEED, MAX_MOVE, MIN_MOVE, estimate_duration
+)
+from drone_teaching_package.interpreter import CommandInterpreter
+from drone_teaching_package.pose import Pose, PoseTracker
+
+DEFAULT_CLEARANCE = 30.0  # cm kept from obstacles, sideways and above
+DEFAULT_HOME = (0.0, 0.0, 80.0)
+
+# The static script converter may plan and execute returns on its stand-in drone
+STATIC_HELPERS = ("ReturnHomePlanner",)
+
+Point = Tuple[float, float, float]
+
+
+class Geofence(NamedTuple):
+    """Axis-aligned box the drone must stay inside, in cm"""
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    z_max: float
+
+
+class Obstacle(NamedTuple):
+    """A box standing on the floor, in cm"""
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    height: float
+
+    def grown(self, margin: float) -> "Obstacle":
+        return Obstacle(self.x_min - margin, self.x_max + margin,
+                        self.y_min - margin, self.y_max + margin, self.height + margin)
+
+
+class ReturnPlan(NamedTuple):
+    """A planned way home"""
+    start: Pose
+    waypoints: List[Point]              # world positions, starting at the pose
+    commands: List[Tuple[str, Tuple]]   # adapter commands for the pose's heading
+    distance: float                     # cm flown
+    seconds: float                      # modelled flight time
+
+    def as_route(self) -> List[Dict]:
+        """Commands as route steps, e.g. [{"up": 40}, {"go": (120, 0, -20, 50)}]"""
+        return [{name: args[0] if len(args) == 1 else args} for name, args in self.commands]
+
+
+def _crossing(box: Obstacle, a: Sequence[float], b: Sequence[float]) -> Optional[Tuple[float, float]]:
+    """Parameter interval where the 2-D segment a-b is strictly inside a box footprint"""
+    t0, t1 = 0.0, 1.0
+    for start, delta, low, high in ((a[0], b[0] - a[0], box.x_min, box.x_max),
+                                    (a[1], b[1] - a[1], box.y_min, box.y_max)):
+        if abs(delta) < 1e-9:
+            if not low < start < high:
+                return None
+            continue
+        near, far = (low - start) / delta, (high - start) / delta
+        if near > far:
+            near, far = far, near
+        t0, t1 = max(t0, near), min(t1, far)
+        if t0 >= t1:
+            return None
+    return t0, t1
+
+
+def _is_clear(a: Point, b: Point, boxes: Sequence[Obstacle]) -> bool:
+    """True if the 3-D segment a-b passes above (or beside) every box"""
+    for box in boxes:
+        span = _crossing(box, a, b)
+        if span is not None:
+            # z is linear along the segment, so its lowest point over the
+            # crossing is at one end of the interval
+            low = min(a[2] + (b[2] - a[2]) * t for t in span)
+            if low < box.height:
+                return False
+    return True
+
+
+def _distance(a: Sequence[float], b: Sequence[float]) -> float:
+    return math.sqrt(sum((p - q) ** 2 for p, q in zip(a, b)))
+
+
+def _needed_height(a: Sequence[float], b: Sequence[float], boxes: Sequence[Obstacle]) -> float:
+    """Height a level leg from a to b must fly at to clear every box it crosses"""
+    return max((box.height for box in boxes if _crossing(box, a, b) is not None), default=0.0)
+
+
+class ReturnHomePlanner:
+    """Plan, and keep current, the way home from the drone's pose"""
+
+    def __init__(self, home: Point = DEFAULT_HOME, fence: Optional[Geofence] = None,
+                 obstacles: Sequence[Obstacle] = (), clearance: float = DEFAULT_CLEARANCE,
+                 speed: int = DEFAULT_SPEED):
+        """
+        Args:
+            home: Position to return to (x, y, z) in cm
+            fence: Geofence; its z_max is the ceiling legs must stay under
+            obstacles: Boxes to climb over or fly around
+            clearance: Margin kept from every obstacle
+            speed: Speed of the go legs in cm/s
+        """
+        self.home = tuple(float(v) for v in home)
+        self.fence = fence
+        self.clearance = clearance
+        self.speed = speed
+        self.obstacles = list(obstacles)
+        ceiling = fence.z_max if fence is not None else math.inf
+        grown = [box.grown(clearance) for box in self.obstacles]
+        self._over = [box for box in grown if box.height <= ceiling]
+        self._walls = [box for box in grown if box.height > ceiling]
+        self._ceiling = ceiling
+        # Corners of the walls, nudged outwards so legs may graze them
+        self._corners = [(x, y) for box in (wall.grown(1.0) for wall in self._walls)
+                         for x in (box.x_min, box.x_max) for y in (box.y_min, box.y_max)
+                         if self._inside(x, y)]
+        self.current: Optional[ReturnPlan] = None
+        self.error: Optional[str] = None  # why `current` is None after a failed replan
+        self._tracker: Optional[PoseTracker] = None
+
+    def _inside(self, x: float, y: float) -> bool:
+        fence = self.fence
+        return fence is None or (fence.x_min <= x <= fence.x_max and fence.y_min <= y <= fence.y_max)
+
+    def _visible(self, a, b) -> bool:
+        return all(_crossing(wall, a, b) is None for wall in self._walls)
+
+    def _horizontal_route(self, start: Tuple[float, float]) -> List[Tuple[float, float]]:
+        """Shortest 2-D route home around the walls"""
+        goal = self.home[:2]
+        if self._visible(start, goal):
+            return [start, goal]
+        nodes = [start, goal] + self._corners
+        best = {0: 0.0}
+        previous = {}
+        queue = [(0.0, 0)]
+        while queue:
+            cost, i = heapq.heappop(queue)
+            if i == 1:
+                break
+            if cost > best.get(i, math.inf):
+                continue
+            for j in range(1, len(nodes)):
+                if j != i and self._visible(nodes[i], nodes[j]):
+                    total = cost + _distance(nodes[i], nodes[j])
+                    if total < best.get(j, math.inf):
+                        best[j] = total
+                        previous[j] = i
+                        heapq.heappush(queue, (total, j))
+        if 1 not in previous:
+            raise ValueError("No way home around the obstacles inside the geofence")
+        path = [1]
+        while path[-1] != 0:
+            path.append(previous[path[-1]])
+        return [nodes[i] for i in reversed(path)]
+
+    def plan(self, pose: Pose) -> ReturnPlan:
+        """Plan the way home from a pose"""
+        home = self.home
+        z = min(pose.z, self._ceiling)
+        waypoints = [(pose.x, pose.y, pose.z)]
+        if z < pose.z:
+            waypoints.append((pose.x, pose.y, z))  # back under the ceiling first
+        route = self._horizontal_route((pose.x, pose.y))
+        for index, (a, b) in enumerate(zip(route, route[1:])):
+            needed = _needed_height(a, b, self._over)
+            if needed > z:
+                z = needed
+                waypoints.append((a[0], a[1], z))
+            if index == len(route) - 2 and _is_clear((a[0], a[1], z), home, self._over):
+                break  # the last leg can descend (or climb) straight to home
+            waypoints.append((b[0], b[1], z))
+        if waypoints[-1] != home:
+            waypoints.append(home)
+        commands = self._commands(pose, waypoints)
+        distance = sum(_distance(p, q) for p, q in zip(waypoints, waypoints[1:]))
+        return ReturnPlan(pose, waypoints, commands, distance, estimate_duration(commands))
+
+    def _commands(self, pose: Pose, waypoints: List[Point]) -> List[Tuple[str, Tuple]]:
+        commands = []
+        here = pose
+        for target in waypoints[1:]:
+            dx, dy, dz = here.offset_to(*target)
+            if abs(dx) < MIN_MOVE and abs(dy) < MIN_MOVE:
+                if abs(dz) >= MIN_MOVE:
+                    for step in _split(abs(dz)):
+                        commands.append(("up" if dz > 0 else "down", (step,)))
+                    here = here._replace(z=target[2])
+                continue  # too short for the Tello to fly; stay within MIN_MOVE
+            parts = max(1, math.ceil(max(abs(dx), abs(dy), abs(dz)) / MAX_MOVE))
+            for _ in range(parts):
+                commands.append(("go", (round(dx / parts), round(dy / parts), round(dz / parts),
+                                        self.speed)))
+            here = Pose(target[0], target[1], target[2], pose.yaw)
+        return commands
+
+    def update(self, pose: Pose) -> Optional[ReturnPlan]:
+        """
+        Replan from a new pose and keep the result as `current`
+
+        A pose with no way home sets `current` to None and the reason in
+        `error` instead of raising, so the command that moved the drone
+        (e.g. land()) still completes.
+        """
+        try:
+            self.current = self.plan(pose)
+            self.error = None
+        except ValueError as e:
+            self.current = None
+            self.error = str(e)
+        return self.current
+
+    def watch(self, tracker: PoseTracker):
+        """Replan after every change of an adapter's tracked pose"""
+        if self._tracker is not None:
+            self._tracker.unsubscribe(self.update)
+        self._tracker = tracker
+        tracker.subscribe(self.update)
+        self.update(tracker.pose)
+
+    def execute(self, drone) -> ReturnPlan:
+        """
+        Fly the current plan, replanning first if the drone has moved since
+
+        Raises:
+            ValueError: If there is no way home from the drone's pose
+        """
+        pose = drone.pose
+        plan = self.current
+        if plan is None or plan.start != pose:
+            plan = self.update(pose)
+            if plan is None:
+                raise ValueError(self.error)
+        CommandInterpreter(drone).run(plan.commands)
+        return plan
+
+
+def _split(distance: float) -> List[int]:
+    """Split a vertical distance into Tello-sized steps"""
+    parts = max(1, math.ceil(distance / MAX_MOVE))
+    return [round(distance / parts)] * parts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan a return to home from a position")
+    parser.add_argument("x", type=float)
+    parser.add_argument("y", type=float)
+    parser.add_argument("z", type=float)
+    parser.add_argument("--yaw", type=float, default=0.0, help="Current heading in degrees")
+    parser.add_argument("--home", type=float, nargs=3, default=DEFAULT_HOME, metavar=("X", "Y", "Z"))
+    parser.add_argument("--obstacle", type=float, nargs=5, action="append", default=[],
+                        metavar=("X_MIN", "X_MAX", "Y_MIN", "Y_MAX", "HEIGHT"))
+    parser.add_argument("--fence", type=float, nargs=5, default=None,
+                        metavar=("X_MIN", "X_MAX", "Y_MIN", "Y_MAX", "Z_MAX"))
+    parser.add_argument("--clearance", type=float, default=DEFAULT_CLEARANCE)
+    args = parser.parse_args(argv)
+
+    planner = ReturnHomePlanner(args.home, Geofence(*args.fence) if args.fence else None,
+                                [Obstacle(*box) for box in args.obstacle], args.clearance)
+    plan = planner.plan(Pose(args.x, args.y, args.z, args.yaw))
+    print(" -> ".join(f"({x:.0f}, {y:.0f}, {z:.0f})" for x, y, z in plan.waypoints))
+    for name, values in plan.commands:
+        print(f"  {name}{values}")
+    print(f"{plan.distance:.0f} cm, about {plan.seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
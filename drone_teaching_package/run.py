@@ -0,0 +1,167 @@
+# run.py
+"""Run a lesson on a chosen backend without any prompts.
+
+    python -m drone_teaching_package.run lesson9 --backend sim
+    python -m drone_teaching_package.run 3 --backend offline --virtual-clock
+    python -m drone_teaching_package.run 1 --backend sim --log info --log-file lesson1.events
+    python -m drone_teaching_package.run 9 --backend sim --metrics --trace lesson9.json
+
+Lessons are imported on demand (importing one no longer asks for a drone or
+opens a connection) and the drone is handed to the lesson's ``run()`` entry
+point. Lesson 0 is one plain script, so it is run with the drone already set
+instead. Backends come from the lazy registry in backends.py, so only the
+selected backend's module is imported: running on the simulator never
+loads easytello and vice versa.
+
+The sim backend drives the DroneBlocks simulator page opened with the same
+simulator key (--simulator-key or DRONE_SIMULATOR_KEY). Every command waits
+for the page to answer, so keep it open while the lesson runs.
+
+The adapters are quiet unless asked: --log prints their events at a level,
+and --log-file records them in a binary file (see events.py). --metrics
+prints per-command latency percentiles and outcome counts, and --trace
+writes mission, leg and command spans as Chrome trace JSON (see metrics.py
+and tracing.py).
+"""
+
+import argparse
+import ast
+import importlib.util
+import os
+import runpy
+import sys
+from contextlib import ExitStack
+
+from drone_teaching_package.backends import available_backends, create_drone
+from drone_teaching_package.clock import VirtualClock, get_clock, use_clock
+from drone_teaching_package.events import BinarySink, ConsoleSink, LEVELS, QueueSink, add_sink, \
+    parse_level, remove_sink
+
+DEFAULT_LESSONS_DIR = "python-lessons"
+DEFAULT_SIMULATOR_KEY = "edafb6aa-f195-450e-a68f-0795f6712085"
+
+
+def find_lesson(name: str, directory: str = DEFAULT_LESSONS_DIR) -> str:
+    """
+    Resolve a lesson name ("lesson9", "9" or a path to a script) to a file
+
+    Raises:
+        FileNotFoundError: If no matching script exists
+    """
+    candidates = [name]
+    if name.isdigit():
+        name = f"lesson{name}"
+    candidates.append(os.path.join(directory, name if name.endswith(".py") else name + ".py"))
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"No lesson named {name} in {directory}")
+
+
+def load_lesson(name: str, directory: str = DEFAULT_LESSONS_DIR):
+    """
+    Import a lesson module without running it
+
+    The module is cached in sys.modules, so its classes (MissionPlanner,
+    SafeDrone, ...) can be imported repeatedly at no cost.
+    """
+    path = os.path.abspath(find_lesson(name, directory))
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    module = sys.modules.get(module_name)
+    if module is not None and os.path.abspath(getattr(module, "__file__", "")) == path:
+        return module
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def _has_entry_point(path: str) -> bool:
+    """Whether a lesson script defines run(drone) at the top level"""
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read(), filename=path)
+    return any(isinstance(node, ast.FunctionDef) and node.name == "run" for node in tree.body)
+
+
+def run_lesson(name: str, drone, directory: str = DEFAULT_LESSONS_DIR):
+    """
+    Run a lesson's demonstration on an existing drone
+
+    Lessons with a run(drone) entry point are imported and handed the
+    drone. Plain scripts (lesson 0) are run as __main__ with a global
+    ``drone`` already set, which they use instead of prompting.
+
+    Returns:
+        The lesson module, or the plain script's globals
+    """
+    path = find_lesson(name, directory)
+    if not _has_entry_point(path):
+        return runpy.run_path(path, init_globals={"drone": drone}, run_name="__main__")
+    module = load_lesson(path, directory)
+    module.run(drone)
+    return module
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a lesson without prompts")
+    parser.add_argument("lesson", help="Lesson name (lesson9), number (9) or script path")
+    parser.add_argument("--backend", choices=available_backends(), default="sim")
+    parser.add_argument("--lessons-dir", default=DEFAULT_LESSONS_DIR)
+    parser.add_argument("--simulator-key",
+                        default=os.environ.get("DRONE_SIMULATOR_KEY", DEFAULT_SIMULATOR_KEY))
+    parser.add_argument("--virtual-clock", action="store_true",
+                        help="Fast-forward sleeps instead of waiting (offline backend)")
+    parser.add_argument("--log", choices=list(LEVELS), help="Print adapter events at this level")
+    parser.add_argument("--log-file", help="Record adapter events in a binary file")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Print per-command latency percentiles and outcome counts")
+    parser.add_argument("--trace", help="Write mission, leg and command spans as Chrome trace JSON")
+    args = parser.parse_args(argv)
+
+    sinks = []
+    if args.log:
+        sinks.append(add_sink(ConsoleSink(parse_level(args.log))))
+    if args.log_file:
+        sinks.append(add_sink(QueueSink(BinarySink(args.log_file))))
+    options = {"simulator_key": args.simulator_key} if args.backend == "sim" else {}
+    clock = VirtualClock() if args.virtual_clock else None
+    if clock is not None and args.backend == "offline":
+        options["clock"] = clock
+    metrics = tracer = None
+    try:
+        drone = create_drone(args.backend, **options)
+        active = clock
+        with ExitStack() as stack:
+            if args.metrics or args.trace:
+                from drone_teaching_package.metrics import CommandMetrics, InstrumentedDrone, TimedClock
+                metrics = CommandMetrics()
+                drone = InstrumentedDrone(drone, metrics)
+                active = TimedClock(clock or get_clock(), metrics)
+            if args.trace:
+                from drone_teaching_package.tracing import Tracer, use_tracer
+                tracer = stack.enter_context(use_tracer(Tracer()))
+            if active is not None:
+                stack.enter_context(use_clock(active))
+            if clock is not None:
+                from drone_teaching_package.harness import patched_time
+                stack.enter_context(patched_time(active))
+            run_lesson(args.lesson, drone, args.lessons_dir)
+        if clock is not None:
+            print(f"{clock.elapsed:.1f}s of virtual time")
+        if args.metrics:
+            print(metrics.report())
+        if tracer is not None:
+            tracer.export_chrome(args.trace)
+            print(f"{len(tracer.spans)} spans written to {args.trace}")
+    finally:
+        for sink in sinks:
+            remove_sink(sink)
+
+
+if __name__ == "__main__":
+    main()
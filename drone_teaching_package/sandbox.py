@@ -0,0 +1,351 @@
+# sandbox.py
+"""Run many student scripts in parallel against offline drones.
+
+A pool of worker processes is started once with the drone package already
+imported. Each worker forks a fresh child for every submission, so a
+submission costs a fork rather than an interpreter start plus the whole
+import chain. Nothing a submission changes (module globals such as
+flight_model.TAKEOFF_TIME, rlimits, signal handlers) survives into the
+next one. Every submission runs through the lesson harness (virtual clock,
+scripted input, OfflineDrone) inside its own scratch directory. It has a
+CPU-time limit, a wall-clock limit and an optional memory limit, and comes
+back as a flight trace:
+
+    python -m drone_teaching_package.sandbox submissions/ -j 16 -o traces.jsonl
+
+What is NOT sandboxed: the filesystem and the network. The scratch
+directory is only the working directory. A script can still read and
+write any file the user can, and open sockets. Run untrusted submissions
+in a container or VM without network access. Without os.fork (Windows),
+submissions run in the workers themselves, and only the wall-clock limit
+applies.
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import select
+import signal
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.harness import DEFAULT_INPUTS, run_lesson
+from drone_teaching_package.offline_drone import OfflineDrone
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, only the wall-clock limit applies
+    resource = None
+
+DEFAULT_CPU_SECONDS = 10
+DEFAULT_WALL_SECONDS = 30
+KILL_GRACE = 1.0  # seconds a child gets past its wall-clock limit to report before it is killed
+
+
+class LimitExceeded(BaseException):
+    """A submission ran out of CPU or wall-clock time
+
+    Derived from BaseException so that the ``except Exception`` blocks in
+    student code cannot swallow it.
+    """
+
+
+class SubmissionResult(NamedTuple):
+    """Outcome of one sandboxed submission"""
+    path: str
+    trace: List[Tuple[float, str, Tuple]]
+    virtual_seconds: float
+    wall_seconds: float
+    error: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "trace": [[t, name, list(args)] for t, name, args in self.trace],
+            "virtual_seconds": self.virtual_seconds,
+            "wall_seconds": self.wall_seconds,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SubmissionResult":
+        trace = [(t, name, tuple(args)) for t, name, args in data["trace"]]
+        return cls(data["path"], trace, data["virtual_seconds"], data["wall_seconds"], data["error"])
+
+
+def _raise_limit(signum, frame):
+    kind = "CPU" if signum == getattr(signal, "SIGXCPU", None) else "wall-clock"
+    raise LimitExceeded(f"{kind} time limit exceeded")
+
+
+def _install_limit_handlers():
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_limit)
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _raise_limit)
+
+
+def _init_worker():
+    """Pool initializer: install limit handlers once per worker"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl-C
+    _install_limit_handlers()
+
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _set_limits(cpu_seconds: Optional[float], wall_seconds: Optional[float], hard_cpu: bool = False):
+    """
+    Start the CPU and wall-clock budgets
+
+    The soft limits only raise LimitExceeded, which a bare ``except:`` can
+    swallow. With hard_cpu (forked children only, since it cannot be
+    lifted again) the kernel also kills the process one second later.
+    """
+    if resource is not None and cpu_seconds:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        # RLIMIT_CPU is cumulative per process, so the budget starts from now
+        soft = int(_cpu_used() + cpu_seconds) + 1
+        if hard_cpu:
+            hard = soft + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    if wall_seconds and hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, wall_seconds)
+
+
+def _clear_limits():
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    if resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def run_submission(path: str, inputs: Iterable[str] = DEFAULT_INPUTS,
+                   cpu_seconds: Optional[float] = DEFAULT_CPU_SECONDS,
+                   wall_seconds: Optional[float] = DEFAULT_WALL_SECONDS,
+                   hard_cpu: bool = False) -> SubmissionResult:
+    """Run one script in a scratch directory under CPU and wall-clock limits"""
+    path = os.path.abspath(path)
+    drone = OfflineDrone()
+    error = None
+    run = None
+    start = get_clock().perf_counter()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="drone_sandbox_") as scratch:
+        os.chdir(scratch)  # files the script writes land here and are discarded
+        try:
+            _set_limits(cpu_seconds, wall_seconds, hard_cpu)
+            try:
+                run = run_lesson(path, inputs=inputs, drone=drone)
+            finally:
+                _clear_limits()
+        except LimitExceeded as e:
+            error = f"LimitExceeded({str(e)!r})"
+        except MemoryError:
+            error = "MemoryError()"
+        finally:
+            os.chdir(cwd)
+    if run is not None:
+        error = None if run.ok else repr(run.error)
+        virtual_seconds = run.virtual_seconds
+    else:
+        virtual_seconds = drone.trace[-1][0] if drone.trace else 0.0
+    wall = get_clock().perf_counter() - start
+    return SubmissionResult(path, list(drone.trace), virtual_seconds, wall, error)
+
+
+def _run_forked(path: str, inputs: Iterable[str], cpu_seconds: Optional[float],
+                wall_seconds: Optional[float], memory_mb: Optional[int]) -> SubmissionResult:
+    """
+    Worker task: run one submission in a child forked from this worker
+
+    The child reports back through a pipe and exits, taking whatever the
+    script changed with it. The worker itself never runs student code. A
+    child that swallows LimitExceeded is still stopped: by the kernel at
+    its hard CPU limit, or by SIGKILL from here once it overruns its
+    wall-clock limit by KILL_GRACE.
+    """
+    if not hasattr(os, "fork"):
+        return run_submission(path, inputs, cpu_seconds, wall_seconds)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            _install_limit_handlers()
+            if resource is not None and memory_mb:
+                limit = memory_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            result = run_submission(path, inputs, cpu_seconds, wall_seconds, hard_cpu=True)
+            with os.fdopen(write_fd, "w", encoding="utf-8") as pipe:
+                json.dump(result.to_dict(), pipe)
+            status = 0
+        finally:
+            os._exit(status)  # skip the worker's atexit handlers and buffers
+    os.close(write_fd)
+    clock = get_clock()
+    start = clock.perf_counter()
+    deadline = start + wall_seconds + KILL_GRACE if wall_seconds else None
+    chunks = []
+    timed_out = False
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - clock.perf_counter())
+            if not select.select([read_fd], [], [], timeout)[0]:
+                os.kill(pid, signal.SIGKILL)
+                timed_out = True
+                break
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+    _, status, usage = os.wait4(pid, 0)
+    wall = clock.perf_counter() - start
+    data = b"".join(chunks)
+    if data and not timed_out:
+        return SubmissionResult.from_dict(json.loads(data.decode("utf-8")))
+    if timed_out:
+        error = "LimitExceeded('wall-clock time limit exceeded')"
+    elif (os.WIFSIGNALED(status) and cpu_seconds
+          and usage.ru_utime + usage.ru_stime >= cpu_seconds):
+        error = "LimitExceeded('CPU time limit exceeded')"
+    elif os.WIFSIGNALED(status):
+        error = f"ChildProcessError('killed by signal {os.WTERMSIG(status)}')"
+    else:
+        error = f"ChildProcessError('exit status {os.WEXITSTATUS(status)}')"
+    return SubmissionResult(os.path.abspath(path), [], 0.0, wall, error)
+
+
+class SandboxPool:
+    """Worker processes that each fork a fresh child per submission"""
+
+    def __init__(self, workers: Optional[int] = None, cpu_seconds: Optional[float] = DEFAULT_CPU_SECONDS,
+                 wall_seconds: Optional[float] = DEFAULT_WALL_SECONDS, memory_mb: Optional[int] = None,
+                 inputs: Iterable[str] = DEFAULT_INPUTS):
+        """
+        Args:
+            workers: Worker processes (defaults to the CPU count)
+            cpu_seconds: CPU time allowed per submission
+            wall_seconds: Wall-clock time allowed per submission
+            memory_mb: Address-space limit per submission, if any
+            inputs: Answers for the scripts' input() prompts
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_mb = memory_mb
+        self.inputs = tuple(inputs)
+        self._pool = None
+
+    def _start(self):
+        methods = multiprocessing.get_all_start_methods()
+        # fork lets workers inherit the already-imported package
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker)
+
+    def _submit(self, path: str):
+        return self._pool.submit(_run_forked, path, self.inputs, self.cpu_seconds,
+                                 self.wall_seconds, self.memory_mb)
+
+    def run(self, paths: Iterable[str]) -> List[SubmissionResult]:
+        """
+        Run every submission and return results in input order
+
+        A submission's child dying outright is reported as its error. A
+        worker dying breaks the pool; it is restarted and the affected
+        submissions are retried once.
+        """
+        paths = list(paths)
+        results = {}
+        pending = list(range(len(paths)))
+        for attempt in range(2):
+            if self._pool is None:
+                self._start()
+            futures = {self._submit(paths[index]): index for index in pending}
+            broken = []
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except BrokenProcessPool:
+                    broken.append(index)
+            if not broken:
+                break
+            self.close()
+            pending = broken
+        for index in pending:
+            if index not in results:
+                results[index] = SubmissionResult(os.path.abspath(paths[index]), [], 0.0, 0.0,
+                                                  "BrokenProcessPool('worker died')")
+        return [results[index] for index in range(len(paths))]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        self._start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_traces(results: Iterable[SubmissionResult], path: str):
+    """Write results as JSON lines, one submission per line"""
+    with open(path, "w", encoding="utf-8") as file:
+        for result in results:
+            file.write(json.dumps(result.to_dict()) + "\n")
+
+
+def read_traces(path: str) -> List[SubmissionResult]:
+    """Read results written by write_traces()"""
+    with open(path, encoding="utf-8") as file:
+        return [SubmissionResult.from_dict(json.loads(line)) for line in file if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run student scripts in sandboxed offline workers")
+    parser.add_argument("paths", nargs="+", help="Scripts, or directories of scripts")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--cpu", type=float, default=DEFAULT_CPU_SECONDS, help="CPU seconds per script")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_WALL_SECONDS, help="Wall seconds per script")
+    parser.add_argument("--memory", type=int, default=None, help="Memory limit per script in MB")
+    parser.add_argument("-o", "--output", help="Write traces as JSON lines")
+    args = parser.parse_args(argv)
+
+    scripts = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            scripts.extend(sorted(glob.glob(os.path.join(path, "**", "*.py"), recursive=True)))
+        else:
+            scripts.append(path)
+
+    with SandboxPool(args.workers, args.cpu, args.timeout, args.memory) as pool:
+        results = pool.run(scripts)
+    for result in results:
+        status = "ok" if result.ok else f"error: {result.error}"
+        print(f"{os.path.relpath(result.path):<40} {len(result.trace):>4} cmds  "
+              f"{result.virtual_seconds:>7.1f}s virtual  {status}")
+    if args.output:
+        write_traces(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# simulated_tello.py
+from DroneBlocksTelloSimulator import SimulatedDrone
+from drone_teaching_package.events import get_logger
+from drone_teaching_package.flight_model import TAKEOFF_HEIGHT
+from drone_teaching_package.flight_state import FlightStateMachine
+from drone_teaching_package.pose import Pose, PoseTracker
+
+log = get_logger("simulated_tello")
+
+class EasyTelloToSimulatedDrone:
+    def __init__(self, simulator_key):
+        self.drone = SimulatedDrone(simulator_key=simulator_key)  # connects to the broker
+        self.flight_state = FlightStateMachine()
+        self.tracker = PoseTracker()
+        self._link_closed = False  # disconnect() closed the MQTT client
+        self._flips = {
+            "l": ("left", self.drone.flip_left),
+            "r": ("right", self.drone.flip_right),
+            "f": ("forward", self.drone.flip_forward),
+            "b": ("backward", self.drone.flip_backward),
+        }
+
+    @property
+    def state(self) -> str:
+        return self.flight_state.state
+
+    @property
+    def is_flying(self) -> bool:
+        return self.flight_state.is_flying
+
+    @property
+    def pose(self) -> Pose:
+        """Dead-reckoned position (cm) and heading (degrees) since takeoff"""
+        return self.tracker.pose
+
+    def set_pose(self, x: float, y: float, z: float, yaw: float = 0.0):
+        """Correct the tracked pose, e.g. from a known landmark"""
+        self.tracker.reset(x, y, z, yaw)
+
+    def connect(self):
+        self.flight_state.begin("connect")
+        log.info("Connecting to the simulated drone...")
+        if self._link_closed:
+            # SimulatedDrone.connect() does nothing, so reopen its MQTT link here
+            client = self.drone.client
+            client.reconnect()
+            client.loop_start()
+            client.subscribe("/command_response/" + self.drone.simulator_key)
+            self._link_closed = False
+        self.drone.connect()
+        self.flight_state.end()
+
+    def disconnect(self):
+        self.flight_state.begin("disconnect")
+        log.info("Disconnecting from the simulated drone...")
+        self.drone.disconnect()
+        self.drone.client.loop_stop()  # wait for the network thread so connect() can restart it
+        self._link_closed = True
+        self.flight_state.end()
+
+    def close(self):
+        """Release the MQTT link whatever the flight state, e.g. for a drone never used"""
+        if not self._link_closed:
+            self.drone.disconnect()
+            self.drone.client.loop_stop()
+            self._link_closed = True
+
+    def takeoff(self):
+        self.flight_state.begin("takeoff")
+        log.info("Taking off!")
+        self.drone.takeoff()
+        self.tracker.set_height(TAKEOFF_HEIGHT)
+        self.flight_state.end()
+
+    def land(self):
+        if not self.flight_state.begin("land"):
+            return
+        log.info("Landing!")
+        self.drone.land()
+        self.tracker.set_height(0)
+        self.flight_state.end()
+
+    def up(self, dist: int):
+        self.flight_state.begin("up")
+        log.info("Moving up {} cm", dist)
+        self.drone.fly_up(dist, "cm")
+        self.tracker.move(0, 0, dist)
+
+    def down(self, dist: int):
+        self.flight_state.begin("down")
+        log.info("Moving down {} cm", dist)
+        self.drone.fly_down(dist, "cm")
+        self.tracker.move(0, 0, -dist)
+
+    def left(self, dist: int):
+        self.flight_state.begin("left")
+        log.info("Moving left {} cm", dist)
+        self.drone.fly_left(dist, "cm")
+        self.tracker.move(0, dist, 0)
+
+    def right(self, dist: int):
+        self.flight_state.begin("right")
+        log.info("Moving right {} cm", dist)
+        self.drone.fly_right(dist, "cm")
+        self.tracker.move(0, -dist, 0)
+
+    def forward(self, dist: int):
+        self.flight_state.begin("forward")
+        log.info("Moving forward {} cm", dist)
+        self.drone.fly_forward(dist, "cm")
+        self.tracker.move(dist, 0, 0)
+
+    def back(self, dist: int):
+        self.flight_state.begin("back")
+        log.info("Moving backward {} cm", dist)
+        self.drone.fly_backward(dist, "cm")
+        self.tracker.move(-dist, 0, 0)
+
+    def cw(self, degrees: int):
+        self.flight_state.begin("cw")
+        log.info("Rotating clockwise {} degrees", degrees)
+        self.drone.yaw_right(degrees)
+        self.tracker.rotate(-degrees)
+
+    def ccw(self, degrees: int):
+        self.flight_state.begin("ccw")
+        log.info("Rotating counterclockwise {} degrees", degrees)
+        self.drone.yaw_left(degrees)
+        self.tracker.rotate(degrees)
+
+    def flip(self, direction: str):
+        self.flight_state.begin("flip")
+        try:
+            name, flip = self._flips[direction]
+        except KeyError:
+            raise ValueError(f"Invalid flip direction: {direction}") from None
+        log.info("Flipping {}", name)
+        flip()
+
+    def set_speed(self, speed: int):
+        self.flight_state.begin("set_speed")
+        log.info("Setting speed to {} cm/s", speed)
+        self.drone.set_speed(speed)
+
+    def get_battery(self):
+        self.flight_state.begin("get_battery")
+        log.info("Getting battery level...")
+        return "100%"  # Simulated battery level
+
+    def go(self, x: int, y: int, z: int, speed: int):
+        self.flight_state.begin("go")
+        log.info("Flying to coordinates ({}, {}, {}) with speed {}", x, y, z, speed)
+        self.drone.fly_to_xyz(x, y, z, "cm")
+        self.tracker.move(x, y, z)
+
+    def curve(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int):
+        self.flight_state.begin("curve")
+        log.info("Flying in a curve from ({}, {}, {}) to ({}, {}, {}) at speed {} cm/s",
+                 x1, y1, z1, x2, y2, z2, speed)
+        self.drone.fly_curve(x1, y1, z1, x2, y2, z2, "cm")
+        self.tracker.move(x2, y2, z2)
\ No newline at end of file
@@ -0,0 +1,301 @@
+# smoothing.py
+"""Fly waypoint lists as chains of Tello curve arcs and straight go legs.
+
+Flying a route as one ``go`` per waypoint makes the drone brake to a
+stop at every corner and turn on the spot. CurveSmoother rounds each
+corner with a circular arc tangent to both legs, flown with a single
+``curve`` command, and joins the arcs with straight ``go`` legs:
+
+- an arc never strays more than `tolerance` from the corner it replaces,
+  so the path still passes within `tolerance` of every waypoint;
+- its radius stays inside the Tello's limits (50 cm to 10 m), and both
+  curve points must be valid Tello coordinates;
+- two arcs never share more than half of the leg between them, and any
+  straight leg left over is long enough for a ``go`` (at least 20 cm on
+  some axis).
+
+Corners that cannot take a valid arc (a U-turn, a leg too short for the
+minimum radius) are flown sharp. Collinear waypoints are merged into
+one leg. Tolerance 0 gives the plain stop-at-every-point route:
+
+    python -m drone_teaching_package.smoothing 300,0,80 300,300,80 0,300,120 --tolerance 40
+"""
+
+import argparse
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from drone_teaching_package.flight_model import (
+    DEFAULT_SPEED, MAX_CURVE_RADIUS, MAX_CURVE_SPEED, MAX_MOVE, MIN_CURVE_RADIUS, MIN_MOVE,
+    curve_length, curve_radius, estimate_duration
+)
+from drone_teaching_package.pose import Pose, PoseTracker
+
+DEFAULT_TOLERANCE = 20.0  # cm an arc may cut a corner by
+COLLINEAR = 0.5           # cm off the straight line below which a waypoint is merged
+MIN_LEG = 40.0            # cm; a straight leg this long has an axis of at least MIN_MOVE
+
+# Planning only, so the static script converter may run it
+STATIC_HELPERS = ("CurveSmoother",)
+
+Point = Tuple[float, float, float]
+
+
+class Arc(NamedTuple):
+    """A rounded corner, in world coordinates"""
+    corner: Point   # the waypoint being rounded
+    entry: Point    # where the arc leaves the incoming leg
+    middle: Point   # the arc's point closest to the corner
+    exit: Point     # where it joins the outgoing leg
+    radius: float
+
+
+class SmoothPlan(NamedTuple):
+    """A route flown as curves and straight legs"""
+    start: Pose
+    waypoints: List[Point]             # waypoints kept after merging collinear ones
+    arcs: List[Optional[Arc]]          # one per interior waypoint; None where flown sharp
+    commands: List[Tuple[str, Tuple]]  # adapter commands for the start pose's heading
+    distance: float                    # cm flown
+    seconds: float                     # modelled flight time
+
+    @property
+    def stops(self) -> int:
+        """Interior waypoints where the drone still stops to change direction"""
+        return sum(arc is None for arc in self.arcs)
+
+    def as_route(self) -> List[Dict]:
+        """Commands as route steps, e.g. [{"go": (120, 0, 0, 50)}, {"curve": (...)}]"""
+        return [{name: args[0] if len(args) == 1 else args} for name, args in self.commands]
+
+
+def _sub(a: Sequence[float], b: Sequence[float]) -> Point:
+    return a[0] - b[0], a[1] - b[1], a[2] - b[2]
+
+
+def _along(a: Sequence[float], direction: Sequence[float], distance: float) -> Point:
+    return (a[0] + direction[0] * distance, a[1] + direction[1] * distance,
+            a[2] + direction[2] * distance)
+
+
+def _norm(v: Sequence[float]) -> float:
+    return math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+
+
+def _unit(v: Sequence[float]) -> Point:
+    length = _norm(v)
+    return v[0] / length, v[1] / length, v[2] / length
+
+
+def _flyable(offset: Sequence[int]) -> bool:
+    """True if the Tello accepts this rounded body-frame offset as a go or curve point"""
+    largest = max(abs(value) for value in offset)
+    return MIN_MOVE <= largest <= MAX_MOVE
+
+
+def _rounded(pose: Pose, point: Point) -> Tuple[int, int, int]:
+    return tuple(round(value) for value in pose.offset_to(*point))
+
+
+def _cut(arc: Arc) -> float:
+    """How much of each leg an arc uses"""
+    return _norm(_sub(arc.corner, arc.entry))
+
+
+def _merge_collinear(points: List[Point]) -> List[Point]:
+    """Drop repeated points and points that lie on the straight line through their neighbours"""
+    kept = [points[0]]
+    for index in range(1, len(points)):
+        point = points[index]
+        if _norm(_sub(point, kept[-1])) < COLLINEAR:
+            continue
+        if len(kept) >= 2:
+            a, p = kept[-2], kept[-1]
+            u, v = _unit(_sub(p, a)), _sub(point, p)
+            ahead = u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+            if ahead > 0 and _norm(_sub(v, _along((0.0, 0.0, 0.0), u, ahead))) < COLLINEAR:
+                kept[-1] = point  # p is on the way from a to point
+                continue
+        kept.append(point)
+    return kept
+
+
+def offsets_to_points(start: Pose, offsets: Sequence[Sequence[float]]) -> List[Point]:
+    """World points reached by flying body-frame go offsets one after another"""
+    tracker = PoseTracker(*start)
+    points = []
+    for offset in offsets:
+        tracker.move(*offset[:3])
+        points.append((tracker.x, tracker.y, tracker.z))
+    return points
+
+
+class CurveSmoother:
+    """Fit waypoint lists into valid Tello curve arcs joined by go legs"""
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE, speed: int = DEFAULT_SPEED,
+                 min_radius: float = MIN_CURVE_RADIUS, max_radius: float = MAX_CURVE_RADIUS):
+        """
+        Args:
+            tolerance: Furthest an arc may pass from the corner it rounds, in cm
+            speed: Speed of the go legs in cm/s; curves fly at most MAX_CURVE_SPEED
+            min_radius: Smallest arc radius to use
+            max_radius: Largest arc radius to use
+        """
+        if tolerance < 0:
+            raise ValueError("tolerance must not be negative")
+        if not MIN_CURVE_RADIUS <= min_radius <= max_radius <= MAX_CURVE_RADIUS:
+            raise ValueError(f"Curve radii must lie within {MIN_CURVE_RADIUS}-{MAX_CURVE_RADIUS} cm")
+        self.tolerance = tolerance
+        self.speed = speed
+        self.curve_speed = min(speed, MAX_CURVE_SPEED)
+        self.min_radius = min_radius
+        self.max_radius = max_radius
+
+    def _fit(self, a: Point, p: Point, b: Point, reach_in: float, reach_out: float,
+             yaw: float) -> Optional[Arc]:
+        """Largest valid arc rounding corner p, or None to fly it sharp"""
+        u, v = _unit(_sub(p, a)), _unit(_sub(b, p))
+        cos_turn = max(-1.0, min(1.0, u[0] * v[0] + u[1] * v[1] + u[2] * v[2]))
+        half = math.acos(cos_turn) / 2
+        if half < 1e-6 or half > math.pi / 2 - 1e-3:
+            return None  # straight on, or a U-turn no arc can round
+        tan, sec = math.tan(half), 1 / math.cos(half)
+        radius = min(self.max_radius, min(reach_in, reach_out) / tan)
+        if self.tolerance < radius * (sec - 1):
+            radius = self.tolerance / (sec - 1)
+        if radius < self.min_radius:
+            return None
+        cut = radius * tan
+        bisector = _unit(_sub(v, u))
+        arc = Arc(p, _along(p, u, -cut), _along(p, bisector, radius * (sec - 1)),
+                  _along(p, v, cut), radius)
+        # The rounded curve command must still be one the Tello accepts
+        entry = Pose(*arc.entry, yaw)
+        if not self._valid_curve(_rounded(entry, arc.middle), _rounded(entry, arc.exit)):
+            return None
+        return arc
+
+    def plan(self, waypoints: Sequence[Sequence[float]], start: Pose) -> SmoothPlan:
+        """
+        Plan a smooth route from a pose through world waypoints
+
+        Args:
+            waypoints: World points (x, y, z) in cm, flown in order
+            start: Pose the route starts from; its heading is kept throughout
+        Returns:
+            SmoothPlan whose commands fly the route
+        """
+        points = _merge_collinear([(start.x, start.y, start.z)]
+                                  + [tuple(float(v) for v in point[:3]) for point in waypoints])
+        last = len(points) - 1
+        lengths = [_norm(_sub(q, p)) for p, q in zip(points, points[1:])]
+        arcs: List[Optional[Arc]] = [None] * (last + 1)
+        # How much of its incoming and outgoing leg each corner's arc may use.
+        # The start and end are stops; interior legs are shared by two arcs.
+        reach = [[lengths[i - 1] * (1.0 if i == 1 else 0.5),
+                  lengths[i] * (1.0 if i == last - 1 else 0.5)] if 0 < i < last else None
+                 for i in range(last + 1)]
+        for i in range(1, last):
+            arcs[i] = self._fit(points[i - 1], points[i], points[i + 1], *reach[i], start.yaw)
+
+        # Arcs only ever shrink or are flown sharp, so this ends
+        while True:
+            commands, failed = self._commands(start, points, arcs)
+            if failed is None:
+                break
+            index, leg = failed
+            if leg is None:
+                arcs[index] = None
+                continue
+            # Leave the leg room for a go of its own
+            other = arcs[leg - 1 if index == leg else leg]
+            room = lengths[leg - 1] - MIN_LEG - (_cut(other) if other else 0.0)
+            side = 0 if index == leg else 1
+            if room < _cut(arcs[index]) - 1.0:
+                reach[index][side] = max(room, 0.0)
+                arcs[index] = self._fit(points[index - 1], points[index], points[index + 1],
+                                        *reach[index], start.yaw)
+            else:
+                arcs[index] = None
+        distance = sum(_norm(args[:3]) if name == "go" else curve_length(*args[:6])
+                       for name, args in commands)
+        return SmoothPlan(start, points[1:], arcs[1:last], commands, distance,
+                          estimate_duration(commands))
+
+    def _commands(self, start: Pose, points: List[Point], arcs: List[Optional[Arc]]
+                  ) -> Tuple[List[Tuple[str, Tuple]], Optional[Tuple[int, Optional[int]]]]:
+        """
+        Commands flying the route, dead-reckoned so rounding errors do not add up
+
+        Returns:
+            (commands, None) on success. Otherwise (partial commands, (arc,
+            leg)): the arc to shrink so leg (the one ending at points[leg])
+            is long enough for a go, or (arc, None) for an arc whose rounded
+            curve is invalid.
+        """
+        commands = []
+        tracker = PoseTracker(*start)
+        for i in range(1, len(points)):
+            arc = arcs[i]
+            target = arc.entry if arc else points[i]
+            offset = _rounded(tracker.pose, target)
+            largest = max(abs(value) for value in offset)
+            if largest >= MIN_MOVE:
+                parts = math.ceil(largest / MAX_MOVE)
+                for part in range(parts):
+                    # Spread the remainder so the parts add up exactly
+                    step = tuple(round(value * (part + 1) / parts) - round(value * part / parts)
+                                 for value in offset)
+                    commands.append(("go", step + (self.speed,)))
+                    tracker.apply("go", step)
+            elif tracker.pose.distance_to(*target) >= COLLINEAR:
+                ends = [j for j in (i - 1, i) if arcs[j]]
+                if ends:  # the arcs took too much of this leg
+                    return commands, (max(ends, key=lambda j: _cut(arcs[j])), i)
+                # else: a waypoint too close for the Tello to fly to; stay within MIN_MOVE
+            if arc:
+                pose = tracker.pose
+                middle, end = _rounded(pose, arc.middle), _rounded(pose, arc.exit)
+                if not self._valid_curve(middle, end):
+                    return commands, (i, None)
+                args = middle + end + (self.curve_speed,)
+                commands.append(("curve", args))
+                tracker.apply("curve", args)
+        return commands, None
+
+    def _valid_curve(self, middle: Tuple[int, int, int], end: Tuple[int, int, int]) -> bool:
+        """True if the Tello accepts a curve through these rounded body-frame points"""
+        return (_flyable(middle) and _flyable(end)
+                and self.min_radius <= curve_radius(*middle, *end) <= self.max_radius)
+
+
+def _point(text: str) -> Point:
+    try:
+        x, y, z = (float(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected x,y,z, got {text!r}")
+    return x, y, z
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Smooth a waypoint route into Tello curves")
+    parser.add_argument("waypoints", type=_point, nargs="+", help="World points as x,y,z in cm")
+    parser.add_argument("--start", type=_point, default=(0.0, 0.0, 80.0), help="Start as x,y,z")
+    parser.add_argument("--yaw", type=float, default=0.0, help="Heading in degrees")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--speed", type=int, default=DEFAULT_SPEED)
+    args = parser.parse_args(argv)
+
+    start = Pose(*args.start, args.yaw)
+    sharp = CurveSmoother(0.0, args.speed).plan(args.waypoints, start)
+    plan = CurveSmoother(args.tolerance, args.speed).plan(args.waypoints, start)
+    for name, values in plan.commands:
+        print(f"  {name}{values}")
+    arcs = len(plan.arcs) - plan.stops
+    print(f"{arcs} arc(s), {plan.stops} stop(s): {plan.distance:.0f} cm in about {plan.seconds:.1f}s "
+          f"(stopping at every waypoint: {sharp.distance:.0f} cm in {sharp.seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+# swarm.py
+"""Synchronized choreography for a swarm of drones.
+
+Swarm drives many adapters against one shared clock. Each drone gets a
+timeline of cues: (seconds after the show starts, command). Every drone
+has its own worker thread, so a drone whose link is slow, or which is
+still busy with its last command, never holds up the others. Workers do
+not wait for each other either; each waits for its own cue times.
+
+Commands take effect when they reach the drone, not when they are sent.
+calibrate() times a few cheap queries per drone and takes half of the
+median round trip as that drone's one-way latency. Each command is then
+sent that much early, so drones on slow links start moving together
+with the rest.
+
+Every cue's send time is recorded on the monotonic nanosecond clock.
+SwarmRun reports the start skew of each cue (the spread of effective
+start times across the drones sharing it) and how late each drone was.
+
+The swarm needs the real clock: a VirtualClock is advanced by every
+worker's sleeps, so concurrent workers would add their waits together.
+
+    python -m drone_teaching_package.swarm --drones 20 --slow 2 --latency 0.08
+"""
+
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from drone_teaching_package.clock import get_clock
+from drone_teaching_package.flight_model import DEFAULT_SPEED, command_duration
+from drone_teaching_package.interpreter import CommandInterpreter, normalize_command
+
+DEFAULT_GAP = 0.5          # seconds between a cue's slowest command and the next cue
+DEFAULT_START_DELAY = 0.2  # seconds for the workers to get ready before the first cue
+SPIN = 1_000_000           # ns before a cue when workers stop sleeping and poll
+PROBE = "get_battery"      # cheap query used to measure a link
+
+
+class Cue(NamedTuple):
+    """One command in a drone's timeline"""
+    at: float    # seconds after the show starts
+    name: str
+    args: Tuple
+
+
+class CueResult(NamedTuple):
+    """What happened to one cue, times in ns since the show started"""
+    drone: int
+    cue: int
+    scheduled: int   # when the command should take effect
+    sent: int        # when the command was sent
+    done: int        # when the adapter call returned
+    error: Optional[str]
+
+
+def choreograph(programs: Sequence[Sequence], speed: float = DEFAULT_SPEED,
+                gap: float = DEFAULT_GAP) -> List[List[Cue]]:
+    """
+    Align per-drone command lists into timelines that start each step together
+
+    Step k of every program shares a cue time. The next cue is the slowest
+    drone's step k (by the flight model) plus `gap` later. Programs may
+    differ in length.
+
+    Args:
+        programs: One command list per drone, in any spelling load() accepts
+        speed: Linear speed until a program calls set_speed
+        gap: Seconds of slack after the slowest command of each step
+    """
+    commands = [[normalize_command(command) for command in program] for program in programs]
+    speeds = [speed] * len(commands)
+    timelines: List[List[Cue]] = [[] for _ in commands]
+    at = 0.0
+    for step in range(max((len(program) for program in commands), default=0)):
+        longest = 0.0
+        for drone, program in enumerate(commands):
+            if step >= len(program):
+                continue
+            name, args = program[step]
+            if name == "set_speed":
+                speeds[drone] = args[0]
+            timelines[drone].append(Cue(at, name, args))
+            longest = max(longest, command_duration(name, args, speeds[drone]))
+        at += longest + gap
+    return timelines
+
+
+class SwarmRun(NamedTuple):
+    """Results of one show, per drone and per cue"""
+    results: List[List[CueResult]]
+    leads: List[int]  # ns each drone's commands were sent early
+
+    def skews(self) -> Dict[int, int]:
+        """Start skew in ns per cue time: spread of effective starts across drones"""
+        starts: Dict[int, List[int]] = {}
+        for drone, results in enumerate(self.results):
+            for result in results:
+                if result.error is None:
+                    starts.setdefault(result.scheduled, []).append(result.sent + self.leads[drone])
+        return {at: max(times) - min(times) for at, times in sorted(starts.items()) if len(times) > 1}
+
+    def lateness(self) -> List[int]:
+        """Worst lateness in ns per drone: effective start after the scheduled time"""
+        return [max((result.sent + self.leads[drone] - result.scheduled for result in results),
+                    default=0)
+                for drone, results in enumerate(self.results)]
+
+    @property
+    def errors(self) -> List[CueResult]:
+        return [result for results in self.results for result in results if result.error]
+
+    def summary(self) -> str:
+        skews = sorted(self.skews().values())
+        late = self.lateness()
+        if not skews:
+            return "no cues shared by two or more drones"
+        p95 = skews[min(len(skews) - 1, int(0.95 * len(skews)))]
+        worst = max(range(len(late)), key=late.__getitem__)
+        return (f"start skew over {len(skews)} cues: median {statistics.median(skews) / 1e6:.2f} ms, "
+                f"p95 {p95 / 1e6:.2f} ms, max {skews[-1] / 1e6:.2f} ms; "
+                f"latest drone {worst} by {late[worst] / 1e6:.2f} ms; {len(self.errors)} error(s)")
+
+
+class Swarm:
+    """Run cue timelines on many drones against one shared clock"""
+
+    def __init__(self, drones: Sequence, clock=None):
+        """
+        Args:
+            drones: Adapters, one per drone
+            clock: Shared clock (defaults to the current clock); must be a real clock
+        """
+        self.drones = list(drones)
+        self._clock = clock
+        self.interpreters = [CommandInterpreter(drone) for drone in self.drones]
+        self.leads = [0] * len(self.drones)
+
+    @property
+    def clock(self):
+        return self._clock or get_clock()
+
+    def calibrate(self, probes: int = 5) -> List[int]:
+        """
+        Measure each drone's link and send its commands that much early
+
+        Drones are probed concurrently with a cheap query. Drones whose
+        adapter has no such query keep a lead of 0.
+
+        Returns:
+            One-way latency estimate in ns per drone (also kept in self.leads)
+        """
+        now = self.clock.monotonic_ns
+
+        def probe(drone):
+            query = getattr(drone, PROBE, None)
+            if not callable(query):
+                return 0
+            trips = []
+            for _ in range(probes):
+                start = now()
+                query()
+                trips.append(now() - start)
+            return int(statistics.median(trips)) // 2
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self.drones)),
+                                thread_name_prefix="swarm-probe") as pool:
+            self.leads = list(pool.map(probe, self.drones))
+        return self.leads
+
+    def _wait_until(self, target: int):
+        """Sleep until shortly before `target` ns, then poll, yielding the GIL"""
+        clock = self.clock
+        remaining = target - clock.monotonic_ns()
+        if remaining > SPIN:
+            clock.sleep((remaining - SPIN) / 1e9)
+        while clock.monotonic_ns() < target:
+            clock.sleep(0)
+
+    def _perform(self, drone: int, program, start: int) -> List[CueResult]:
+        now = self.clock.monotonic_ns
+        lead = self.leads[drone]
+        results = []
+        for index, ((at, _, _), (name, args, func)) in enumerate(program):
+            scheduled = start + int(at * 1e9)
+            self._wait_until(scheduled - lead)
+            sent = now()
+            error = None
+            try:
+                func(*args)
+            except Exception as e:
+                error = f"{name}: {e}"
+            results.append(CueResult(drone, index, scheduled - start, sent - start, now() - start,
+                                     error))
+        return results
+
+    def conflicts(self, timelines: Sequence[Sequence[Cue]], separation: float):
+        """
+        Pairs of drones whose timelines bring them closer than `separation` cm
+
+        Tracks start from each adapter's pose, so set_pose() every drone to
+        its launch pad first.
+        """
+        # Imported here so a swarm that never checks does not pull in NumPy
+        from drone_teaching_package.conflicts import ConflictDetector, timeline_track
+        tracks = [timeline_track(index, timeline, drone.pose)
+                  for index, (drone, timeline) in enumerate(zip(self.drones, timelines))]
+        return ConflictDetector(separation).find(tracks)
+
+    def run(self, timelines: Sequence[Sequence[Cue]], start_delay: float = DEFAULT_START_DELAY,
+            separation: Optional[float] = None) -> SwarmRun:
+        """
+        Perform one timeline per drone and wait for the show to finish
+
+        Args:
+            timelines: Cue lists, e.g. from choreograph(), one per drone
+            start_delay: Seconds from now until the show starts
+            separation: If given, refuse to fly timelines that bring two
+                drones closer than this many cm
+
+        Raises:
+            ValueError: If there is not one timeline per drone, a cue is
+                invalid or two drones would come too close
+        """
+        if len(timelines) != len(self.drones):
+            raise ValueError(f"Expected {len(self.drones)} timelines, got {len(timelines)}")
+        if separation is not None:
+            conflicts = self.conflicts(timelines, separation)
+            if conflicts:
+                from drone_teaching_package.conflicts import format_conflict
+                raise ValueError(f"{len(conflicts)} conflicting pair(s), first: "
+                                 f"{format_conflict(conflicts[0])}")
+        programs = [
+            list(zip(timeline, interpreter.load([(cue.name,) + tuple(cue.args) for cue in timeline])))
+            for timeline, interpreter in zip(timelines, self.interpreters)
+        ]
+        start = self.clock.monotonic_ns() + int(start_delay * 1e9) + max(self.leads, default=0)
+        with ThreadPoolExecutor(max_workers=max(1, len(self.drones)),
+                                thread_name_prefix="swarm") as pool:
+            futures = [pool.submit(self._perform, drone, program, start)
+                       for drone, program in enumerate(programs)]
+            results = [future.result() for future in futures]
+        return SwarmRun(results, list(self.leads))
+
+
+class _DemoLink:
+    """An offline drone behind a link with a fixed one-way latency, busy for real time"""
+
+    def __init__(self, latency: float, time_scale: float):
+        from drone_teaching_package.clock import VirtualClock
+        from drone_teaching_package.offline_drone import OfflineDrone
+        self.drone = OfflineDrone(clock=VirtualClock())  # keeps its model off the shared clock
+        self.latency = latency
+        self.time_scale = time_scale
+
+    def __getattr__(self, name):
+        method = getattr(self.drone, name)
+        if not callable(method):
+            return method
+        clock = get_clock()
+
+        def call(*args):
+            clock.sleep(self.latency)  # the command travels to the drone
+            busy = command_duration(name, args, self.drone.speed) if name != PROBE else 0.0
+            result = method(*args)
+            clock.sleep(busy * self.time_scale + self.latency)  # flies, then the reply travels back
+            return result
+        return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fly a synchronized show on offline drones")
+    parser.add_argument("--drones", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=1, help="Drones on a slow link")
+    parser.add_argument("--latency", type=float, default=0.05, help="Slow link latency in seconds")
+    parser.add_argument("--time-scale", type=float, default=0.02,
+                        help="Real seconds per show second, to run the demo quickly")
+    parser.add_argument("--no-calibrate", action="store_true", help="Send commands on time")
+    args = parser.parse_args(argv)
+
+    links = [_DemoLink(args.latency if drone < args.slow else 0.001, args.time_scale)
+             for drone in range(args.drones)]
+    program = [("takeoff",), ("up", 50), ("cw", 90), ("forward", 100), ("ccw", 90),
+               ("back", 100), ("land",)]
+    # Only the flying is sped up; links still need their real gap between cues
+    timelines = [[cue._replace(at=cue.at * args.time_scale) for cue in timeline]
+                 for timeline in choreograph([program] * args.drones,
+                                             gap=DEFAULT_GAP / args.time_scale)]
+    swarm = Swarm(links)
+    if not args.no_calibrate:
+        leads = swarm.calibrate()
+        print(f"link latency estimates: {min(leads) / 1e6:.2f}-{max(leads) / 1e6:.2f} ms")
+    show = swarm.run(timelines)
+    print(f"{args.drones} drones, {len(program)} cues")
+    print(f"as measured:         {show.summary()}")
+    # The demo knows the true latencies, so it can also tell when commands arrived
+    arrived = SwarmRun(show.results, [int(link.latency * 1e9) for link in links])
+    print(f"as the drones saw it: {arrived.summary()}")
+
+
+if __name__ == "__main__":
+    main()
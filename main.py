@@ -1,5 +1,3 @@
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
 import json
 from time import sleep
 import threading
@@ -13,18 +11,21 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
 
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         # simulator_key = input("Enter your simulator key: ")
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()  # Recursively ask for correct input
 
 
-# Instantiate the drone based on user input
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 # ---------------------------
 # LESSON 1: Basic Drone Commands
@@ -126,7 +127,7 @@ BOUNDARY_BOX = {
     "y_min": 0,
     "y_max": 100,
     "z_min": 0,
-    "z_max": 80
+    "z_max": 120  # takeoff alone reaches about 80 cm
 }
 
 # Function to collect telemetry data and append it to the JSON file
@@ -210,31 +211,36 @@ def lesson_7():
     drone.connect()
     drone.takeoff()
 
-    telemetry_data = {
-        "x": 0,
-        "y": 0,
-        "z": 50  # Start at 50 cm altitude
-    }
-
-    # Simulate drone movements and update telemetry
-    for _ in range(10):  # Example: Move drone in 10 steps
-        telemetry_data["x"] += 50  # Move 50 cm in x-direction
-        telemetry_data["y"] += 50  # Move 50 cm in y-direction
-        telemetry_data["z"] += 10  # Move 10 cm in z-direction
-
-        # Write updated telemetry data to JSON file (appending with timestamp)
-        collect_telemetry_data(telemetry_data["x"], telemetry_data["y"], telemetry_data["z"])
+    # Move in 10 steps of 50 cm in x and y and 10 cm up. The log records
+    # the adapter's pose (fused with the state stream on a real Tello),
+    # not the position the drone was told to reach.
+    step = (50, 50, 10)
+    for _ in range(10):
+        pose = drone.pose
+        target = (pose.x + step[0], pose.y + step[1], pose.z + step[2])
 
-        # Check if the drone is outside the boundary
-        if check_boundary(telemetry_data["x"], telemetry_data["y"], telemetry_data["z"]):
+        # Check the next position before flying there
+        if check_boundary(*target):
             emergency_landing()
             break  # Exit if emergency occurs
 
-        # Simulate drone movement
-        drone.go(telemetry_data["x"], telemetry_data["y"], telemetry_data["z"], 20)
+        # go() is relative to the drone's heading
+        dx, dy, dz = pose.offset_to(*target)
+        drone.go(round(dx), round(dy), round(dz), 20)
+
+        # Write the reported position to the JSON file (appending with timestamp)
+        pose = drone.pose
+        collect_telemetry_data(round(pose.x), round(pose.y), round(pose.z))
         sleep(1)  # Wait before next move
 
     drone.land()  # Safely land the drone after the lesson
 
-# Run Lesson 7
-lesson_7()
+def run(drone_interface):
+    """Run Lesson 7 on an already-created drone"""
+    global drone
+    drone = drone_interface
+    lesson_7()
+
+
+if __name__ == "__main__":
+    run(get_drone())
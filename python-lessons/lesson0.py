@@ -1,6 +1,5 @@
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
+from drone_teaching_package.interpreter import CommandInterpreter
 import json
 from time import sleep
 import threading
@@ -21,16 +20,22 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
 
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "77f9202d-3aed-4981-a31b-6eb8933fa4ee"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Initialize drone, unless python -m drone_teaching_package.run
+# already set one before running this script
+try:
+    drone
+except NameError:
+    drone = get_drone()
 
 # ---------------------------
 # LESSON 0: Python Fundamentals
@@ -160,19 +165,13 @@ flight_sequence = [
     ("land", None)
 ]
 
+# The interpreter looks each command name up once, checks the values,
+# then runs the whole list
+interpreter = CommandInterpreter(drone)
+
 try:
-    for command, value in flight_sequence:
-        if command == "takeoff":
-            drone.takeoff()
-        elif command == "land":
-            drone.land()
-        elif command == "up":
-            drone.up(value)
-        elif command == "forward":
-            drone.forward(value)
-        elif command == "cw":
-            drone.cw(value)
-        sleep(2)  # Wait between commands
+    program = interpreter.load(flight_sequence)
+    interpreter.run(program, pause=2)  # Wait between commands
 except Exception as e:
     print(f"Error in sequence: {str(e)}")
     drone.land()
@@ -200,19 +199,19 @@ flight_patterns = {
     ]
 }
 
+# Validate every pattern once, up front
+patterns = {name: interpreter.load(steps) for name, steps in flight_patterns.items()}
+
 def execute_pattern(pattern_name):
     """Execute a predefined flight pattern"""
-    if pattern_name not in flight_patterns:
+    if pattern_name not in patterns:
         return False
     
     try:
         drone.takeoff()
         sleep(2)
         
-        for command, value in flight_patterns[pattern_name]:
-            if hasattr(drone, command):
-                getattr(drone, command)(value)
-                sleep(2)
+        interpreter.run(patterns[pattern_name], pause=2)
         
         drone.land()
         return True
@@ -46,14 +46,12 @@ get_battery()
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
 import json
 from time import sleep
 import threading
-from datetime import datetime
 import math
 import random
+from drone_teaching_package.history import ActionLog
 
 def get_drone():
     """
@@ -68,16 +66,19 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
 
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 # ---------------------------
 # LESSON 1: Classes
@@ -98,7 +99,7 @@ class BasicDrone:
         self.name = name
         self.drone = drone_interface
         self.is_flying = False
-        self.flight_log = []
+        self.flight_log = ActionLog()  # keeps the latest 10000 actions
         print(f"Initialized drone: {self.name}")
     
     def takeoff(self):
@@ -121,8 +122,7 @@ class BasicDrone:
     
     def _log_action(self, action: str):
         """Log drone actions with timestamp"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.flight_log.append(f"{timestamp}: {action}")
+        self.flight_log.append(action)
     
     def get_status(self):
         """Get current drone status"""
@@ -343,7 +343,10 @@ def demonstrate_classes():
     sleep(2)
     safe.safe_mission("triangle", 60)  # 60cm sides
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_classes()
     except KeyboardInterrupt:
@@ -351,4 +354,7 @@ if __name__ == "__main__":
         drone.land()  # Emergency landing
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()  # Emergency landing
\ No newline at end of file
+        drone.land()  # Emergency landing
+
+if __name__ == "__main__":
+    run(get_drone())
@@ -44,14 +44,13 @@ get_battery()
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
 import json
 from time import sleep
 import threading
 from datetime import datetime
-import math
 import random
+from drone_teaching_package.history import PathStore
+from drone_teaching_package.return_home import ReturnHomePlanner
 
 def get_drone():
     """
@@ -66,16 +65,19 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
 
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 # ---------------------------
 # LESSON 2: Constructors
@@ -191,8 +193,15 @@ class PositionAwareDrone:
         self.name = name
         self.drone = drone_interface
         self.home_coordinates = home_coordinates
-        self.current_position = home_coordinates
-        self.flight_path = [home_coordinates]
+        # Simplified as it grows: every point flown stays within 5 cm of it
+        self.flight_path = PathStore(tolerance=5)
+        self.flight_path.append(self.current_position)
+    
+    @property
+    def current_position(self) -> tuple:
+        """Position tracked by the drone adapter, which follows every command"""
+        pose = self.drone.pose
+        return (pose.x, pose.y, pose.z)
     
     def move_to_position(self, x: int, y: int, z: int):
         """
@@ -202,17 +211,17 @@ class PositionAwareDrone:
             x, y, z (int): Target coordinates in cm
         """
         try:
-            self.drone.go(x, y, z, 30)
-            self.current_position = (x, y, z)
-            self.flight_path.append((x, y, z))
+            # go() moves relative to where the drone is pointing,
+            # so turn the target into an offset in the drone's own frame
+            dx, dy, dz = self.drone.pose.offset_to(x, y, z)
+            self.drone.go(round(dx), round(dy), round(dz), 30)
+            self.flight_path.append(self.current_position)
         except Exception as e:
             print(f"Movement error: {str(e)}")
     
     def get_distance_from_home(self) -> float:
         """Calculate distance from home position"""
-        x1, y1, z1 = self.home_coordinates
-        x2, y2, z2 = self.current_position
-        return math.sqrt((x2-x1)**2 + (y2-y1)**2 + (z2-z1)**2)
+        return self.drone.pose.distance_to(*self.home_coordinates)
 
 # 2.4: Constructor with Return Home Capability
 class ReturnHomeDrone:
@@ -243,19 +252,29 @@ class ReturnHomeDrone:
         self.home_y = home_y
         self.home_z = home_z
         
-        # Current position tracking
-        self.current_x = home_x
-        self.current_y = home_y
-        self.current_z = home_z
+        # Movement history (a compact array, see drone_teaching_package.history)
+        self.movements = PathStore()
         
-        # Movement history
-        self.movements = []
+        # The way home is replanned after every command, so it is ready at once
+        self.planner = ReturnHomePlanner((home_x, home_y, home_z))
+        if hasattr(drone_interface, "tracker"):
+            self.planner.watch(drone_interface.tracker)
+    
+    # Current position, as tracked by the drone adapter
+    @property
+    def current_x(self) -> float:
+        return self.drone.pose.x
+    
+    @property
+    def current_y(self) -> float:
+        return self.drone.pose.y
+    
+    @property
+    def current_z(self) -> float:
+        return self.drone.pose.z
     
     def update_position(self, x: int, y: int, z: int):
-        """Update current position after movement"""
-        self.current_x = x
-        self.current_y = y
-        self.current_z = z
+        """Record a position in the movement history (the drone's tracked pose is unchanged)"""
         self.movements.append((x, y, z))
     
     def return_home(self):
@@ -263,17 +282,10 @@ class ReturnHomeDrone:
         try:
             print(f"Returning to home position ({self.home_x}, {self.home_y}, {self.home_z})")
             
-            # First, rise to safe altitude if needed
-            if self.current_z < self.home_z:
-                self.drone.up(self.home_z - self.current_z)
-                sleep(2)
-            
-            # Then move to home X,Y coordinates
-            self.drone.go(self.home_x, self.home_y, self.home_z, 30)
-            sleep(2)
-            
-            # Update position
-            self.update_position(self.home_x, self.home_y, self.home_z)
+            # One direct go() leg (climbing first only if something is in the way)
+            plan = self.planner.execute(self.drone)
+            self.movements.append((self.current_x, self.current_y, self.current_z))
+            print(f"Flew {plan.distance:.0f}cm in {len(plan.commands)} command(s)")
             print("Successfully returned home")
             
         except Exception as e:
@@ -311,8 +323,12 @@ def demonstrate_constructors():
     home_drone = ReturnHomeDrone("Home-1", drone, home_z=80)
     home_drone.update_position(100, 100, 50)  # Simulate movement
     home_drone.return_home()
+    drone.land()
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_constructors()
     except KeyboardInterrupt:
@@ -320,4 +336,7 @@ if __name__ == "__main__":
         drone.land()  # Emergency landing
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()  # Emergency landing
\ No newline at end of file
+        drone.land()  # Emergency landing
+
+if __name__ == "__main__":
+    run(get_drone())
@@ -13,9 +13,6 @@ Example usage with actual drone commands
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
-from datetime import datetime
 from time import sleep
 from functools import wraps
 import logging
@@ -33,16 +30,19 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
     
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 # ---------------------------
 # LESSON 3: Decorators
@@ -54,8 +54,7 @@ def log_action(func):
     @wraps(func)
     def wrapper(self, *args, **kwargs):
         action_name = func.__name__.replace('_', ' ').title()
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        logger.info(f"{timestamp} - Drone {self.name}: {action_name}")
+        logger.info("Drone %s: %s", self.name, action_name)  # asctime adds the timestamp
         return func(self, *args, **kwargs)
     return wrapper
 
@@ -84,6 +83,10 @@ def safety_check(func):
     def wrapper(self, *args, **kwargs):
         if not hasattr(self, 'is_flying'):
             self.is_flying = False
+
+        # Prefer the adapter's own flight state when it tracks one
+        if hasattr(self.drone, 'is_flying'):
+            self.is_flying = self.drone.is_flying
             
         if func.__name__ == 'takeoff' and self.is_flying:
             logger.warning("Already flying - takeoff prevented")
@@ -207,7 +210,10 @@ def demonstrate_decorators():
     sleep(3)
     adv_drone.land()
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_decorators()
     except KeyboardInterrupt:
@@ -215,4 +221,7 @@ if __name__ == "__main__":
         drone.land()
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()
\ No newline at end of file
+        drone.land()
+
+if __name__ == "__main__":
+    run(get_drone())
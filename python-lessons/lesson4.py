@@ -13,11 +13,9 @@ All using actual drone commands
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
-from datetime import datetime
 import time
 import hashlib
+from drone_teaching_package.history import ActionLog
 
 def get_drone():
     print("Select drone mode:")
@@ -27,16 +25,19 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
     
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 class SecureDrone:
     """Demonstrate access modifiers with drone operations"""
@@ -54,7 +55,7 @@ class SecureDrone:
         # Private attributes (double underscore)
         self.__password = "default_pass123"
         self.__security_key = hashlib.sha256(b"drone_key").hexdigest()
-        self.__flight_logs = []
+        self.__flight_logs = ActionLog()  # timestamps formatted only when read
 
     # Public methods
     def get_drone_info(self):
@@ -104,8 +105,7 @@ class SecureDrone:
 
     def __log_flight(self, message: str):
         """Log flight operations privately"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.__flight_logs.append(f"{timestamp}: {message}")
+        self.__flight_logs.append(message)
 
 class EnhancedSecureDrone(SecureDrone):
     """Demonstrate inheritance with access modifiers"""
@@ -158,7 +158,10 @@ def demonstrate_access_modifiers():
     print("\nEnhanced Drone Info:")
     print(enhanced_drone.get_enhanced_info())
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_access_modifiers()
     except KeyboardInterrupt:
@@ -166,4 +169,7 @@ if __name__ == "__main__":
         drone.land()
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()
\ No newline at end of file
+        drone.land()
+
+if __name__ == "__main__":
+    run(get_drone())
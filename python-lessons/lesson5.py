@@ -11,8 +11,6 @@ Demonstration of property usage with actual drone commands
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
 from time import sleep
 from typing import Tuple
 
@@ -24,16 +22,19 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
     
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 class DroneWithProperties:
     """Demonstrate property usage with drone control"""
@@ -229,7 +230,10 @@ def demonstrate_properties():
     
     enhanced.land()
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_properties()
     except KeyboardInterrupt:
@@ -237,4 +241,7 @@ if __name__ == "__main__":
         drone.land()
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()
\ No newline at end of file
+        drone.land()
+
+if __name__ == "__main__":
+    run(get_drone())
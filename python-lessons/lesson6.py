@@ -13,8 +13,6 @@ Demonstration of polymorphic behavior
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
 from abc import ABC, abstractmethod
 from time import sleep
 
@@ -26,16 +24,19 @@ def get_drone():
     choice = input("Enter your choice (1 or 2): ")
     
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 # Base Abstract Class
 class FlyingObject(ABC):
@@ -193,7 +194,10 @@ def demonstrate_polymorphism():
     fly_drone(photo)
     photo.orbit_point(50)
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_polymorphism()
     except KeyboardInterrupt:
@@ -201,4 +205,7 @@ if __name__ == "__main__":
         drone.land()
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()
\ No newline at end of file
+        drone.land()
+
+if __name__ == "__main__":
+    run(get_drone())
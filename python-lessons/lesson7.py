@@ -12,9 +12,9 @@ Demonstration of inheritance and polymorphism
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
-from time import sleep
+from drone_teaching_package.clock import sleep, monotonic_ns
+from drone_teaching_package.racing import RacingLineOptimizer, fly_lap, format_splits
+from drone_teaching_package.smoothing import offsets_to_points
 from typing import List, Dict
 
 def get_drone():
@@ -23,16 +23,19 @@ def get_drone():
     print("2. Real Tello Drone")
     choice = input("Enter your choice (1 or 2): ")
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
-# Initialize drone
-drone = get_drone()
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
 
 class BaseDrone:
     """Base drone class with fundamental capabilities"""
@@ -155,6 +158,9 @@ class RacingDrone(BaseDrone):
         self.max_speed = 100
         self.race_mode = False
         self.lap_times = []
+        self.split_times = []
+        # Checkpoints may be passed up to 20 cm off centre
+        self.optimizer = RacingLineOptimizer(gate=20, speed=self.max_speed, seed=0)
     
     def enable_race_mode(self):
         """Enable racing configuration"""
@@ -163,19 +169,28 @@ class RacingDrone(BaseDrone):
         self._log_action("Race mode enabled")
     
     def execute_race_lap(self, checkpoints: List[tuple]):
-        """Execute racing lap through checkpoints"""
-        start_time = time.time()
+        """
+        Execute racing lap through checkpoints
+        
+        Each checkpoint is a go() offset from the previous one. The racing
+        line is optimized first: where to pass each checkpoint, and which
+        to fly as part of a curve. Split times are taken in nanoseconds.
+        """
+        start_ns = monotonic_ns()
         
         self.takeoff()
         sleep(1)
         
-        for x, y, z in checkpoints:
-            self.drone.go(x, y, z, self.max_speed)
-            sleep(1)
+        start = self.drone.pose
+        line = self.optimizer.optimize(offsets_to_points(start, checkpoints), start)
+        splits, _ = fly_lap(self.drone, line)
         
         self.land()
-        lap_time = time.time() - start_time
+        lap_time = (monotonic_ns() - start_ns) / 1e9
         self.lap_times.append(lap_time)
+        self.split_times.append(splits)
+        for split in format_splits(splits).splitlines():
+            self._log_action(f"Split {split}")
         self._log_action(f"Lap completed in {lap_time:.2f}s")
 
 def demonstrate_inheritance():
@@ -195,7 +210,10 @@ def demonstrate_inheritance():
     racing.enable_race_mode()
     racing.execute_race_lap([(50,0,50), (50,50,50), (0,50,50)])
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_inheritance()
     except KeyboardInterrupt:
@@ -203,4 +221,7 @@ if __name__ == "__main__":
         drone.land()
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()
\ No newline at end of file
+        drone.land()
+
+if __name__ == "__main__":
+    run(get_drone())
@@ -12,11 +12,12 @@ Demonstration of complex missions with actual drone commands
 
 
 # Import required packages
-from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
-from drone_teaching_package.real_tello import EasyTelloRealDrone
+from drone_teaching_package.history import ActionLog
+from drone_teaching_package.interpreter import CommandInterpreter, format_command
+from drone_teaching_package.return_home import ReturnHomePlanner
+from drone_teaching_package.smoothing import CurveSmoother
+from drone_teaching_package.tracing import get_tracer
 from typing import List, Tuple, Dict
-from datetime import datetime
-from time import sleep
 import math
 import json
 
@@ -27,20 +28,28 @@ def get_drone():
     
     choice = input("Enter your choice (1 or 2): ")
     if choice == "1":
+        from drone_teaching_package.simulated_tello import EasyTelloToSimulatedDrone
         simulator_key = "edafb6aa-f195-450e-a68f-0795f6712085"
         return EasyTelloToSimulatedDrone(simulator_key=simulator_key)
     elif choice == "2":
+        from drone_teaching_package.real_tello import EasyTelloRealDrone
         return EasyTelloRealDrone()
     else:
         print("Invalid choice, please select either 1 or 2.")
         return get_drone()
 
+# Set by run(): get_drone() when run as a script, or injected by
+# python -m drone_teaching_package.run
+drone = None
+
 class MissionPlanner:
     """Complex mission planning and execution"""
     
     def __init__(self, drone_interface):
         self.drone = drone_interface
-        self.mission_log = []
+        self.interpreter = CommandInterpreter(drone_interface)
+        self.smoother = CurveSmoother(tolerance=25)
+        self.mission_log = ActionLog()  # timestamps formatted only when read
         self.current_mission = None
         self.battery_threshold = 20
     
@@ -54,40 +63,31 @@ class MissionPlanner:
     
     def log_mission(self, action: str):
         """Log mission actions with timestamp"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.mission_log.append(f"{timestamp}: {action}")
+        self.mission_log.append(action)
     
     def generate_route(self, waypoints: List[Tuple[int, int, int]]) -> List[Dict]:
-        """Generate optimized route through waypoints"""
-        route = []
-        current_pos = (0, 0, 0)
+        """
+        Generate optimized route through waypoints
         
-        for point in waypoints:
-            x, y, z = point
-            dx = x - current_pos[0]
-            dy = y - current_pos[1]
-            dz = z - current_pos[2]
-            
-            if dz != 0:
-                route.append({"up" if dz > 0 else "down": abs(dz)})
-            if dx != 0:
-                route.append({"forward" if dx > 0 else "back": abs(dx)})
-            if dy != 0:
-                route.append({"right" if dy > 0 else "left": abs(dy)})
-                
-            current_pos = point
-            
-        return route
+        Starts from the drone's tracked pose. Each leg is one go() in the
+        drone's own frame, and corners are rounded into curves where the
+        legs are long enough, so the drone keeps moving past waypoints.
+        """
+        plan = self.smoother.plan(waypoints, self.drone.pose)
+        self.log_mission(f"Planned {len(plan.commands)} moves with {plan.stops} stop(s)")
+        return plan.as_route()
 
-    def execute_route(self, route: List[Dict]):
-        """Execute planned route"""
+    def execute_route(self, route: List[Dict], leg: str = "route"):
+        """Execute planned route, traced as one leg of the mission"""
         try:
-            for move in route:
-                for command, value in move.items():
-                    if hasattr(self.drone, command):
-                        getattr(self.drone, command)(value)
-                        self.log_mission(f"Executed {command}({value})")
-                        sleep(2)
+            with get_tracer().span(leg, "leg", moves=len(route)):
+                program = self.interpreter.load(route)
+                self.interpreter.run(
+                    program,
+                    pause=2,
+                    on_step=lambda step: self.log_mission(
+                        f"Executed {format_command(step.name, step.args)}")
+                )
         except Exception as e:
             self.log_mission(f"Route error: {str(e)}")
             raise
@@ -99,6 +99,7 @@ class DeliveryMission(MissionPlanner):
         super().__init__(drone_interface)
         self.delivery_points = []
         self.completed_deliveries = []
+        self.home_planner = ReturnHomePlanner(home=(0, 0, 50))
     
     def add_delivery(self, point: Tuple[int, int, int], package_id: str):
         """Add delivery point to mission"""
@@ -114,25 +115,27 @@ class DeliveryMission(MissionPlanner):
             raise ValueError("Insufficient battery for delivery mission")
             
         try:
-            self.drone.takeoff()
-            self.log_mission("Started delivery mission")
-            
-            for delivery in self.delivery_points:
-                point = delivery["location"]
-                route = self.generate_route([point])
-                
-                self.execute_route(route)
-                self.log_mission(f"Delivered package {delivery['package_id']}")
-                delivery["status"] = "completed"
-                self.completed_deliveries.append(delivery)
-                
-                # Return to home between deliveries
-                home_route = self.generate_route([(0, 0, 50)])
-                self.execute_route(home_route)
-                
-            self.drone.land()
-            self.log_mission("Completed delivery mission")
-            
+            with get_tracer().span("delivery mission", "mission",
+                                   deliveries=len(self.delivery_points)):
+                self.drone.takeoff()
+                self.log_mission("Started delivery mission")
+
+                for delivery in self.delivery_points:
+                    point = delivery["location"]
+                    route = self.generate_route([point])
+
+                    self.execute_route(route, leg=f"deliver {delivery['package_id']}")
+                    self.log_mission(f"Delivered package {delivery['package_id']}")
+                    delivery["status"] = "completed"
+                    self.completed_deliveries.append(delivery)
+
+                    # Return to home between deliveries, in one direct leg
+                    home_route = self.home_planner.plan(self.drone.pose).as_route()
+                    self.execute_route(home_route, leg="return home")
+
+                self.drone.land()
+                self.log_mission("Completed delivery mission")
+
         except Exception as e:
             self.log_mission(f"Delivery mission failed: {str(e)}")
             self.drone.land()
@@ -188,15 +191,17 @@ class SurveyMission(MissionPlanner):
             
         try:
             waypoints = self.generate_survey_pattern()
-            route = self.generate_route(waypoints)
-            
-            self.drone.takeoff()
-            self.log_mission("Started survey mission")
-            
-            self.execute_route(route)
-            
-            self.drone.land()
-            self.log_mission("Completed survey mission")
+
+            with get_tracer().span("survey mission", "mission", waypoints=len(waypoints)):
+                self.drone.takeoff()
+                self.log_mission("Started survey mission")
+
+                # Planned after takeoff, from the height the drone actually reached
+                route = self.generate_route(waypoints)
+                self.execute_route(route, leg="survey lines")
+
+                self.drone.land()
+                self.log_mission("Completed survey mission")
             
         except Exception as e:
             self.log_mission(f"Survey mission failed: {str(e)}")
@@ -276,15 +281,18 @@ class SearchMission(MissionPlanner):
             
         try:
             waypoints = self.search_patterns[pattern](size, spacing)
-            route = self.generate_route(waypoints)
-            
-            self.drone.takeoff()
-            self.log_mission(f"Started {pattern} search mission")
-            
-            self.execute_route(route)
-            
-            self.drone.land()
-            self.log_mission("Completed search mission")
+
+            with get_tracer().span(f"{pattern} search mission", "mission",
+                                   waypoints=len(waypoints)):
+                self.drone.takeoff()
+                self.log_mission(f"Started {pattern} search mission")
+
+                # Planned after takeoff, from the height the drone actually reached
+                route = self.generate_route(waypoints)
+                self.execute_route(route, leg=f"{pattern} search")
+
+                self.drone.land()
+                self.log_mission("Completed search mission")
             
         except Exception as e:
             self.log_mission(f"Search mission failed: {str(e)}")
@@ -314,7 +322,10 @@ def demonstrate_complex_missions():
     search = SearchMission(drone)
     search.execute_search_mission("spiral", 200, 50)
 
-if __name__ == "__main__":
+def run(drone_interface):
+    """Run this lesson's demonstration on an already-created drone"""
+    global drone
+    drone = drone_interface
     try:
         demonstrate_complex_missions()
     except KeyboardInterrupt:
@@ -322,4 +333,7 @@ if __name__ == "__main__":
         drone.land()
     except Exception as e:
         print(f"\nProgram error: {str(e)}")
-        drone.land()
\ No newline at end of file
+        drone.land()
+
+if __name__ == "__main__":
+    run(get_drone())
@@ -12,7 +12,8 @@ setup(
     packages=find_packages(),              # Finds all packages (e.g., `drone_teaching_package`)
     install_requires=[                     # Dependencies
         'easytello',
-        'DroneBlocksTelloSimulator'
+        'DroneBlocksTelloSimulator',
+        'numpy'
     ],
     classifiers=[                          # Additional metadata
         'Programming Language :: Python :: 3',
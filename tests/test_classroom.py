@@ -0,0 +1,58 @@
+# test_classroom.py
+"""Named classroom sessions belong to one connection at a time."""
+
+import asyncio
+import socket
+
+import pytest
+
+from drone_teaching_package.classroom import ClassroomMultiplexer
+from drone_teaching_package.offline_drone import OfflineDrone
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+async def request(connection, line):
+    reader, writer = connection
+    writer.write(line.encode() + b"\n")
+    await writer.drain()
+    return (await reader.readline()).decode().strip()
+
+
+async def classroom_script(path):
+    multiplexer = ClassroomMultiplexer(drone_factory=lambda session_id: OfflineDrone(), workers=2)
+    server = asyncio.ensure_future(multiplexer.serve(path))
+    for _ in range(100):  # until the server is listening
+        try:
+            first = await asyncio.open_unix_connection(path)
+            break
+        except OSError:
+            await asyncio.sleep(0.01)
+    replies = [await request(first, "session alice")]
+    second = await asyncio.open_unix_connection(path)
+    replies.append(await request(second, "session alice"))
+    replies.append(await request(second, "session bob"))
+    first[1].close()
+    await asyncio.sleep(0.05)  # let the server notice the hang-up
+    third = await asyncio.open_unix_connection(path)
+    replies.append(await request(third, "session alice"))
+    for _, writer in (second, third):
+        writer.close()
+    server.cancel()
+    try:
+        await server
+    except asyncio.CancelledError:
+        pass
+    return replies
+
+
+def test_named_session_is_refused_while_held(tmp_path):
+    loop = asyncio.new_event_loop()
+    try:
+        replies = loop.run_until_complete(classroom_script(str(tmp_path / "classroom.sock")))
+    finally:
+        loop.close()
+    assert replies[0] == "ok alice"
+    assert replies[1].startswith("err ValueError Session alice is in use")
+    assert replies[2] == "ok bob"
+    assert replies[3] == "ok alice"  # free again once its connection closed
@@ -0,0 +1,57 @@
+# test_code_converter.py
+"""Tricky scripts for the static script converter.
+
+Scripts that cannot be evaluated must end up as unresolved entries, never
+as an exception, and the commands around them must still be recorded.
+"""
+
+import pytest
+
+from drone_teaching_package.code_converter import convert_source
+
+PREAMBLE = "from time import sleep\ndrone = get_drone()\n"
+
+# (script, expected commands)
+CASES = [
+    ("drone.takeoff()\nsleep(10)\ndrone.land()", [("takeoff",), ("sleep", 5.0), ("land",)]),
+    ("drone.takeoff()\nsleep(3)\ndrone.forward(50)\nsleep(1)",
+     [("takeoff",), ("forward", 50)]),
+    ("sleep(2)\nfor i in range(2):\n    drone.up(20)\n    sleep(1)",
+     [("sleep", 2), ("up", 20), ("up", 20)]),
+    ("x = 10 ** 10 ** 10\ndrone.up(20)", [("up", 20)]),
+    ("x = [0] * 10 ** 9\ndrone.up(20)", [("up", 20)]),
+    ("x = [1]\nfor i in range(40):\n    x = x + x\ndrone.up(20)", [("up", 20)]),
+    ("a, b = 5\ndrone.up(20)", [("up", 20)]),
+    ("x = 1 / 0\ndrone.up(20)", [("up", 20)]),
+    ("f(**[1])\ndrone.up(20)", [("up", 20)]),
+    ("sleep(-1)\ndrone.up(20)", [("up", 20)]),
+    ("drone.up(float('nan'))\ndrone.forward(float('inf'))\ndrone.up(20)", [("up", 20)]),
+]
+
+# Package helpers the converter runs for real against the stand-in drone
+HELPER_CASES = [
+    ("drone.takeoff()\ndrone.forward(40)\ndrone.set_pose(0, 0, 0)\ndrone.up(int(drone.pose.z) + 20)",
+     [("takeoff",), ("forward", 40), ("up", 20)]),
+    ("from drone_teaching_package.interpreter import CommandInterpreter\n"
+     "interpreter = CommandInterpreter(drone)\ninterpreter.run(None)\ninterpreter.run([7])\n"
+     "interpreter.run([{'up': 30}])\ndrone.up(20)", [("up", 30), ("up", 20)]),
+    ("from drone_teaching_package.interpreter import CommandInterpreter\n"
+     "steps = []\nCommandInterpreter(drone).run([{'up': 30}, {'cw': 90}], pause=2,\n"
+     "    on_step=lambda step: steps.append(step.name))\ndrone.forward(len(steps) * 10)",
+     [("up", 30), ("sleep", 0.8), ("cw", 90), ("sleep", 0.4), ("forward", 20)]),
+    ("from drone_teaching_package.code_converter import convert_source\ndrone.up(20)", [("up", 20)]),
+]
+
+
+def convert(source):
+    return convert_source(PREAMBLE + source, optimize=False)
+
+
+@pytest.mark.parametrize("source, expected", CASES + HELPER_CASES)
+def test_converts_to_expected_commands(source, expected):
+    assert convert(source).commands == expected
+
+
+def test_unevaluable_statements_are_reported():
+    result = convert("x = 1 / 0\ndrone.up(20)")
+    assert result.unresolved
@@ -0,0 +1,74 @@
+# test_compiler.py
+"""Peephole passes of the flight-program compiler."""
+
+import random
+
+import pytest
+
+from drone_teaching_package.compiler import compile_program
+from drone_teaching_package.flight_model import MAX_MOVE, MIN_MOVE
+from drone_teaching_package.pose import PoseTracker
+
+CASES = [
+    # dead_moves
+    ([("up", 0), ("cw", 360), ("go", 0, 0, 0, 30), ("forward", 50)], [("forward", 50)]),
+    ([("set_speed", 20), ("set_speed", 40), ("forward", 50)], [("set_speed", 40), ("forward", 50)]),
+    # shortest_rotation
+    ([("cw", 270)], [("ccw", 90)]),
+    ([("cw", 90), ("ccw", 30), ("cw", 30)], [("cw", 90)]),
+    ([("cw", 180)], [("cw", 180)]),
+    # cancel_opposites
+    ([("up", 50), ("down", 50)], []),
+    ([("up", 50), ("down", 20)], [("up", 30)]),
+    ([("up", 50), ("down", 40)], [("up", 50), ("down", 40)]),  # up(10) is below MIN_MOVE
+    # merge_moves
+    ([("forward", 30), ("forward", 40)], [("forward", 70)]),
+    ([("forward", 300), ("forward", 300)], [("forward", 300), ("forward", 300)]),
+    ([("takeoff", None), ("takeoff", None)], [("takeoff",), ("takeoff",)]),
+    # passes feeding each other until nothing changes
+    ([("forward", 30), ("cw", 180), ("cw", 180), ("forward", 40)], [("forward", 70)]),
+]
+
+
+@pytest.mark.parametrize("commands, expected", CASES)
+def test_passes(commands, expected):
+    assert compile_program(commands).commands == expected
+
+
+def test_changes_are_reported():
+    result = compile_program([("up", 50), ("down", 50), ("forward", 20), ("forward", 20)])
+    assert [change.pass_name for change in result.changes] == ["cancel_opposites", "merge_moves"]
+    assert result.seconds_saved > 0
+
+
+def final_pose(commands):
+    tracker = PoseTracker()
+    for name, *args in commands:
+        tracker.apply(name, tuple(args))
+    return tracker.pose
+
+
+def random_program(rng, length):
+    names = ["up", "down", "left", "right", "forward", "back", "cw", "ccw"]
+    commands = []
+    for _ in range(length):
+        name = rng.choice(names)
+        if name in ("cw", "ccw"):
+            commands.append((name, rng.choice([0, 45, 90, 180, 270, 360])))
+        else:
+            commands.append((name, rng.choice([0, MIN_MOVE, 30, 50, 100, MAX_MOVE])))
+    return commands
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_keeps_final_pose_and_limits(seed):
+    rng = random.Random(seed)
+    commands = random_program(rng, 12)
+    result = compile_program(commands)
+    assert len(result.commands) <= len(commands)
+    assert final_pose(result.commands) == pytest.approx(final_pose(commands), abs=1e-6)
+    for name, value in result.commands:
+        if name in ("cw", "ccw"):
+            assert 1 <= value <= 360
+        else:
+            assert MIN_MOVE <= value <= MAX_MOVE
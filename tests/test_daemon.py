@@ -0,0 +1,51 @@
+# test_daemon.py
+"""DroneClient against a daemon that answers too late."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from drone_teaching_package.daemon import DroneClient
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def slow_daemon(tmp_path):
+    """A socket that answers every request with ok 100% after 0.3 s"""
+    path = str(tmp_path / "drone.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    def serve():
+        connection, _ = server.accept()
+        try:
+            with connection, connection.makefile("rwb") as file:
+                for _ in file:
+                    time.sleep(0.3)
+                    file.write(b"ok 100%\n")
+                    file.flush()
+        except OSError:
+            pass  # the client hung up
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield path
+    server.close()
+
+
+def test_timeout_closes_client(slow_daemon):
+    client = DroneClient(slow_daemon, timeout=0.1)
+    with pytest.raises(socket.timeout):
+        client.get_battery()
+    time.sleep(0.4)  # the late reply must not become the next answer
+    with pytest.raises(ConnectionError, match="no reply to get_battery"):
+        client.get_battery()
+
+
+def test_reply_in_time(slow_daemon):
+    with DroneClient(slow_daemon, timeout=2) as client:
+        assert client.get_battery() == "100%"
@@ -0,0 +1,40 @@
+# test_disturbance.py
+"""Wind only moves a drone that is in the air."""
+
+import numpy as np
+
+from drone_teaching_package.disturbance import DisturbanceModel, trace_steps
+from drone_teaching_package.flight_model import command_duration
+
+WIND = (10.0, 0.0)
+
+
+def trace(*commands):
+    """A trace with each command starting after the previous one plus its wait"""
+    t = 0.0
+    events = []
+    for name, args, wait in commands:
+        events.append((t, name, args))
+        t += command_duration(name, args) + wait
+    return events
+
+
+def drift(events):
+    return DisturbanceModel(wind=WIND).fly(trace_steps(events)).positions[0, -1, :2]
+
+
+def test_hover_after_takeoff_drifts():
+    moved = drift(trace(("takeoff", (), 10.0), ("land", (), 0.0)))
+    land = command_duration("land", ())
+    assert np.allclose(moved, [WIND[0] * (10.0 + land), 0.0])
+
+
+def test_wait_after_land_does_not_drift():
+    short = drift(trace(("takeoff", (), 0.0), ("land", (), 0.0), ("takeoff", (), 0.0)))
+    long = drift(trace(("takeoff", (), 0.0), ("land", (), 100.0), ("takeoff", (), 0.0)))
+    assert np.allclose(short, long)
+
+
+def test_grounded_commands_do_not_drift():
+    moved = drift(trace(("connect", (), 0.0), ("get_battery", (), 100.0), ("set_speed", (50,), 0.0)))
+    assert np.allclose(moved, 0.0)
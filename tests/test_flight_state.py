@@ -0,0 +1,62 @@
+# test_flight_state.py
+"""The flight-state table the adapters consult before each command."""
+
+import pytest
+
+from drone_teaching_package.flight_state import (
+    CONNECTED, DISCONNECTED, FLYING, LANDING, MOVE_COMMANDS, STATES, TRANSITIONS,
+    FlightStateError, FlightStateMachine
+)
+
+
+def fly(machine, command):
+    """Send one command the way an adapter does, assuming it succeeds"""
+    sent = machine.begin(command)
+    if sent:
+        machine.end()
+    return sent
+
+
+def test_table_only_names_known_states():
+    for (state, command), transition in TRANSITIONS.items():
+        assert state in STATES
+        if transition is not None:
+            assert set(transition) <= set(STATES)
+
+
+def test_full_flight():
+    machine = FlightStateMachine(DISCONNECTED)
+    for command in ("connect", "takeoff", "forward", "cw", "land", "disconnect"):
+        assert fly(machine, command)
+    assert machine.state == DISCONNECTED
+
+
+@pytest.mark.parametrize("command", MOVE_COMMANDS)
+def test_moves_need_the_drone_in_the_air(command):
+    machine = FlightStateMachine(CONNECTED)
+    assert not machine.allows(command)
+    with pytest.raises(FlightStateError, match=f"Cannot {command} while connected"):
+        machine.begin(command)
+    assert machine.state == CONNECTED
+
+
+def test_land_on_the_ground_is_a_no_op():
+    machine = FlightStateMachine(CONNECTED)
+    assert not fly(machine, "land")
+    assert machine.state == CONNECTED
+
+
+def test_failed_landing_can_be_retried():
+    machine = FlightStateMachine(FLYING)
+    assert machine.begin("land")  # the device never confirms
+    assert machine.state == LANDING
+    assert not machine.allows("forward")
+    assert fly(machine, "land")
+    assert machine.state == CONNECTED
+
+
+def test_is_flying():
+    machine = FlightStateMachine(CONNECTED)
+    fly(machine, "takeoff")
+    assert machine.is_flying
+    assert set(machine.allowed_commands()) >= set(MOVE_COMMANDS)
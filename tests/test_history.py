@@ -0,0 +1,73 @@
+# test_history.py
+"""PathStore's error bound and its running statistics."""
+
+import numpy as np
+import pytest
+
+from drone_teaching_package.history import WINDOW, PathStore, segment_distances
+
+
+def distance_to_path(points, vertices):
+    """Distance of each point to the nearest segment of a polyline"""
+    if len(vertices) == 1:
+        return np.linalg.norm(points - vertices[0], axis=1)
+    return np.min([segment_distances(points, start, end)
+                   for start, end in zip(vertices[:-1], vertices[1:])], axis=0)
+
+
+def random_walk(seed, count, step=10.0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(0.0, step, (count, 3)), axis=0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("tolerance", [0.0, 2.0, 5.0, 25.0])
+def test_every_point_within_tolerance(seed, tolerance):
+    points = random_walk(seed, 1000)
+    store = PathStore(tolerance=tolerance)
+    store.extend(points)
+    assert store.raw_count == len(points)
+    assert distance_to_path(points, np.asarray(store.vertices)).max() <= tolerance + 1e-9
+
+
+def test_straight_leg_is_two_vertices():
+    store = PathStore(tolerance=5)
+    store.extend([(x, 0.0, 50.0) for x in np.linspace(0, 300, WINDOW)])
+    assert len(store) == 2
+    assert store[-1] == (300.0, 0.0, 50.0)
+    assert store.length == pytest.approx(store.raw_length) == pytest.approx(300.0)
+
+
+def test_window_bounds_the_points_per_vertex():
+    store = PathStore(tolerance=5)
+    store.extend([(float(x), 0.0, 0.0) for x in range(4 * WINDOW)])
+    assert 2 < len(store) <= 4 + 2
+    assert store.raw_length - store.length <= store.tolerance
+
+
+def test_running_statistics():
+    points = random_walk(1, 500)
+    store = PathStore(tolerance=5)
+    store.extend(points)
+    home = points[0]
+    assert store.home == pytest.approx(tuple(home))
+    assert store.last == pytest.approx(tuple(points[-1]))
+    assert store.distance_from_home == pytest.approx(np.linalg.norm(points[-1] - home))
+    assert store.max_distance_from_home == pytest.approx(np.linalg.norm(points - home, axis=1).max())
+    assert store.raw_length == pytest.approx(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+    assert store.length <= store.raw_length + 1e-9
+
+
+def test_clear_starts_a_new_path():
+    store = PathStore(tolerance=5)
+    store.extend(random_walk(2, 100))
+    store.clear()
+    store.append((10.0, 20.0, 30.0))
+    assert len(store) == 1
+    assert store.home == (10.0, 20.0, 30.0)
+    assert store.distance_from_home == 0.0
+
+
+def test_negative_tolerance_is_rejected():
+    with pytest.raises(ValueError):
+        PathStore(tolerance=-1)
@@ -0,0 +1,101 @@
+# test_return_home.py
+"""Return-home plans around walls and over low obstacles."""
+
+import math
+
+import pytest
+
+from drone_teaching_package.clock import VirtualClock, use_clock
+from drone_teaching_package.flight_model import MAX_MOVE, MIN_MOVE
+from drone_teaching_package.offline_drone import OfflineDrone
+from drone_teaching_package.pose import Pose, PoseTracker
+from drone_teaching_package.return_home import (
+    Geofence, Obstacle, ReturnHomePlanner, _crossing, _is_clear
+)
+
+HOME = (0.0, 0.0, 80.0)
+FENCE = Geofence(-200, 600, -300, 300, 250)
+WALL = Obstacle(150, 200, -150, 150, 400)  # taller than the ceiling: fly around
+TABLE = Obstacle(150, 200, -150, 150, 90)  # low enough to climb over
+
+
+def distance(a, b):
+    return math.sqrt(sum((p - q) ** 2 for p, q in zip(a, b)))
+
+
+def replay(pose, commands):
+    """Where the commands take a drone starting at pose"""
+    tracker = PoseTracker()
+    tracker.reset(*pose)
+    for name, args in commands:
+        tracker.apply(name, args)
+    return tracker.pose
+
+
+def assert_reaches_home(plan, home=HOME):
+    end = replay(plan.start, plan.commands)
+    assert distance(end[:3], home) <= MIN_MOVE * math.sqrt(3)
+
+
+def assert_legal(plan):
+    for name, args in plan.commands:
+        if name == "go":
+            assert all(abs(v) <= MAX_MOVE for v in args[:3])
+            assert max(abs(v) for v in args[:3]) >= MIN_MOVE
+        else:
+            assert MIN_MOVE <= args[0] <= MAX_MOVE
+
+
+def test_open_room_is_one_leg():
+    plan = ReturnHomePlanner(HOME).plan(Pose(300, 200, 60, 0))
+    assert plan.waypoints == [(300, 200, 60), HOME]
+    assert [name for name, _ in plan.commands] == ["go"]
+    assert_reaches_home(plan)
+
+
+@pytest.mark.parametrize("yaw", [0, 90, 135, -60])
+def test_goes_around_a_wall(yaw):
+    planner = ReturnHomePlanner(HOME, fence=FENCE, obstacles=[WALL])
+    plan = planner.plan(Pose(400, 50, 100, yaw))
+    grown = WALL.grown(planner.clearance)
+    assert len(plan.waypoints) > 2
+    for a, b in zip(plan.waypoints, plan.waypoints[1:]):
+        assert _crossing(grown, a, b) is None
+    for x, y, z in plan.waypoints:
+        assert FENCE.x_min <= x <= FENCE.x_max and FENCE.y_min <= y <= FENCE.y_max
+        assert z <= FENCE.z_max
+    assert plan.distance < 2 * distance((400, 50), HOME[:2]) + 200
+    assert_legal(plan)
+    assert_reaches_home(plan)
+
+
+def test_climbs_over_a_low_obstacle():
+    planner = ReturnHomePlanner(HOME, fence=FENCE, obstacles=[TABLE])
+    plan = planner.plan(Pose(400, 50, 60, 0))
+    grown = TABLE.grown(planner.clearance)
+    for a, b in zip(plan.waypoints, plan.waypoints[1:]):
+        assert _is_clear(a, b, [grown])
+    assert max(z for _, _, z in plan.waypoints) == pytest.approx(grown.height)
+    assert_legal(plan)
+    assert_reaches_home(plan)
+
+
+def test_no_way_home_is_an_error_not_an_exception_on_update():
+    blocked = Obstacle(150, 200, -400, 400, 400)  # spans the whole fence
+    planner = ReturnHomePlanner(HOME, fence=FENCE, obstacles=[blocked])
+    with pytest.raises(ValueError):
+        planner.plan(Pose(400, 0, 100, 0))
+    assert planner.update(Pose(400, 0, 100, 0)) is None
+    assert "No way home" in planner.error
+
+
+def test_execute_flies_the_drone_home():
+    with use_clock(VirtualClock()):
+        drone = OfflineDrone()
+        drone.takeoff()
+        drone.forward(300)
+        drone.cw(90)
+        drone.forward(100)
+        planner = ReturnHomePlanner(HOME, fence=FENCE, obstacles=[WALL])
+        planner.execute(drone)
+    assert distance(tuple(drone.pose)[:3], HOME) <= MIN_MOVE * math.sqrt(3)
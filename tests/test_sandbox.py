@@ -0,0 +1,42 @@
+# test_sandbox.py
+"""Limits of sandboxed submissions, including scripts that swallow them."""
+
+import os
+
+import pytest
+
+from drone_teaching_package import sandbox
+from drone_teaching_package.harness import DEFAULT_INPUTS
+
+LESSONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python-lessons")
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="limits are enforced in forked children")
+
+# Bare except: catches LimitExceeded every time it is raised
+SPIN = "while True:\n    try:\n        pass\n    except:\n        pass\n"
+BLOCK = "import threading\nwhile True:\n    try:\n        threading.Event().wait()\n    except:\n        pass\n"
+
+
+def write_script(tmp_path, source):
+    path = tmp_path / "submission.py"
+    path.write_text(source)
+    return str(path)
+
+
+def test_submission_runs_and_returns_trace():
+    result = sandbox._run_forked(os.path.join(LESSONS, "lesson5.py"), DEFAULT_INPUTS, 10, 30, None)
+    assert result.ok, result.error
+    assert result.trace
+
+
+@pytest.mark.skipif(sandbox.resource is None, reason="needs rlimits")
+def test_cpu_limit_kills_script_that_swallows_it(tmp_path):
+    result = sandbox._run_forked(write_script(tmp_path, SPIN), DEFAULT_INPUTS, 1, 30, None)
+    assert result.error == "LimitExceeded('CPU time limit exceeded')"
+    assert result.wall_seconds < 10
+
+
+def test_wall_limit_kills_blocked_script_that_swallows_it(tmp_path):
+    result = sandbox._run_forked(write_script(tmp_path, BLOCK), DEFAULT_INPUTS, 10, 0.5, None)
+    assert result.error == "LimitExceeded('wall-clock time limit exceeded')"
+    assert result.wall_seconds < 0.5 + sandbox.KILL_GRACE + 2